@@ -0,0 +1,65 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import time
+from typing import Any, Callable
+
+import click
+import numpy as np
+import pandas as pd
+
+from superset.utils import csv
+
+WORDS = ["foo", "=cmd|' /C calc'!A0", "-10", "-bar", " =a", "plain text"]
+
+
+def escape_values(value: Any) -> Any:
+    return csv.escape_value(value) if isinstance(value, str) else value
+
+
+def time_it(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option("--rows", default=100_000, help="Number of rows in the fixture.")
+@click.option("--repeat", default=3, help="Number of runs, the best one is kept.")
+def main(rows: int = 100_000, repeat: int = 3) -> None:
+    """Benchmark escaping a DataFrame for CSV exports, column-wise or per value"""
+    rng = np.random.default_rng(0)
+    words = np.array(WORDS, dtype=object)
+    df = pd.DataFrame(
+        {
+            "name": words[rng.integers(0, len(words), rows)],
+            "city": words[rng.integers(0, len(words), rows)],
+            "value": rng.random(rows),
+            "count": rng.integers(0, 100, rows),
+        }
+    )
+
+    print("\nResults (best of {repeat} runs):\n".format(repeat=repeat))
+    for label, func in (
+        ("per value", lambda: df.applymap(escape_values)),
+        ("column-wise", lambda: csv.escape_dataframe(df)),
+    ):
+        duration = min(time_it(func) for _ in range(repeat))
+        print(f"{label}: {duration:.2f} s ({rows / duration:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,91 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Tuple
+
+import click
+
+from superset.db_engine_specs import BaseEngineSpec
+from superset.result_set import SupersetResultSet
+
+CURSOR_DESCRIPTION = [
+    ("id", "bigint", None, None, None, None, True),
+    ("name", "varchar", None, None, None, None, True),
+    ("value", "double", None, None, None, None, True),
+    ("price", "decimal", None, None, None, None, True),
+    ("is_active", "boolean", None, None, None, None, True),
+    ("ds", "timestamp", None, None, None, None, True),
+    ("tags", "array", None, None, None, None, True),
+    ("mixed", None, None, None, None, None, True),
+]
+
+
+def generate_row(i: int) -> Tuple[Any, ...]:
+    start = datetime(2021, 1, 1)
+    return (
+        i,
+        f"name_{i % 1000}" if i % 50 else None,
+        random.random() * 1000,
+        Decimal(i % 10000) / 100,
+        i % 3 == 0 if i % 20 else None,
+        start + timedelta(minutes=i),
+        [i % 7, i % 11] if i % 5 else None,
+        # mostly strings with the odd number or object Arrow can't type
+        f"value_{i}" if i % 100 else (i if i % 200 else {"i": i}),
+    )
+
+
+def time_it(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option("--rows", default=1_000_000, help="Number of rows in the fixture.")
+@click.option("--repeat", default=3, help="Number of runs, the best one is kept.")
+def main(rows: int = 1_000_000, repeat: int = 3) -> None:
+    """Benchmark building SupersetResultSet from DB-API rows"""
+    random.seed(0)
+    print(f"Generating {rows} mixed-type rows")
+    data: List[Tuple[Any, ...]] = [generate_row(i) for i in range(rows)]
+
+    fixtures: Dict[str, Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]]]] = {
+        "all columns": (data, CURSOR_DESCRIPTION),
+    }
+    for i, description in enumerate(CURSOR_DESCRIPTION):
+        fixtures[description[0]] = ([(row[i],) for row in data], [description])
+
+    print("\nResults (best of {repeat} runs):\n".format(repeat=repeat))
+    for label, (fixture, description) in fixtures.items():
+        duration = min(
+            time_it(lambda: SupersetResultSet(fixture, description, BaseEngineSpec))
+            for _ in range(repeat)
+        )
+        print(f"{label}: {duration:.2f} s ({rows / duration:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    from superset.app import create_app
+
+    app = create_app()
+    with app.app_context():
+        # pylint: disable=no-value-for-parameter
+        main()
@@ -0,0 +1,81 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+import click
+import pandas as pd
+from sqlalchemy import and_, or_
+from sqlalchemy.sql import column
+
+from superset.connectors.sqla.models import SqlaTable
+from superset.models.core import Database
+
+DIMENSIONS = ["country", "state", "gender"]
+
+
+def time_it(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option("--series", default=500, help="Number of groups of the prequery.")
+@click.option("--repeat", default=3, help="Number of runs, the best one is kept.")
+def main(series: int = 500, repeat: int = 3) -> None:
+    """Benchmark building the series limit predicate of a query"""
+    database = Database(database_name="benchmark", sqlalchemy_uri="sqlite://")
+    table = SqlaTable(table_name="benchmark", database=database)
+    groupby_exprs = OrderedDict((name, column(name)) for name in DIMENSIONS)
+    df = pd.DataFrame(
+        {
+            "country": [f"country_{i % 5}" for i in range(series)],
+            "state": [f"state_{i % 50}" for i in range(series)],
+            "gender": [f"gender_{i}" for i in range(series)],
+            "count": range(series),
+        }
+    )
+
+    def get_top_groups_by_row() -> str:
+        groups = []
+        for _unused, row in df.iterrows():
+            group = [groupby_exprs[name] == row[name] for name in DIMENSIONS]
+            groups.append(and_(*group))
+        return str(or_(*groups).compile())
+
+    def get_top_groups() -> str:
+        # pylint: disable=protected-access
+        return str(table._get_top_groups(df, DIMENSIONS, groupby_exprs).compile())
+
+    print("\nResults (best of {repeat} runs):\n".format(repeat=repeat))
+    for label, func in (
+        ("one AND per group", get_top_groups_by_row),
+        ("column-wise", get_top_groups),
+    ):
+        duration = min(time_it(func) for _ in range(repeat))
+        print(f"{label}: {duration * 1000:.1f} ms ({len(func()):,} characters)")
+
+
+if __name__ == "__main__":
+    from superset.app import create_app
+
+    app = create_app()
+    with app.app_context():
+        # pylint: disable=no-value-for-parameter
+        main()
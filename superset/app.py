@@ -36,12 +36,15 @@ from superset.extensions import (
     csrf,
     db,
     encrypted_field_factory,
+    engine_manager,
     feature_flag_manager,
     machine_auth_provider_factory,
     manifest_processor,
     migrate,
+    query_accounting,
     results_backend_manager,
     talisman,
+    tracer,
 )
 from superset.security import SupersetSecurityManager
 from superset.typing import FlaskResponse
@@ -152,6 +155,7 @@ class SupersetAppInitializer:
         from superset.datasets.api import DatasetRestApi
         from superset.datasets.columns.api import DatasetColumnsRestApi
         from superset.datasets.metrics.api import DatasetMetricRestApi
+        from superset.profiler.api import ProfilerRestApi
         from superset.queries.api import QueryRestApi
         from superset.security.api import SecurityRestApi
         from superset.queries.saved_queries.api import SavedQueryRestApi
@@ -224,6 +228,8 @@ class SupersetAppInitializer:
         if feature_flag_manager.is_feature_enabled("ALERT_REPORTS"):
             appbuilder.add_api(ReportScheduleRestApi)
             appbuilder.add_api(ReportExecutionLogRestApi)
+        if self.config["PROFILER_ENABLED"]:
+            appbuilder.add_api(ProfilerRestApi)
         #
         # Setup regular views
         #
@@ -556,8 +562,11 @@ class SupersetAppInitializer:
         self.configure_logging()
         self.configure_db_encrypt()
         self.setup_db()
+        self.configure_query_accounting()
+        self.configure_engine_pool()
         self.configure_celery()
         self.setup_event_logger()
+        self.configure_tracing()
         self.setup_bundle_manifest()
         self.register_blueprints()
         self.configure_wtf()
@@ -577,6 +586,9 @@ class SupersetAppInitializer:
             self.flask_app.config.get("EVENT_LOGGER", DBEventLogger())
         )
 
+    def configure_tracing(self) -> None:
+        tracer.init_app(self.flask_app)
+
     def configure_data_sources(self) -> None:
         # Registering sources
         module_datasource_map = self.config["DEFAULT_MODULE_DS_MAP"]
@@ -658,6 +670,13 @@ class SupersetAppInitializer:
             except OSError:
                 pass
 
+        if self.config["PROFILER_ENABLED"]:
+            from superset.utils.profiler import ProfilerMiddleware
+
+            self.flask_app.wsgi_app = ProfilerMiddleware(  # type: ignore
+                self.flask_app.wsgi_app, self.flask_app
+            )
+
         for middleware in self.config["ADDITIONAL_MIDDLEWARE"]:
             self.flask_app.wsgi_app = middleware(  # type: ignore
                 self.flask_app.wsgi_app
@@ -685,6 +704,13 @@ class SupersetAppInitializer:
 
         migrate.init_app(self.flask_app, db=db, directory=APP_DIR + "/migrations")
 
+    def configure_query_accounting(self) -> None:
+        with self.flask_app.app_context():  # type: ignore
+            query_accounting.init_app(self.flask_app, db.engine)
+
+    def configure_engine_pool(self) -> None:
+        engine_manager.init_app(self.flask_app)
+
     def configure_wtf(self) -> None:
         if self.config["WTF_CSRF_ENABLED"]:
             csrf.init_app(self.flask_app)
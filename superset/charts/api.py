@@ -18,11 +18,21 @@ import json
 import logging
 from datetime import datetime
 from io import BytesIO
-from typing import Any, Dict
+from typing import Any, Dict, List
 from zipfile import ZipFile
 
+import pyarrow as pa
 import simplejson
-from flask import g, make_response, redirect, request, Response, send_file, url_for
+from flask import (
+    g,
+    make_response,
+    redirect,
+    request,
+    Response,
+    send_file,
+    stream_with_context,
+    url_for,
+)
 from flask_appbuilder.api import expose, protect, rison, safe
 from flask_appbuilder.models.sqla.interface import SQLAInterface
 from flask_babel import gettext as _, ngettext
@@ -67,11 +77,13 @@ from superset.charts.schemas import (
 )
 from superset.commands.exceptions import CommandInvalidError
 from superset.commands.importers.v1.utils import get_contents_from_bundle
+from superset.common.query_context import QueryContext
 from superset.constants import MODEL_API_RW_METHOD_PERMISSION_MAP, RouteMethod
 from superset.exceptions import QueryObjectValidationError
-from superset.extensions import event_logger
+from superset.extensions import event_logger, tracer
 from superset.models.slice import Slice
 from superset.tasks.thumbnails import cache_chart_thumbnail
+from superset.utils.arrow import ARROW_STREAM_MIMETYPE, write_ipc_stream
 from superset.utils.async_query_manager import AsyncQueryTokenException
 from superset.utils.core import (
     ChartDataResultFormat,
@@ -477,7 +489,7 @@ class ChartRestApi(BaseSupersetModelRestApi):
         self, command: ChartDataCommand, force_cached: bool = False
     ) -> Response:
         try:
-            result = command.run(force_cached=force_cached)
+            result = command.run(force_cached=force_cached, stream_csv=True)
         except ChartDataCacheLoadError as exc:
             return self.response_422(message=exc.message)
         except ChartDataQueryFailedError as exc:
@@ -485,19 +497,25 @@ class ChartRestApi(BaseSupersetModelRestApi):
 
         result_format = result["query_context"].result_format
         if result_format == ChartDataResultFormat.CSV:
-            # return the first result
+            # return the first result, rendered while the response is sent
             data = result["queries"][0]["data"]
-            return CsvResponse(data, headers=generate_download_headers("csv"))
+            return CsvResponse(
+                stream_with_context(data), headers=generate_download_headers("csv")
+            )
 
         if result_format == ChartDataResultFormat.JSON:
-            response_data = simplejson.dumps(
-                {"result": result["queries"]},
-                default=json_int_dttm_ser,
-                ignore_nan=True,
-            )
+            with tracer.span("chart_data.serialize", result_format=result_format):
+                response_data = simplejson.dumps(
+                    {"result": result["queries"]},
+                    default=json_int_dttm_ser,
+                    ignore_nan=True,
+                )
             resp = make_response(response_data, 200)
             resp.headers["Content-Type"] = "application/json; charset=utf-8"
             return resp
+        if result_format == ChartDataResultFormat.ARROW:
+            return self.get_arrow_response(result["queries"])
+
         if result_format == ChartDataResultFormat.XLSX:
             sio = BytesIO()
             df = pandas.DataFrame(result["queries"][0]["data"])
@@ -511,6 +529,41 @@ class ChartRestApi(BaseSupersetModelRestApi):
 
         return self.response_400(message=f"Unsupported result_format: {result_format}")
 
+    @staticmethod
+    def get_arrow_response(queries: List[Dict[str, Any]]) -> Response:
+        """
+        Return query results as Arrow IPC streams, one per query, with the
+        remaining query payload (status, cache key, errors...) in the schema
+        metadata of each stream.
+        """
+        tables = []
+        for query in queries:
+            metadata = query.copy()
+            table = metadata.pop("data", None)
+            if not isinstance(table, pa.Table):
+                table = pa.Table.from_batches([], schema=pa.schema([]))
+            tables.append((table, metadata))
+        with tracer.span("chart_data.serialize", result_format="arrow"):
+            response_data = write_ipc_stream(tables)
+        resp = make_response(response_data, 200)
+        resp.headers["Content-Type"] = ARROW_STREAM_MIMETYPE
+        return resp
+
+    @staticmethod
+    def negotiate_result_format(query_context: QueryContext) -> None:
+        """
+        Serve Arrow to clients preferring it over JSON in their `Accept` header,
+        unless a result format other than the default was requested explicitly.
+        """
+        if (
+            query_context.result_format == ChartDataResultFormat.JSON
+            and request.accept_mimetypes.best_match(
+                ["application/json", ARROW_STREAM_MIMETYPE]
+            )
+            == ARROW_STREAM_MIMETYPE
+        ):
+            query_context.result_format = ChartDataResultFormat.ARROW
+
     @expose("/data", methods=["POST"])
     @protect()
     @statsd_metrics
@@ -518,6 +571,7 @@ class ChartRestApi(BaseSupersetModelRestApi):
         action=lambda self, *args, **kwargs: f"{self.__class__.__name__}.data",
         log_to_statsd=False,
     )
+    @tracer.traced("chart_data.request")
     def data(self) -> Response:
         """
         Takes a query context constructed in the client and returns payload
@@ -543,6 +597,10 @@ class ChartRestApi(BaseSupersetModelRestApi):
                 application/json:
                   schema:
                     $ref: "#/components/schemas/ChartDataResponseSchema"
+                application/vnd.apache.arrow.stream:
+                  schema:
+                    type: string
+                    format: binary
             202:
               description: Async job details
               content:
@@ -597,6 +655,7 @@ class ChartRestApi(BaseSupersetModelRestApi):
             result = command.run_async()
             return self.response(202, **result)
 
+        self.negotiate_result_format(query_context)
         return self.get_data_response(command)
 
     @expose("/data/<cache_key>", methods=["GET"])
@@ -607,6 +666,7 @@ class ChartRestApi(BaseSupersetModelRestApi):
         f".data_from_cache",
         log_to_statsd=False,
     )
+    @tracer.traced("chart_data.request")
     def data_from_cache(self, cache_key: str) -> Response:
         """
         Takes a query context cache key and returns payload
@@ -628,6 +688,10 @@ class ChartRestApi(BaseSupersetModelRestApi):
                 application/json:
                   schema:
                     $ref: "#/components/schemas/ChartDataResponseSchema"
+                application/vnd.apache.arrow.stream:
+                  schema:
+                    type: string
+                    format: binary
             400:
               $ref: '#/components/responses/400'
             401:
@@ -642,7 +706,7 @@ class ChartRestApi(BaseSupersetModelRestApi):
         command = ChartDataCommand()
         try:
             cached_data = command.load_query_context_from_cache(cache_key)
-            command.set_query_context(cached_data)
+            query_context = command.set_query_context(cached_data)
             command.validate()
         except ChartDataCacheLoadError:
             return self.response_404()
@@ -651,6 +715,7 @@ class ChartRestApi(BaseSupersetModelRestApi):
                 message=_("Request is incorrect: %(error)s", error=error.messages)
             )
 
+        self.negotiate_result_format(query_context)
         return self.get_data_response(command, True)
 
     @expose("/<pk>/cache_screenshot/", methods=["GET"])
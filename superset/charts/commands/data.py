@@ -20,7 +20,7 @@ from typing import Any, Dict
 from flask import Request
 from marshmallow import ValidationError
 
-from superset import cache
+from superset import app, cache
 from superset.charts.commands.exceptions import (
     ChartDataCacheLoadError,
     ChartDataQueryFailedError,
@@ -46,6 +46,7 @@ class ChartDataCommand(BaseCommand):
         # (also evals `force` property)
         cache_query_context = kwargs.get("cache", False)
         force_cached = kwargs.get("force_cached", False)
+        self._query_context.stream_csv = kwargs.get("stream_csv", False)
         try:
             payload = self._query_context.get_payload(
                 cache_query_context=cache_query_context, force_cached=force_cached
@@ -69,7 +70,23 @@ class ChartDataCommand(BaseCommand):
 
     def run_async(self) -> Dict[str, Any]:
         job_metadata = async_query_manager.init_job(self._async_channel_id)
-        load_chart_data_into_cache.delay(job_metadata, self._form_data)
+        dedup_key = None
+        if app.config["QUERY_SINGLE_FLIGHT_ENABLED"]:
+            # query cache keys include RLS and extra cache keys, so only jobs that
+            # would produce identical results are attached to each other, forced
+            # jobs only to forced jobs as the others may serve cached results
+            dedup_key = self._query_context.cache_key(
+                query_cache_keys=[
+                    self._query_context.query_cache_key(query)
+                    for query in self._query_context.queries
+                ],
+                force=self._query_context.force,
+            )
+            if not async_query_manager.attach_job(
+                dedup_key, job_metadata, app.config["QUERY_SINGLE_FLIGHT_LEASE_TIMEOUT"]
+            ):
+                return job_metadata
+        load_chart_data_into_cache.delay(job_metadata, self._form_data, dedup_key)
 
         return job_metadata
 
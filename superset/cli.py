@@ -586,6 +586,41 @@ def update_datasources_cache() -> None:
                 print("{}".format(str(ex)))
 
 
+@superset.command()
+@with_appcontext
+def rollup_logs() -> None:
+    """Roll up the logs into the activity tables"""
+    from superset.utils import activity
+
+    count = activity.rollup_logs(db.session)
+    click.secho(f"Rolled up {count} logs", fg="green")
+
+
+@superset.command()
+@with_appcontext
+@click.option(
+    "--retention-days",
+    "-r",
+    type=int,
+    help="Number of days of logs to keep, defaults to LOG_RETENTION_DAYS",
+)
+def prune_logs(retention_days: Optional[int]) -> None:
+    """Delete the rolled up logs older than the retention period"""
+    from superset.utils import activity
+
+    if retention_days is None:
+        retention_days = app.config["LOG_RETENTION_DAYS"]
+    if retention_days is None:
+        click.secho(
+            "Set --retention-days or LOG_RETENTION_DAYS to prune logs", fg="red"
+        )
+        return
+    count = activity.prune_logs(
+        db.session, retention_days, app.config["ACTIVITY_ROLLUP_RETENTION_DAYS"]
+    )
+    click.secho(f"Deleted {count} logs", fg="green")
+
+
 @superset.command()
 @with_appcontext
 @click.option(
@@ -15,10 +15,14 @@
 # specific language governing permissions and limitations
 # under the License.
 import logging
-from typing import Any, ClassVar, Dict, List, Optional, Union
+import time
+from functools import partial
+from typing import Any, ClassVar, Dict, Hashable, Iterator, List, Optional, Union
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+from flask import g
 from flask_babel import _
 
 from superset import app, db, is_feature_enabled
@@ -33,10 +37,21 @@ from superset.exceptions import (
     QueryObjectValidationError,
     SupersetException,
 )
-from superset.extensions import cache_manager, security_manager
+from superset.extensions import cache_manager, security_manager, tracer
 from superset.stats_logger import BaseStatsLogger
 from superset.utils import csv
-from superset.utils.cache import generate_cache_key, set_and_log_cache
+from superset.utils.arrow import df_to_arrow_table
+from superset.utils.cache import (
+    generate_cache_key,
+    get_cached_value_or_lease,
+    set_and_log_cache,
+    should_refresh,
+)
+from superset.utils.concurrency import (
+    get_database_key,
+    load_datasource_relationships,
+    run_concurrently,
+)
 from superset.utils.core import (
     ChartDataResultFormat,
     ChartDataResultType,
@@ -70,6 +85,8 @@ class QueryContext:
     custom_cache_timeout: Optional[int]
     result_type: ChartDataResultType
     result_format: ChartDataResultFormat
+    # render CSV data lazily, as an iterator of CSV chunks, rather than as a string
+    stream_csv: bool = False
 
     # TODO: Type datasource and query_object dictionary with TypedDict when it becomes
     #  a vanilla python type https://github.com/python/mypy/issues/5288
@@ -99,6 +116,38 @@ class QueryContext:
 
     def get_query_result(self, query_object: QueryObject) -> Dict[str, Any]:
         """Returns a pandas dataframe based on the query object"""
+        result = self.get_raw_query_result(query_object)
+        if not result["df"].empty:
+            with tracer.span("query_context.post_processing"):
+                result["df"] = query_object.exec_post_processing(result["df"])
+        return result
+
+    def get_raw_query_result(self, query_object: QueryObject) -> Dict[str, Any]:
+        """
+        Returns the result of the datasource query, before post processing.
+
+        If DATA_CACHE_RAW_RESULTS is set, query objects with post processing
+        operations cache the raw result under `raw_query_cache_key`, so that changing
+        only the post processing operations re-runs the pandas stage rather than the
+        datasource query.
+        """
+        raw_cache_key = (
+            self.raw_query_cache_key(query_object)
+            if config["DATA_CACHE_RAW_RESULTS"]
+            and query_object.post_processing
+            and cache_manager.data_cache
+            else None
+        )
+        if raw_cache_key and not self.force:
+            cache_value = cache_manager.data_cache.get(raw_cache_key)
+            if cache_value:
+                stats_logger.incr("loaded_from_raw_cache")
+                return {
+                    "query": cache_value["query"],
+                    "status": QueryStatus.SUCCESS,
+                    "error_message": None,
+                    "df": cache_value["df"],
+                }
 
         # Here, we assume that all the queries will use the same datasource, which is
         # a valid assumption for current setting. In the long term, we may
@@ -111,7 +160,7 @@ class QueryContext:
                 timestamp_format = dttm_col.python_date_format
 
         # The datasource here can be different backend but the interface is common
-        result = self.datasource.query(query_object.to_dict())
+        result = self.datasource.query(query_object.to_dict(), force=self.force)
 
         df = result.df
         # Transform the timestamp we received from database to pandas supported
@@ -131,7 +180,15 @@ class QueryContext:
                 self.df_metrics_to_num(df, query_object)
 
             df.replace([np.inf, -np.inf], np.nan, inplace=True)
-            df = query_object.exec_post_processing(df)
+
+        if raw_cache_key and result.status != QueryStatus.FAILED:
+            set_and_log_cache(
+                cache_manager.data_cache,
+                raw_cache_key,
+                {"df": df, "query": result.query},
+                self.cache_timeout,
+                self.datasource.uid,
+            )
 
         return {
             "query": result.query,
@@ -149,9 +206,22 @@ class QueryContext:
                 # will stay as strings if conversion fails
                 df[col] = df[col].infer_objects()
 
-    def get_data(self, df: pd.DataFrame,) -> Union[str, List[Dict[str, Any]]]:
+    def get_data(
+        self, df: pd.DataFrame,
+    ) -> Union[str, Iterator[str], List[Dict[str, Any]], pa.Table]:
+        if self.result_format == ChartDataResultFormat.ARROW:
+            return df_to_arrow_table(df)
+
         if self.result_format == ChartDataResultFormat.CSV:
             include_index = not isinstance(df.index, pd.RangeIndex)
+            if self.stream_csv:
+                return csv.stream_escaped_csv(
+                    csv.split_dataframe(df, config["CSV_EXPORT_BATCH_SIZE"]),
+                    stats_logger=stats_logger,
+                    metric_prefix="chart_data.csv_export",
+                    index=include_index,
+                    **config["CSV_EXPORT"],
+                )
             result = csv.df_to_escaped_csv(
                 df, index=include_index, **config["CSV_EXPORT"]
             )
@@ -159,18 +229,33 @@ class QueryContext:
 
         return df.to_dict(orient="records")
 
+    @tracer.traced("query_context.get_payload")
     def get_payload(
         self, cache_query_context: Optional[bool] = False, force_cached: bool = False,
     ) -> Dict[str, Any]:
         """Returns the query results with both metadata and data"""
+        tracer.current_span().set_attributes(
+            datasource=self.datasource.uid,
+            result_type=self.result_type,
+            queries=len(self.queries),
+        )
 
-        # Get all the payloads from the QueryObjects
-        query_results = [
-            get_query_results(
-                query_obj.result_type or self.result_type, self, query_obj, force_cached
-            )
-            for query_obj in self.queries
-        ]
+        # Get all the payloads from the QueryObjects, the queries are independent of
+        # each other so run them concurrently
+        load_datasource_relationships(self.datasource)
+        query_results = run_concurrently(
+            [
+                partial(
+                    get_query_results,
+                    query_obj.result_type or self.result_type,
+                    self,
+                    query_obj,
+                    force_cached,
+                )
+                for query_obj in self.queries
+            ],
+            [get_database_key(self.datasource)] * len(self.queries),
+        )
         return_value = {"queries": query_results}
 
         if cache_query_context:
@@ -214,24 +299,39 @@ class QueryContext:
         """
         Returns a QueryObject cache key for objects in self.queries
         """
-        extra_cache_keys = self.datasource.get_extra_cache_keys(query_obj.to_dict())
+        cache_key = (
+            query_obj.cache_key(**self._get_cache_key_extras(query_obj), **kwargs)
+            if query_obj
+            else None
+        )
+        return cache_key
 
+    def raw_query_cache_key(
+        self, query_obj: QueryObject, **kwargs: Any
+    ) -> Optional[str]:
+        """
+        Returns the cache key of the raw datasource result of objects in self.queries,
+        see `QueryObject.raw_cache_key`
+        """
         cache_key = (
-            query_obj.cache_key(
-                datasource=self.datasource.uid,
-                extra_cache_keys=extra_cache_keys,
-                rls=security_manager.get_rls_ids(self.datasource)
-                if is_feature_enabled("ROW_LEVEL_SECURITY")
-                and self.datasource.is_rls_supported
-                else [],
-                changed_on=self.datasource.changed_on,
-                **kwargs,
-            )
+            query_obj.raw_cache_key(**self._get_cache_key_extras(query_obj), **kwargs)
             if query_obj
             else None
         )
         return cache_key
 
+    def _get_cache_key_extras(self, query_obj: QueryObject) -> Dict[str, Any]:
+        extra_cache_keys = self.datasource.get_extra_cache_keys(query_obj.to_dict())
+        return {
+            "datasource": self.datasource.uid,
+            "extra_cache_keys": extra_cache_keys,
+            "rls": security_manager.get_rls_ids(self.datasource)
+            if is_feature_enabled("ROW_LEVEL_SECURITY")
+            and self.datasource.is_rls_supported
+            else [],
+            "changed_on": self.datasource.changed_on,
+        }
+
     @staticmethod
     def get_native_annotation_data(query_obj: QueryObject) -> Dict[str, Any]:
         annotation_data = {}
@@ -286,6 +386,14 @@ class QueryContext:
         except SupersetException as ex:
             raise QueryObjectValidationError(error_msg_from_exception(ex))
 
+    @staticmethod
+    def get_annotation_database_key(
+        annotation_layer: Dict[str, Any]
+    ) -> Optional[Hashable]:
+        """The database queried by the chart of a line or table annotation layer"""
+        chart = ChartDAO.find_by_id(annotation_layer["value"])
+        return get_database_key(chart.datasource) if chart else None
+
     def get_annotation_data(self, query_obj: QueryObject) -> Dict[str, Any]:
         """
 
@@ -293,22 +401,32 @@ class QueryContext:
         :return:
         """
         annotation_data: Dict[str, Any] = self.get_native_annotation_data(query_obj)
-        for annotation_layer in [
+        annotation_layers = [
             layer
             for layer in query_obj.annotation_layers
             if layer["sourceType"] in ("line", "table")
-        ]:
-            name = annotation_layer["name"]
-            annotation_data[name] = self.get_viz_annotation_data(
-                annotation_layer, self.force
-            )
+        ]
+        layers_data = run_concurrently(
+            [
+                partial(self.get_viz_annotation_data, annotation_layer, self.force)
+                for annotation_layer in annotation_layers
+            ],
+            [
+                self.get_annotation_database_key(annotation_layer)
+                for annotation_layer in annotation_layers
+            ],
+        )
+        for annotation_layer, layer_data in zip(annotation_layers, layers_data):
+            annotation_data[annotation_layer["name"]] = layer_data
         return annotation_data
 
+    @tracer.traced("query_context.get_df_payload")
     def get_df_payload(  # pylint: disable=too-many-statements,too-many-locals
         self, query_obj: QueryObject, force_cached: Optional[bool] = False,
     ) -> Dict[str, Any]:
         """Handles caching around the df payload retrieval"""
-        cache_key = self.query_cache_key(query_obj)
+        with tracer.span("query_context.cache_key"):
+            cache_key = self.query_cache_key(query_obj)
         logger.info("Cache key: %s", cache_key)
         is_loaded = False
         stacktrace = None
@@ -318,76 +436,104 @@ class QueryContext:
         query = ""
         annotation_data = {}
         error_message = None
-        if cache_key and cache_manager.data_cache and not self.force:
-            cache_value = cache_manager.data_cache.get(cache_key)
-            if cache_value:
-                stats_logger.incr("loading_from_cache")
-                try:
-                    df = cache_value["df"]
-                    query = cache_value["query"]
-                    annotation_data = cache_value.get("annotation_data", {})
-                    status = QueryStatus.SUCCESS
-                    is_loaded = True
-                    stats_logger.incr("loaded_from_cache")
-                except KeyError as ex:
-                    logger.exception(ex)
-                    logger.error(
-                        "Error reading cache: %s", error_msg_from_exception(ex)
+        lease = None
+        try:
+            if cache_key and cache_manager.data_cache and not self.force:
+                if force_cached:
+                    cache_value = cache_manager.data_cache.get(cache_key)
+                else:
+                    cache_value, lease = get_cached_value_or_lease(
+                        cache_manager.data_cache, cache_key
                     )
-                logger.info("Serving from cache")
+                if cache_value:
+                    # only the queries of the request can be refreshed in the
+                    # background, others, e.g. samples, are reloaded once they
+                    # expired
+                    if any(query is query_obj for query in self.queries):
+                        if should_refresh(
+                            cache_manager.data_cache, cache_key, cache_value
+                        ):
+                            self.enqueue_cache_refresh(query_obj)
+                    elif cache_value.get("expires_at", float("inf")) <= time.time():
+                        cache_value = None
+                if cache_value:
+                    stats_logger.incr("loading_from_cache")
+                    try:
+                        df = cache_value["df"]
+                        query = cache_value["query"]
+                        annotation_data = cache_value.get("annotation_data", {})
+                        status = QueryStatus.SUCCESS
+                        is_loaded = True
+                        stats_logger.incr("loaded_from_cache")
+                    except KeyError as ex:
+                        logger.exception(ex)
+                        logger.error(
+                            "Error reading cache: %s", error_msg_from_exception(ex)
+                        )
+                    logger.info("Serving from cache")
 
-        if force_cached and not is_loaded:
-            logger.warning(
-                "force_cached (QueryContext): value not found for key %s", cache_key
-            )
-            raise CacheLoadError("Error loading data from cache")
-
-        if query_obj and not is_loaded:
-            try:
-                invalid_columns = [
-                    col
-                    for col in query_obj.columns
-                    + query_obj.groupby
-                    + get_column_names_from_metrics(query_obj.metrics or [])
-                    if col not in self.datasource.column_names and col != DTTM_ALIAS
-                ]
-                if invalid_columns:
-                    raise QueryObjectValidationError(
-                        _(
-                            "Columns missing in datasource: %(invalid_columns)s",
-                            invalid_columns=invalid_columns,
+            if force_cached and not is_loaded:
+                logger.warning(
+                    "force_cached (QueryContext): value not found for key %s", cache_key
+                )
+                raise CacheLoadError("Error loading data from cache")
+
+            if query_obj and not is_loaded:
+                try:
+                    invalid_columns = [
+                        col
+                        for col in query_obj.columns
+                        + query_obj.groupby
+                        + get_column_names_from_metrics(query_obj.metrics or [])
+                        if col not in self.datasource.column_names and col != DTTM_ALIAS
+                    ]
+                    if invalid_columns:
+                        raise QueryObjectValidationError(
+                            _(
+                                "Columns missing in datasource: %(invalid_columns)s",
+                                invalid_columns=invalid_columns,
+                            )
                         )
-                    )
-                query_result = self.get_query_result(query_obj)
-                status = query_result["status"]
-                query = query_result["query"]
-                error_message = query_result["error_message"]
-                df = query_result["df"]
-                annotation_data = self.get_annotation_data(query_obj)
-
-                if status != QueryStatus.FAILED:
-                    stats_logger.incr("loaded_from_source")
-                    if not self.force:
-                        stats_logger.incr("loaded_from_source_without_force")
-                    is_loaded = True
-            except QueryObjectValidationError as ex:
-                error_message = str(ex)
-                status = QueryStatus.FAILED
-            except Exception as ex:  # pylint: disable=broad-except
-                logger.exception(ex)
-                if not error_message:
+                    query_result = self.get_query_result(query_obj)
+                    status = query_result["status"]
+                    query = query_result["query"]
+                    error_message = query_result["error_message"]
+                    df = query_result["df"]
+                    annotation_data = self.get_annotation_data(query_obj)
+
+                    if status != QueryStatus.FAILED:
+                        stats_logger.incr("loaded_from_source")
+                        if not self.force:
+                            stats_logger.incr("loaded_from_source_without_force")
+                        is_loaded = True
+                except QueryObjectValidationError as ex:
                     error_message = str(ex)
-                status = QueryStatus.FAILED
-                stacktrace = get_stacktrace()
-
-            if is_loaded and cache_key and status != QueryStatus.FAILED:
-                set_and_log_cache(
-                    cache_manager.data_cache,
-                    cache_key,
-                    {"df": df, "query": query, "annotation_data": annotation_data},
-                    self.cache_timeout,
-                    self.datasource.uid,
-                )
+                    status = QueryStatus.FAILED
+                except Exception as ex:  # pylint: disable=broad-except
+                    logger.exception(ex)
+                    if not error_message:
+                        error_message = str(ex)
+                    status = QueryStatus.FAILED
+                    stacktrace = get_stacktrace()
+
+                if is_loaded and cache_key and status != QueryStatus.FAILED:
+                    set_and_log_cache(
+                        cache_manager.data_cache,
+                        cache_key,
+                        {"df": df, "query": query, "annotation_data": annotation_data},
+                        self.cache_timeout,
+                        self.datasource.uid,
+                        stale_timeout=config["DATA_CACHE_STALE_TIMEOUT"],
+                    )
+        finally:
+            if lease:
+                lease.release()
+        tracer.current_span().set_attributes(
+            datasource=self.datasource.uid,
+            is_cached=cache_value is not None,
+            rows=len(df.index),
+            status=status,
+        )
         return {
             "cache_key": cache_key,
             "cached_dttm": cache_value["dttm"] if cache_value is not None else None,
@@ -402,12 +548,32 @@ class QueryContext:
             "rowcount": len(df.index),
         }
 
+    def enqueue_cache_refresh(self, query_obj: QueryObject) -> None:
+        """Refresh the cached data of a query of the request in a Celery worker"""
+        # pylint: disable=import-outside-toplevel
+        from superset.tasks.async_queries import refresh_chart_data_cache
+
+        query_context = {
+            **self.cache_values,
+            "custom_cache_timeout": self.custom_cache_timeout,
+        }
+        try:
+            refresh_chart_data_cache.delay(
+                query_context,
+                self.queries.index(query_obj),
+                g.user.get_id() if getattr(g, "user", None) else None,
+            )
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.warning("Could not enqueue the refresh of the data cache")
+            logger.exception(ex)
+
     def raise_for_access(self) -> None:
         """
         Raise an exception if the user cannot access the resource.
 
         :raises SupersetSecurityException: If the user cannot access the resource
         """
-        for query in self.queries:
-            query.validate()
-        security_manager.raise_for_access(query_context=self)
+        with tracer.span("query_context.raise_for_access"):
+            for query in self.queries:
+                query.validate()
+            security_manager.raise_for_access(query_context=self)
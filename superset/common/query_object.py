@@ -294,26 +294,12 @@ class QueryObject:
         the use-provided inputs to bounds, which may be time-relative (as in
         "5 days ago" or "now").
         """
-        cache_dict = self.to_dict()
-        cache_dict.update(extra)
-
-        # TODO: the below KVs can all be cleaned up and moved to `to_dict()` at some
-        #  predetermined point in time when orgs are aware that the previously
-        #  chached results will be invalidated.
-        if not self.apply_fetch_values_predicate:
-            del cache_dict["apply_fetch_values_predicate"]
-        if self.datasource:
-            cache_dict["datasource"] = self.datasource.uid
+        cache_dict = self._get_query_cache_dict(**extra)
         if self.result_type:
             cache_dict["result_type"] = self.result_type
-        if self.time_range:
-            cache_dict["time_range"] = self.time_range
         if self.post_processing:
             cache_dict["post_processing"] = self.post_processing
 
-        for k in ["from_dttm", "to_dttm"]:
-            del cache_dict[k]
-
         annotation_fields = [
             "annotationType",
             "descriptionColumns",
@@ -336,6 +322,36 @@ class QueryObject:
         json_data = self.json_dumps(cache_dict, sort_keys=True)
         return hashlib.md5(json_data.encode("utf-8")).hexdigest()
 
+    def raw_cache_key(self, **extra: Any) -> str:
+        """
+        The raw cache key identifies the result returned by the datasource, before
+        post processing. It is made out of the fields that affect the query only, so
+        query objects that differ in post processing or annotations share it.
+        """
+        cache_dict = self._get_query_cache_dict(**extra)
+        if self.time_shift:
+            cache_dict["time_shift"] = str(self.time_shift)
+        json_data = self.json_dumps(cache_dict, sort_keys=True)
+        return "raw-" + hashlib.md5(json_data.encode("utf-8")).hexdigest()
+
+    def _get_query_cache_dict(self, **extra: Any) -> Dict[str, Any]:
+        cache_dict = self.to_dict()
+        cache_dict.update(extra)
+
+        # TODO: the below KVs can all be cleaned up and moved to `to_dict()` at some
+        #  predetermined point in time when orgs are aware that the previously
+        #  chached results will be invalidated.
+        if not self.apply_fetch_values_predicate:
+            del cache_dict["apply_fetch_values_predicate"]
+        if self.datasource:
+            cache_dict["datasource"] = self.datasource.uid
+        if self.time_range:
+            cache_dict["time_range"] = self.time_range
+
+        for k in ["from_dttm", "to_dttm"]:
+            del cache_dict[k]
+        return cache_dict
+
     @staticmethod
     def json_dumps(obj: Any, sort_keys: bool = False) -> str:
         return json.dumps(
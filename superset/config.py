@@ -58,11 +58,34 @@ if TYPE_CHECKING:
         SqlaTable,
     )
     from superset.models.core import Database  # pylint: disable=unused-import
+    from superset.utils.tracing import (  # pylint: disable=unused-import
+        AbstractSpanExporter,
+    )
 
 # Realtime stats logger, a StatsD implementation exists
 STATS_LOGGER = DummyStatsLogger()
+# Logs are committed to the metadata database by the request that logged them. To
+# commit them in batches from a background thread instead, see BufferedDBEventLogger:
+# EVENT_LOGGER = BufferedDBEventLogger(batch_size=100, flush_interval=5)
 EVENT_LOGGER = DBEventLogger()
 
+# Tracing of the stages of chart and SQL Lab queries, as nested spans with attributes
+# such as the datasource, the number of rows or whether the cache was hit. Disabled
+# unless exporters are set, e.g. to log the spans as JSON and report their durations:
+# from superset.utils.tracing import LogSpanExporter, StatsdSpanExporter
+# TRACING_EXPORTERS = [LogSpanExporter(min_duration_ms=1000), StatsdSpanExporter()]
+TRACING_EXPORTERS: List["AbstractSpanExporter"] = []
+
+# Account for the statements each request runs against the metadata database. Their
+# number and duration are reported through STATS_LOGGER, keyed by endpoint, as are
+# the statements executed at least METADATA_QUERY_REPEAT_THRESHOLD times with only
+# different parameters, usually relationships lazily loaded in a loop (N+1 queries),
+# which are also logged. In debug mode, they are returned in the
+# X-Superset-Metadata-Queries* headers of the responses. Meant as a debugging aid:
+# the statements of every request are normalized to be reported.
+METADATA_QUERY_ACCOUNTING_ENABLED = False
+METADATA_QUERY_REPEAT_THRESHOLD = 10
+
 SUPERSET_LOG_VIEW = True
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
@@ -503,9 +526,87 @@ CACHE_CONFIG: CacheConfig = {"CACHE_TYPE": "null"}
 # Cache for datasource metadata and query results
 DATA_CACHE_CONFIG: CacheConfig = {"CACHE_TYPE": "null"}
 
+# Serialization of the DataFrames stored in the data cache: "arrow" stores them as
+# Arrow IPC streams, which are much faster to load than pickled DataFrames and don't
+# depend on the pandas version; "pickle" lets the cache backend pickle them as is.
+# Frames Arrow can't represent faithfully are always pickled.
+DATA_CACHE_DATAFRAME_CODEC = "pickle"
+# Compression of Arrow encoded DataFrames: None, "lz4" or "zstd"
+DATA_CACHE_ARROW_COMPRESSION: Optional[str] = "lz4"
+# Also cache the results of chart data queries before their post processing
+# operations, so that changing only the operations doesn't query the datasource
+# again. Queries with post processing operations then write two entries to the data
+# cache.
+DATA_CACHE_RAW_RESULTS = False
+
+# Seconds the result of the prequery fetching the top series of series limited charts
+# on engines without joins is kept in the data cache, keyed by its SQL. Forced chart
+# refreshes run the prequery again. None disables the cache.
+SERIES_LIMIT_PREQUERY_CACHE_TIMEOUT: Optional[int] = 60 * 5
+
+# When set, the SQL generated for chart queries is kept in an in-process LRU cache of
+# up to COMPILED_SQL_CACHE_MAX_SIZE queries for this many seconds, keyed by query
+# object, dataset, row level security filters and `ExtraCache` keys. The cache is
+# invalidated when datasets, their columns and metrics or databases change, through
+# a version stored in CACHE_CONFIG: other processes only see the invalidation if that
+# backend is shared, else they rely on the timeout. None disables the cache.
+COMPILED_SQL_CACHE_TIMEOUT: Optional[int] = None
+COMPILED_SQL_CACHE_MAX_SIZE = 1000
+
 # store cache keys by datasource UID (via CacheKey) for custom processing/invalidation
 STORE_CACHE_KEYS_IN_METADATA_DB = False
 
+# Keep long-lived, pooled SQLAlchemy engines per database (keyed by database,
+# schema, effective user and DB_CONNECTION_MUTATOR output) for chart queries and
+# read-only SQL Lab queries, instead of opening a new connection for every query.
+# Pool checkouts, waits and overflow are reported through STATS_LOGGER.
+DB_ENGINE_POOL_ENABLED = False
+DB_ENGINE_POOL_SIZE = 5
+DB_ENGINE_POOL_MAX_OVERFLOW = 10
+# Seconds to wait for a connection when the pool and its overflow are exhausted
+DB_ENGINE_POOL_TIMEOUT = 30
+# Seconds after which a connection is recycled
+DB_ENGINE_POOL_RECYCLE = 60 * 60
+DB_ENGINE_POOL_PRE_PING = True
+# Seconds after which an unused engine, and its connections, are disposed of
+DB_ENGINE_POOL_IDLE_TIMEOUT = 60 * 10
+# Maximum number of engines kept per process, least recently used are disposed of
+DB_ENGINE_POOL_MAX_ENGINES = 100
+
+# Deduplicate identical in-flight chart queries (same query cache key) across web and
+# Celery workers sharing DATA_CACHE_CONFIG: the first worker holds a lease in the data
+# cache and runs the query, the others wait for its result. Identical async chart
+# jobs are attached to the running job instead of being enqueued again.
+QUERY_SINGLE_FLIGHT_ENABLED = False
+# Seconds after which a lease expires, e.g. when the worker holding it died
+QUERY_SINGLE_FLIGHT_LEASE_TIMEOUT = 60 * 5
+# Seconds to wait for an in-flight query before running it again
+QUERY_SINGLE_FLIGHT_WAIT_TIMEOUT = 60
+QUERY_SINGLE_FLIGHT_POLL_INTERVAL = 0.25
+
+# Stale-while-revalidate for the data cache of charts: entries are kept for
+# DATA_CACHE_STALE_TIMEOUT seconds past their cache timeout, during which they are
+# still served while a Celery worker refreshes them. Entries read at least
+# DATA_CACHE_REFRESH_AHEAD_MIN_HITS times are also refreshed within the last
+# DATA_CACHE_REFRESH_AHEAD_WINDOW seconds before they expire. None disables both.
+DATA_CACHE_STALE_TIMEOUT: Optional[int] = None
+DATA_CACHE_REFRESH_AHEAD_WINDOW = 60
+DATA_CACHE_REFRESH_AHEAD_MIN_HITS = 5
+# Seconds after which a refresh that didn't complete, e.g. as the query failed, can
+# be enqueued again
+DATA_CACHE_REFRESH_LEASE_TIMEOUT = 60 * 5
+
+# Independent queries of a single request, e.g. the queries of a chart data request,
+# are run concurrently by up to QUERY_CONCURRENCY_MAX_WORKERS threads. 1 runs them
+# one after the other.
+QUERY_CONCURRENCY_MAX_WORKERS = 4
+# Maximum number of those queries running at once against a single database, across
+# all the requests served by a process
+QUERY_CONCURRENCY_PER_DATABASE = 8
+# Maximum number of charts loaded at once by the dashboard chart data endpoint,
+# /api/v1/dashboard/<pk>/chart_data
+DASHBOARD_CHART_DATA_MAX_WORKERS = 8
+
 # CORS Options
 ENABLE_CORS = False
 CORS_OPTIONS: Dict[Any, Any] = {}
@@ -527,6 +628,10 @@ ALLOWED_EXTENSIONS = {*EXCEL_EXTENSIONS, *CSV_EXTENSIONS}
 # note: index option should not be overridden
 CSV_EXPORT = {"encoding": "utf-8"}
 
+# Number of rows rendered at a time when streaming CSV exports, for SQL Lab
+# results and the CSV result format of the chart data API
+CSV_EXPORT_BATCH_SIZE = 10000
+
 # ---------------------------------------------------
 # Time grain configurations
 # ---------------------------------------------------
@@ -578,6 +683,21 @@ DEFAULT_MODULE_DS_MAP = OrderedDict(
 ADDITIONAL_MODULE_DS_MAP: Dict[str, List[str]] = {}
 ADDITIONAL_MIDDLEWARE: List[Callable[..., Any]] = []
 
+# On-demand profiling of requests. When enabled, users allowed to read profiles
+# (admins by default) can profile a request by sending the X-Superset-Profile header
+# or the `_profile` query parameter, and PROFILER_SAMPLE_RATE of all the requests are
+# profiled. A profile holds the stacks of the request sampled every PROFILER_INTERVAL
+# seconds and its number of metadata database queries and cache calls. The id of the
+# profile is returned in the X-Superset-Profile-Id header, profiles are served by
+# /api/v1/profiler/. The latest PROFILER_MAX_PROFILES profiles are stored in
+# PROFILER_STORAGE_DIR, or in the cache for PROFILER_CACHE_TIMEOUT if not set.
+PROFILER_ENABLED = False
+PROFILER_SAMPLE_RATE = 0.0
+PROFILER_INTERVAL = 0.005
+PROFILER_MAX_PROFILES = 100
+PROFILER_STORAGE_DIR: Optional[str] = None
+PROFILER_CACHE_TIMEOUT = 60 * 60 * 24
+
 # 1) https://docs.python-guide.org/writing/logging/
 # 2) https://docs.python.org/2/library/logging.config.html
 
@@ -675,6 +795,15 @@ class CeleryConfig:  # pylint: disable=too-few-public-methods
             "task": "reports.prune_log",
             "schedule": crontab(minute=0, hour=0),
         },
+        "activity.rollup_logs": {
+            "task": "activity.rollup_logs",
+            "schedule": crontab(minute="*/10", hour="*"),
+        },
+        # deletes logs, see LOG_RETENTION_DAYS
+        # "activity.prune_logs": {
+        #     "task": "activity.prune_logs",
+        #     "schedule": crontab(minute=30, hour=0),
+        # },
     }
 
 
@@ -683,6 +812,26 @@ CELERY_CONFIG = CeleryConfig  # pylint: disable=invalid-name
 # Set celery config to None to disable all the above configuration
 # CELERY_CONFIG = None
 
+# The `cache-warmup` task loads the data of the charts of its strategy in the Celery
+# worker, as CACHE_WARMUP_USER and up to CACHE_WARMUP_MAX_WORKERS charts at once
+# (QUERY_CONCURRENCY_PER_DATABASE still applies). As cache keys depend on the row
+# level security filters of the user, warm up as a user without any. When disabled,
+# the explore URL of each chart is fetched from the web server instead, one by one.
+CACHE_WARMUP_IN_PROCESS = True
+CACHE_WARMUP_USER = "admin"
+CACHE_WARMUP_MAX_WORKERS = 4
+
+# The `activity.rollup_logs` task rolls up the logs table into the per user and
+# hourly activity read by the recent activity view and the top_n_dashboards warm up
+# strategy, in place of the logs themselves. Logs are rolled up once they are
+# ACTIVITY_ROLLUP_LAG seconds old. The `activity.prune_logs` task, which isn't
+# scheduled by default, deletes the rolled up logs older than LOG_RETENTION_DAYS
+# (never if None), and the rolled up activity older than
+# ACTIVITY_ROLLUP_RETENTION_DAYS (never if None).
+ACTIVITY_ROLLUP_LAG = 60 * 5
+LOG_RETENTION_DAYS: Optional[int] = None
+ACTIVITY_ROLLUP_RETENTION_DAYS: Optional[int] = 365
+
 # Additional static HTTP headers to be served by your Superset server. Note
 # Flask-Talisman applies the relevant security HTTP headers.
 #
@@ -782,6 +931,14 @@ RESULTS_BACKEND: Optional[BaseCache] = None
 # in order to disable should breaking issues be discovered.
 RESULTS_BACKEND_USE_MSGPACK = True
 
+# Fetch the results of async SQL Lab queries in batches of
+# RESULTS_BACKEND_CHUNK_SIZE rows and store each batch in the results backend as its
+# own Arrow IPC chunk, so that Celery worker memory is bounded by the chunk size
+# rather than the result size. /superset/results/<key>/ then only loads the chunks
+# holding the requested rows.
+RESULTS_BACKEND_CHUNKED = False
+RESULTS_BACKEND_CHUNK_SIZE = 10000
+
 # The S3 bucket where you want to store your external hive tables created
 # from CSV files. For example, 'companyname-superset'
 CSV_TO_HIVE_UPLOAD_S3_BUCKET = None
@@ -1081,6 +1238,23 @@ TALISMAN_CONFIG = {
 # }
 RLS_FORM_QUERY_REL_FIELDS: Optional[Dict[str, List[List[Any]]]] = None
 
+# Row level security filters are resolved once per request for a given role set and
+# table. When set, they are also cached for this many seconds in CACHE_CONFIG, and
+# invalidated when filters, roles or user roles change. The cache backend must be
+# shared by all the web and Celery workers (e.g. Redis) for the invalidation to reach
+# them. None disables the cross-request cache.
+RLS_FILTERS_CACHE_TIMEOUT: Optional[int] = None
+
+# When set, access checks (e.g. `can_access`, `raise_for_access`) are resolved against
+# a snapshot of the permissions of the roles of the user, built with a single query
+# and kept in an in-process LRU cache of up to PERMISSION_CACHE_MAX_SIZE role sets
+# for this many seconds. Snapshots are invalidated when the permissions of roles
+# change, through a version stored in CACHE_CONFIG: other processes only see the
+# invalidation if that backend is shared, else they rely on the timeout. None
+# disables the cache.
+PERMISSION_CACHE_TIMEOUT: Optional[int] = None
+PERMISSION_CACHE_MAX_SIZE = 1000
+
 #
 # Flask session cookie options
 #
@@ -382,10 +382,12 @@ class BaseDatasource(
         understand what is taking place behind the scene"""
         raise NotImplementedError()
 
-    def query(self, query_obj: QueryObjectDict) -> QueryResult:
+    def query(self, query_obj: QueryObjectDict, force: bool = False) -> QueryResult:
         """Executes the query and returns a dataframe
 
         query_obj is a dictionary representing Superset's query interface.
+        force is set when the caller bypasses its caches, e.g. a forced chart
+        refresh, so that intermediate results aren't loaded from caches either.
         Should return a ``superset.models.helpers.QueryResult``
         """
         raise NotImplementedError()
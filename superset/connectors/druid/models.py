@@ -1382,7 +1382,9 @@ class DruidDatasource(Model, BaseDatasource):
         df[columns] = df[columns].fillna(NULL_STRING).astype("unicode")
         return df
 
-    def query(self, query_obj: QueryObjectDict) -> QueryResult:
+    def query(  # pylint: disable=unused-argument
+        self, query_obj: QueryObjectDict, force: bool = False
+    ) -> QueryResult:
         qry_start_dttm = datetime.now()
         client = self.cluster.get_pydruid_client()
         query_str = self.get_query_str(client=client, query_obj=query_obj, phase=2)
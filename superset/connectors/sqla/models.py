@@ -27,7 +27,7 @@ from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Tuple, Union
 import pandas as pd
 import sqlalchemy as sa
 import sqlparse
-from flask import escape, Markup
+from flask import escape, has_app_context, Markup
 from flask_appbuilder import Model
 from flask_babel import lazy_gettext as _
 from jinja2.exceptions import TemplateError
@@ -47,7 +47,16 @@ from sqlalchemy import (
     Table,
     Text,
 )
-from sqlalchemy.orm import backref, Query, relationship, RelationshipProperty, Session
+from sqlalchemy.engine.base import Connection
+from sqlalchemy.orm import (
+    backref,
+    Mapper,
+    object_session,
+    Query,
+    relationship,
+    RelationshipProperty,
+    Session,
+)
 from sqlalchemy.schema import UniqueConstraint
 from sqlalchemy.sql import column, ColumnElement, literal_column, table, text
 from sqlalchemy.sql.elements import ColumnClause
@@ -64,6 +73,7 @@ from superset.exceptions import (
     SupersetGenericDBErrorException,
     SupersetSecurityException,
 )
+from superset.extensions import cache_manager, tracer
 from superset.jinja_context import (
     BaseTemplateProcessor,
     ExtraCache,
@@ -76,7 +86,9 @@ from superset.result_set import SupersetResultSet
 from superset.sql_parse import ParsedQuery
 from superset.typing import AdhocMetric, Metric, OrderBy, QueryObjectDict
 from superset.utils import core as utils
+from superset.utils.cache import generate_cache_key, set_and_log_cache
 from superset.utils.core import GenericDataType, remove_duplicates
+from superset.utils.versioned_cache import bump_version, get_version, VersionedLRUCache
 
 config = app.config
 metadata = Model.metadata  # pylint: disable=no-member
@@ -84,6 +96,14 @@ logger = logging.getLogger(__name__)
 
 VIRTUAL_TABLE_ALIAS = "virtual_table"
 
+# cache key of the version of the datasets and databases, SQL compiled for older
+# versions is ignored
+COMPILED_SQL_VERSION_CACHE_KEY = "compiled_sql_version"
+
+
+def _is_null(value: Any) -> bool:
+    return pd.api.types.is_scalar(value) and pd.isna(value)
+
 
 class SqlaQuery(NamedTuple):
     extra_cache_keys: List[Any]
@@ -98,6 +118,10 @@ class QueryStringExtended(NamedTuple):
     sql: str
 
 
+# SQL generated for query objects, see `SqlaTable.get_query_str_extended`
+compiled_sql_cache: VersionedLRUCache[str, QueryStringExtended] = VersionedLRUCache()
+
+
 @dataclass
 class MetadataResult:
     added: List[str] = field(default_factory=list)
@@ -127,7 +151,9 @@ class AnnotationDatasource(BaseDatasource):
         "changed_by_fk",
     ]
 
-    def query(self, query_obj: QueryObjectDict) -> QueryResult:
+    def query(  # pylint: disable=unused-argument
+        self, query_obj: QueryObjectDict, force: bool = False
+    ) -> QueryResult:
         error_message = None
         qry = db.session.query(Annotation)
         qry = qry.filter(Annotation.layer_id == query_obj["filter"][0]["val"])
@@ -752,7 +778,7 @@ class SqlaTable(  # pylint: disable=too-many-public-methods,too-many-instance-at
         if self.fetch_values_predicate:
             qry = qry.where(self.get_fetch_values_predicate())
 
-        engine = self.database.get_sqla_engine()
+        engine = self.database.get_sqla_engine(pooled=True)
         sql = "{}".format(qry.compile(engine, compile_kwargs={"literal_binds": True}))
         sql = self.mutate_query_from_config(sql)
 
@@ -772,19 +798,89 @@ class SqlaTable(  # pylint: disable=too-many-public-methods,too-many-instance-at
     def get_template_processor(self, **kwargs: Any) -> BaseTemplateProcessor:
         return get_template_processor(table=self, database=self.database, **kwargs)
 
-    def get_query_str_extended(self, query_obj: QueryObjectDict) -> QueryStringExtended:
-        sqlaq = self.get_sqla_query(**query_obj)
+    def get_query_str_extended(
+        self, query_obj: QueryObjectDict, force: bool = False
+    ) -> QueryStringExtended:
+        """
+        Generate the SQL of a query object, from the process wide compiled SQL cache
+        when `COMPILED_SQL_CACHE_TIMEOUT` is set.
+
+        The SQL is cached by query object, dataset, row level security filters and
+        `ExtraCache` keys. The SQL of queries filtering on the result of a prequery
+        isn't cached, as the result of the prequery may change.
+
+        :param query_obj: the query object
+        :param force: run the series limit prequery rather than loading its result
+               from the data cache
+        :return: the SQL of the query and of its prequeries
+        """
+        timeout = config["COMPILED_SQL_CACHE_TIMEOUT"]
+        if timeout is None:
+            return self._compile_sqla_query(
+                self.get_sqla_query(**query_obj, force=force)
+            )
+
+        stats_logger = config["STATS_LOGGER"]
+        extra_cache_keys, sqlaq = self._get_extra_cache_keys(query_obj, force)
+        try:
+            cache_key = self._get_compiled_sql_cache_key(query_obj, extra_cache_keys)
+        except (TypeError, ValueError):
+            # query objects holding values that can't be serialized aren't cached
+            cache_key = None
+        version = get_compiled_sql_version()
+        if cache_key:
+            query_str_ext = compiled_sql_cache.get(cache_key, version)
+            if query_str_ext is not None:
+                stats_logger.incr("compiled_sql.cache_hit")
+                tracer.current_span().set_attribute("is_cached", True)
+                return query_str_ext
+
+        stats_logger.incr("compiled_sql.cache_miss")
+        query_str_ext = self._compile_sqla_query(
+            sqlaq or self.get_sqla_query(**query_obj, force=force)
+        )
+        if cache_key and not query_str_ext.prequeries:
+            compiled_sql_cache.set(
+                cache_key,
+                version,
+                query_str_ext,
+                timeout=timeout,
+                max_size=config["COMPILED_SQL_CACHE_MAX_SIZE"],
+            )
+        return query_str_ext
+
+    def _compile_sqla_query(self, sqlaq: SqlaQuery) -> QueryStringExtended:
         sql = self.database.compile_sqla_query(sqlaq.sqla_query)
-        sql = sqlparse.format(sql, reindent=True)
         sql = self.mutate_query_from_config(sql)
         return QueryStringExtended(
             labels_expected=sqlaq.labels_expected, sql=sql, prequeries=sqlaq.prequeries
         )
 
+    def _get_compiled_sql_cache_key(
+        self, query_obj: QueryObjectDict, extra_cache_keys: List[Hashable]
+    ) -> str:
+        cache_dict = {
+            "query_obj": query_obj,
+            "datasource": self.uid,
+            "changed_on": self.changed_on,
+            "extra_cache_keys": extra_cache_keys,
+            # the clauses rather than the ids, as clauses of filters can be edited
+            "rls": security_manager.get_rls_filters(self)
+            if is_feature_enabled("ROW_LEVEL_SECURITY")
+            else [],
+            # the SQL_QUERY_MUTATOR may add the user to the query
+            "username": utils.get_username() if config["SQL_QUERY_MUTATOR"] else None,
+        }
+        return generate_cache_key(cache_dict, "compiled_sql_")
+
     def get_query_str(self, query_obj: QueryObjectDict) -> str:
         query_str_ext = self.get_query_str_extended(query_obj)
         all_queries = query_str_ext.prequeries + [query_str_ext.sql]
-        return ";\n\n".join(all_queries) + ";"
+        # only the SQL shown to users is pretty printed
+        return (
+            ";\n\n".join(sqlparse.format(sql, reindent=True) for sql in all_queries)
+            + ";"
+        )
 
     def get_sqla_table(self) -> TableClause:
         tbl = table(self.table_name)
@@ -963,6 +1059,7 @@ class SqlaTable(  # pylint: disable=too-many-public-methods,too-many-instance-at
         order_desc: bool = True,
         is_rowcount: bool = False,
         apply_fetch_values_predicate: bool = False,
+        force: bool = False,
     ) -> SqlaQuery:
         """Querying any sqla table from this common interface"""
         template_kwargs = {
@@ -1351,7 +1448,7 @@ class SqlaTable(  # pylint: disable=too-many-public-methods,too-many-instance-at
                     "order_desc": True,
                 }
 
-                result = self.query(prequery_obj)
+                result = self._get_prequery_result(prequery_obj, force)
                 prequeries.append(result.query)
                 dimensions = [
                     c
@@ -1402,24 +1499,128 @@ class SqlaTable(  # pylint: disable=too-many-public-methods,too-many-instance-at
             )
         return ob
 
-    def _get_top_groups(  # pylint: disable=no-self-use
+    def _get_top_groups(
         self,
         df: pd.DataFrame,
         dimensions: List[str],
         groupby_exprs: "OrderedDict[str, Any]",
     ) -> ColumnElement:
-        groups = []
-        for _unused, row in df.iterrows():
-            group = []
-            for dimension in dimensions:
-                group.append(groupby_exprs[dimension] == row[dimension])
-            groups.append(and_(*group))
+        """
+        Build the predicate restricting a query to the groups returned by the series
+        limit prequery. The predicate is built column-wise rather than as an `OR` of
+        one `AND` per group: a tuple `IN` list if the engine supports it, else `IN`
+        lists of the last dimension nested under the distinct values of the leading
+        dimensions.
+
+        :param df: the result of the prequery
+        :param dimensions: the columns of the prequery holding the groups
+        :param groupby_exprs: the SQLA expression of each dimension
+        :return: the predicate matching the groups
+        """
+        exprs = [groupby_exprs[dimension] for dimension in dimensions]
+        values = [
+            [None if _is_null(value) else value for value in df[dimension].tolist()]
+            for dimension in dimensions
+        ]
+        # deduplicate the groups while keeping their order
+        groups = list(dict.fromkeys(zip(*values)))
+        if not groups:
+            return or_()
+
+        if (
+            len(exprs) > 1
+            and self.database.db_engine_spec.allows_tuple_in
+            and all(value is not None for group in groups for value in group)
+        ):
+            return sa.tuple_(*exprs).in_(groups)
+        return self._get_groups_predicate(exprs, groups)
+
+    @classmethod
+    def _get_groups_predicate(
+        cls, exprs: List[Any], groups: List[Tuple[Any, ...]]
+    ) -> ColumnElement:
+        if len(exprs) == 1:
+            values = [group[0] for group in groups]
+            non_null_values = [value for value in values if value is not None]
+            predicates = []
+            if len(non_null_values) == 1:
+                predicates.append(exprs[0] == non_null_values[0])
+            elif non_null_values:
+                predicates.append(exprs[0].in_(non_null_values))
+            if len(non_null_values) < len(values):
+                predicates.append(exprs[0].is_(None))
+            return or_(*predicates) if len(predicates) > 1 else predicates[0]
+
+        subgroups: Dict[Any, List[Tuple[Any, ...]]] = OrderedDict()
+        for group in groups:
+            subgroups.setdefault(group[0], []).append(group[1:])
+        return or_(
+            *[
+                and_(exprs[0] == value, cls._get_groups_predicate(exprs[1:], rest))
+                for value, rest in subgroups.items()
+            ]
+        )
+
+    def _get_prequery_result(
+        self, prequery_obj: QueryObjectDict, force: bool = False
+    ) -> QueryResult:
+        """
+        Run the series limit prequery, or load its result from the data cache when
+        `SERIES_LIMIT_PREQUERY_CACHE_TIMEOUT` is set.
 
-        return or_(*groups)
+        :param prequery_obj: the query object of the prequery
+        :param force: run the prequery regardless of the cache, and cache its result
+        :return: the result of the prequery
+        """
+        qry_start_dttm = datetime.now()
+        query_str_ext = self.get_query_str_extended(prequery_obj)
+        timeout = config["SERIES_LIMIT_PREQUERY_CACHE_TIMEOUT"]
+        if timeout is None or not cache_manager.data_cache:
+            return self._run_query(query_str_ext, qry_start_dttm)
+
+        stats_logger = config["STATS_LOGGER"]
+        cache_key = generate_cache_key(
+            {
+                "database_id": self.database.id,
+                "schema": self.schema,
+                "sql": query_str_ext.sql,
+            },
+            "prequery_",
+        )
+        cache_value = None
+        if not force:
+            try:
+                cache_value = cache_manager.data_cache.get(cache_key)
+            except Exception as ex:  # pylint: disable=broad-except
+                logger.warning("Could not load prequery result from cache: %s", ex)
+        if cache_value:
+            stats_logger.incr("prequery.cache_hit")
+            return QueryResult(
+                df=cache_value["df"],
+                query=query_str_ext.sql,
+                duration=datetime.now() - qry_start_dttm,
+            )
 
-    def query(self, query_obj: QueryObjectDict) -> QueryResult:
+        stats_logger.incr("prequery.cache_miss")
+        result = self._run_query(query_str_ext, qry_start_dttm)
+        if result.status == utils.QueryStatus.SUCCESS:
+            set_and_log_cache(
+                cache_manager.data_cache, cache_key, {"df": result.df}, timeout
+            )
+        return result
+
+    def query(self, query_obj: QueryObjectDict, force: bool = False) -> QueryResult:
         qry_start_dttm = datetime.now()
-        query_str_ext = self.get_query_str_extended(query_obj)
+        with tracer.span("sqla.query", datasource=self.uid) as span:
+            with tracer.span("sqla.get_query_str"):
+                query_str_ext = self.get_query_str_extended(query_obj, force)
+            result = self._run_query(query_str_ext, qry_start_dttm)
+            span.set_attributes(rows=len(result.df.index), status=result.status)
+        return result
+
+    def _run_query(
+        self, query_str_ext: QueryStringExtended, qry_start_dttm: datetime
+    ) -> QueryResult:
         sql = query_str_ext.sql
         status = utils.QueryStatus.SUCCESS
         errors = None
@@ -1604,17 +1805,78 @@ class SqlaTable(  # pylint: disable=too-many-public-methods,too-many-instance-at
         :param query_obj: query object to analyze
         :return: The extra cache keys
         """
+        return self._get_extra_cache_keys(query_obj)[0]
+
+    def _get_extra_cache_keys(
+        self, query_obj: QueryObjectDict, force: bool = False
+    ) -> Tuple[List[Hashable], Optional[SqlaQuery]]:
+        """
+        :param query_obj: query object to analyze
+        :param force: see `get_query_str_extended`
+        :return: The extra cache keys, along with the query when it had to be
+                 generated to find them
+        """
         extra_cache_keys = super().get_extra_cache_keys(query_obj)
+        sqla_query = None
         if self.has_extra_cache_key_calls(query_obj):
-            sqla_query = self.get_sqla_query(**query_obj)
+            sqla_query = self.get_sqla_query(**query_obj, force=force)
             extra_cache_keys += sqla_query.extra_cache_keys
-        return extra_cache_keys
+        return extra_cache_keys, sqla_query
 
 
 sa.event.listen(SqlaTable, "after_insert", security_manager.set_perm)
 sa.event.listen(SqlaTable, "after_update", security_manager.set_perm)
 
 
+def get_compiled_sql_version() -> str:
+    """
+    Return the version of the datasets and databases the SQL in the compiled SQL
+    cache was generated from, read once per request.
+    """
+    return get_version(COMPILED_SQL_VERSION_CACHE_KEY, "compiled_sql_version")
+
+
+def invalidate_compiled_sql() -> None:
+    """
+    Invalidate the SQL cached by all the processes sharing the cache backend, and
+    by the current one.
+    """
+    compiled_sql_cache.clear()
+    if has_app_context():
+        bump_version(COMPILED_SQL_VERSION_CACHE_KEY, "compiled_sql_version")
+        config["STATS_LOGGER"].incr("compiled_sql.invalidated")
+
+
+def on_dataset_change(  # pylint: disable=unused-argument
+    mapper: Mapper, connection: Connection, target: Model
+) -> None:
+    """
+    Flag the session of a changed dataset, column, metric or database, for the
+    compiled SQL cache to be invalidated once the session is committed.
+    """
+    session = object_session(target)
+    if session:
+        session.info["compiled_sql_changed"] = True
+
+
+def on_session_commit(session: Session) -> None:
+    if session.info.pop("compiled_sql_changed", False):
+        invalidate_compiled_sql()
+
+
+sa.event.listen(SqlaTable, "after_update", on_dataset_change)
+sa.event.listen(SqlaTable, "after_delete", on_dataset_change)
+sa.event.listen(TableColumn, "after_insert", on_dataset_change)
+sa.event.listen(TableColumn, "after_update", on_dataset_change)
+sa.event.listen(TableColumn, "after_delete", on_dataset_change)
+sa.event.listen(SqlMetric, "after_insert", on_dataset_change)
+sa.event.listen(SqlMetric, "after_update", on_dataset_change)
+sa.event.listen(SqlMetric, "after_delete", on_dataset_change)
+sa.event.listen(Database, "after_update", on_dataset_change)
+sa.event.listen(Database, "after_delete", on_dataset_change)
+sa.event.listen(Session, "after_commit", on_session_commit)
+
+
 RLSFilterRoles = Table(
     "rls_filter_roles",
     metadata,
@@ -1653,3 +1915,20 @@ class RowLevelSecurityFilter(Model, AuditMixinNullable):
     )
 
     clause = Column(Text, nullable=False)
+
+
+# invalidate the cached row level security filters when filters, roles or the roles
+# of users change
+sa.event.listen(RowLevelSecurityFilter, "after_insert", security_manager.on_rls_change)
+sa.event.listen(RowLevelSecurityFilter, "after_update", security_manager.on_rls_change)
+sa.event.listen(RowLevelSecurityFilter, "after_delete", security_manager.on_rls_change)
+sa.event.listen(
+    security_manager.role_model, "after_delete", security_manager.on_rls_change
+)
+sa.event.listen(
+    security_manager.user_model.roles, "append", security_manager.on_user_roles_change
+)
+sa.event.listen(
+    security_manager.user_model.roles, "remove", security_manager.on_user_roles_change
+)
+sa.event.listen(Session, "after_commit", security_manager.on_session_commit)
@@ -116,6 +116,7 @@ MODEL_API_RW_METHOD_PERMISSION_MAP = {
     "data_from_cache": "read",
     "get_charts": "read",
     "get_datasets": "read",
+    "get_chart_data": "read",
 }
 
 EXTRA_FORM_DATA_APPEND_KEYS = {
@@ -18,10 +18,20 @@ import json
 import logging
 from datetime import datetime
 from io import BytesIO
-from typing import Any, Dict
+from typing import Any, Dict, Iterator
 from zipfile import is_zipfile, ZipFile
 
-from flask import g, make_response, redirect, request, Response, send_file, url_for
+import simplejson
+from flask import (
+    g,
+    make_response,
+    redirect,
+    request,
+    Response,
+    send_file,
+    stream_with_context,
+    url_for,
+)
 from flask_appbuilder.api import expose, protect, rison, safe
 from flask_appbuilder.models.sqla.interface import SQLAInterface
 from flask_babel import ngettext
@@ -35,6 +45,7 @@ from superset.commands.exceptions import CommandInvalidError
 from superset.commands.importers.v1.utils import get_contents_from_bundle
 from superset.constants import MODEL_API_RW_METHOD_PERMISSION_MAP, RouteMethod
 from superset.dashboards.commands.bulk_delete import BulkDeleteDashboardCommand
+from superset.dashboards.commands.chart_data import DashboardChartDataCommand
 from superset.dashboards.commands.create import CreateDashboardCommand
 from superset.dashboards.commands.delete import DeleteDashboardCommand
 from superset.dashboards.commands.exceptions import (
@@ -58,6 +69,7 @@ from superset.dashboards.filters import (
     FilterRelatedRoles,
 )
 from superset.dashboards.schemas import (
+    DashboardChartDataSchema,
     DashboardDatasetSchema,
     DashboardGetResponseSchema,
     DashboardPostSchema,
@@ -72,6 +84,7 @@ from superset.dashboards.schemas import (
 from superset.extensions import event_logger
 from superset.models.dashboard import Dashboard
 from superset.tasks.thumbnails import cache_dashboard_thumbnail
+from superset.utils.core import json_int_dttm_ser
 from superset.utils.screenshots import DashboardScreenshot
 from superset.utils.urls import get_url_path
 from superset.views.base import generate_download_headers
@@ -94,6 +107,7 @@ class DashboardRestApi(BaseSupersetModelRestApi):
         "bulk_delete",  # not using RouteMethod since locally defined
         "favorite_status",
         "get_charts",
+        "get_chart_data",
         "get_datasets",
     }
     resource_name = "dashboard"
@@ -172,6 +186,7 @@ class DashboardRestApi(BaseSupersetModelRestApi):
     chart_entity_response_schema = ChartEntityResponseSchema()
     dashboard_get_response_schema = DashboardGetResponseSchema()
     dashboard_dataset_schema = DashboardDatasetSchema()
+    dashboard_chart_data_schema = DashboardChartDataSchema()
 
     base_filters = [["slice", DashboardFilter, lambda: []]]
 
@@ -191,6 +206,7 @@ class DashboardRestApi(BaseSupersetModelRestApi):
     """ Override the name set for this collection of endpoints """
     openapi_spec_component_schemas = (
         ChartEntityResponseSchema,
+        DashboardChartDataSchema,
         DashboardGetResponseSchema,
         DashboardDatasetSchema,
         GetFavStarIdsSchema,
@@ -362,6 +378,79 @@ class DashboardRestApi(BaseSupersetModelRestApi):
         except DashboardNotFoundError:
             return self.response_404()
 
+    @expose("/<id_or_slug>/chart_data", methods=["POST"])
+    @protect()
+    @safe
+    @statsd_metrics
+    @event_logger.log_this_with_context(
+        action=lambda self, *args, **kwargs: f"{self.__class__.__name__}"
+        f".get_chart_data",
+        log_to_statsd=False,
+    )
+    def get_chart_data(self, id_or_slug: str) -> Response:
+        """Loads the data of the charts of a dashboard
+        ---
+        post:
+          description: >-
+            Load the data of the charts of a dashboard for the given filters, in a
+            single request. The payload of each chart is streamed back as a line
+            of newline delimited JSON as soon as it is loaded, in no particular
+            order.
+          parameters:
+          - in: path
+            schema:
+              type: string
+            name: id_or_slug
+          requestBody:
+            description: The charts to load and the filters to apply
+            required: false
+            content:
+              application/json:
+                schema:
+                  $ref: '#/components/schemas/DashboardChartDataSchema'
+          responses:
+            200:
+              description: >-
+                One JSON object per line, with the `chart_id` and HTTP like
+                `status` of each chart along with either its `result`, the payload
+                of `/superset/explore_json/`, or an error `message`
+              content:
+                application/x-ndjson:
+                  schema:
+                    type: string
+            400:
+              $ref: '#/components/responses/400'
+            401:
+              $ref: '#/components/responses/401'
+            404:
+              $ref: '#/components/responses/404'
+        """
+        try:
+            params = self.dashboard_chart_data_schema.load(request.json or {})
+        except ValidationError as error:
+            return self.response_400(message=error.messages)
+
+        command = DashboardChartDataCommand(
+            id_or_slug,
+            charts=params.get("charts"),
+            extra_filters=params.get("extra_filters"),
+            force=params["force"],
+        )
+        try:
+            command.validate()
+        except DashboardNotFoundError:
+            return self.response_404()
+
+        def generate() -> Iterator[str]:
+            for payload in command.run():
+                yield simplejson.dumps(
+                    payload, default=json_int_dttm_ser, ignore_nan=True
+                ) + "\n"
+
+        return Response(
+            stream_with_context(generate()), mimetype="application/x-ndjson"
+        )
+
     @expose("/", methods=["POST"])
     @protect()
     @safe
@@ -0,0 +1,175 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import logging
+from functools import partial
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from flask import current_app
+
+from superset import security_manager
+from superset.commands.base import BaseCommand
+from superset.connectors.base.models import BaseDatasource
+from superset.dashboards.dao import DashboardDAO
+from superset.exceptions import SupersetException, SupersetSecurityException
+from superset.models.dashboard import Dashboard
+from superset.models.slice import Slice
+from superset.utils.concurrency import (
+    get_database_key,
+    iter_concurrently,
+    load_datasource_relationships,
+)
+from superset.utils.core import error_msg_from_exception
+from superset.views.utils import get_time_range_endpoints
+from superset.viz import BaseViz, viz_types
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardChartDataCommand(BaseCommand):
+    """
+    Load the data of the charts of a dashboard, for a given filter state, in a
+    single request. Datasources shared by charts are loaded and access checked
+    once, and the queries of the charts run concurrently.
+    """
+
+    def __init__(
+        self,
+        id_or_slug: str,
+        charts: Optional[List[Dict[str, Any]]] = None,
+        extra_filters: Optional[List[Dict[str, Any]]] = None,
+        force: bool = False,
+    ):
+        self._id_or_slug = id_or_slug
+        self._charts = charts
+        self._extra_filters = extra_filters or []
+        self._force = force
+        self._dashboard: Optional[Dashboard] = None
+
+    def run(self) -> Iterator[Dict[str, Any]]:
+        """
+        :return: the payload of each chart, as soon as it is loaded. Payloads have
+                 the `chart_id` and HTTP like `status` of the chart along with
+                 either the `result` of the chart or an error `message`.
+        :raises DashboardNotFoundError: If the dashboard can't be found or accessed
+        """
+        if self._dashboard is None:
+            self.validate()
+        vizs: List[Tuple[int, BaseViz]] = []
+        for chart_id, payload in self._get_vizs():
+            if isinstance(payload, BaseViz):
+                vizs.append((chart_id, payload))
+            else:
+                yield payload
+
+        funcs = [partial(self._get_payload, chart_id, viz) for chart_id, viz in vizs]
+        database_keys = [get_database_key(viz.datasource) for _, viz in vizs]
+        for _, payload in iter_concurrently(
+            funcs,
+            database_keys,
+            max_workers=current_app.config["DASHBOARD_CHART_DATA_MAX_WORKERS"],
+        ):
+            yield payload
+
+    def validate(self) -> None:
+        self._dashboard = DashboardDAO.get_by_id_or_slug(self._id_or_slug)
+
+    def _get_vizs(self) -> Iterator[Tuple[int, Any]]:
+        """Yield the viz of each chart, or the error payload of the chart"""
+        slices = {slc.id: slc for slc in self._dashboard.slices}  # type: ignore
+        charts = self._charts
+        if charts is None:
+            charts = [{"id": chart_id} for chart_id in slices]
+
+        datasources: Dict[Tuple[str, int], Optional[BaseDatasource]] = {}
+        access_errors: Dict[Tuple[str, int], Optional[str]] = {}
+        for chart in charts:
+            chart_id = chart["id"]
+            slc: Optional[Slice] = slices.get(chart_id)
+            if not slc:
+                yield chart_id, self._error(
+                    chart_id, 404, "The chart is not part of the dashboard"
+                )
+                continue
+
+            # datasources shared by charts are loaded and checked once
+            key = (slc.datasource_type, slc.datasource_id)
+            if key not in datasources:
+                datasources[key] = slc.datasource
+                access_errors[key] = self._get_access_error(datasources[key])
+            datasource = datasources[key]
+            if not datasource:
+                yield chart_id, self._error(chart_id, 404, "Datasource not found")
+                continue
+            if access_errors[key]:
+                yield chart_id, self._error(chart_id, 403, access_errors[key])
+                continue
+
+            # charts of viz types only supported by the chart data API, e.g.
+            # echarts_timeseries, have no legacy viz to load their data with
+            if slc.viz_type not in viz_types:
+                yield chart_id, self._error(
+                    chart_id, 400, f"Unsupported chart type: {slc.viz_type}"
+                )
+                continue
+
+            form_data = slc.form_data.copy()
+            form_data["extra_filters"] = chart.get(
+                "extra_filters", self._extra_filters
+            )
+            if current_app.config["SIP_15_ENABLED"]:
+                form_data["time_range_endpoints"] = get_time_range_endpoints(
+                    form_data, slc, slc.id
+                )
+            try:
+                viz_obj = viz_types[slc.viz_type](
+                    datasource, form_data=form_data, force=self._force
+                )
+            except SupersetException as ex:
+                yield chart_id, self._error(chart_id, 400, str(ex))
+                continue
+            yield chart_id, viz_obj
+
+    @staticmethod
+    def _get_access_error(datasource: Optional[BaseDatasource]) -> Optional[str]:
+        if not datasource:
+            return None
+        try:
+            security_manager.raise_for_access(datasource=datasource)
+        except SupersetSecurityException as ex:
+            return ex.error.message
+        load_datasource_relationships(datasource)
+        return None
+
+    @staticmethod
+    def _error(chart_id: int, status: int, message: str) -> Dict[str, Any]:
+        return {"chart_id": chart_id, "status": status, "message": message}
+
+    @staticmethod
+    def _get_payload(chart_id: int, viz_obj: BaseViz) -> Dict[str, Any]:
+        try:
+            result = viz_obj.get_payload()
+        except SupersetException as ex:
+            return DashboardChartDataCommand._error(
+                chart_id, ex.status, error_msg_from_exception(ex)
+            )
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.exception(ex)
+            return DashboardChartDataCommand._error(
+                chart_id, 500, error_msg_from_exception(ex)
+            )
+        status = 400 if viz_obj.has_error(result) else 200
+        return {"chart_id": chart_id, "status": status, "result": result}
@@ -276,6 +276,34 @@ class GetFavStarIdsSchema(Schema):
     )
 
 
+extra_filters_description = (
+    "Filters applied to the charts on top of their own, in the legacy "
+    "`extra_filters` form data format, e.g. "
+    '`[{"col": "country", "op": "in", "val": ["France"]}]`'
+)
+
+
+class DashboardChartDataChartSchema(Schema):
+    id = fields.Integer(description="The chart id", required=True)
+    extra_filters = fields.List(
+        fields.Dict(),
+        description=f"{extra_filters_description}. Overrides the dashboard wide "
+        "filters for this chart.",
+    )
+
+
+class DashboardChartDataSchema(Schema):
+    charts = fields.List(
+        fields.Nested(DashboardChartDataChartSchema),
+        description="The charts to load, all the charts of the dashboard by default",
+    )
+    extra_filters = fields.List(fields.Dict(), description=extra_filters_description)
+    force = fields.Boolean(
+        description="Run the queries of the charts rather than loading cached data",
+        missing=False,
+    )
+
+
 class ImportV1DashboardSchema(Schema):
     dashboard_title = fields.String(required=True)
     description = fields.String(allow_none=True)
@@ -25,6 +25,7 @@ from typing import (
     Any,
     Callable,
     Dict,
+    Iterator,
     List,
     Match,
     NamedTuple,
@@ -37,6 +38,7 @@ from typing import (
 )
 
 import pandas as pd
+import pyarrow as pa
 import sqlparse
 from flask import g
 from flask_babel import gettext as __, lazy_gettext as _
@@ -252,6 +254,10 @@ class BaseEngineSpec:  # pylint: disable=too-many-public-methods
     allows_alias_in_orderby = True
     allows_sql_comments = True
 
+    # Whether row value IN predicates, e.g. `(a, b) IN ((1, 2), (3, 4))`, are
+    # supported
+    allows_tuple_in = False
+
     # Whether ORDER BY clause can use aliases created in SELECT
     # that are the same as a source column
     allows_alias_to_source_column = True
@@ -480,6 +486,51 @@ class BaseEngineSpec:  # pylint: disable=too-many-public-methods
         except Exception as ex:
             raise cls.get_dbapi_mapped_exception(ex)
 
+    @classmethod
+    def fetch_data_batches(
+        cls, cursor: Any, batch_size: int, limit: Optional[int] = None
+    ) -> Iterator[List[Tuple[Any, ...]]]:
+        """
+        Fetch the result of a query in batches, so that the whole result never has
+        to be held in memory.
+
+        :param cursor: Cursor instance
+        :param batch_size: Maximum number of rows per batch
+        :param limit: Maximum number of rows to be returned by the cursor
+        :return: Batches of rows
+        """
+        if not cursor.description:
+            return
+        if cls.arraysize:
+            cursor.arraysize = cls.arraysize
+        row_count = 0
+        while limit is None or row_count < limit:
+            size = batch_size if limit is None else min(batch_size, limit - row_count)
+            try:
+                rows = cursor.fetchmany(size)
+            except Exception as ex:
+                raise cls.get_dbapi_mapped_exception(ex)
+            if not rows:
+                return
+            row_count += len(rows)
+            yield rows
+
+    @classmethod
+    def fetch_data_arrow(  # pylint: disable=unused-argument
+        cls, cursor: Any, limit: Optional[int] = None
+    ) -> Optional[pa.Table]:
+        """
+        Fetch the result of a query as an Arrow table, for drivers that can return
+        Arrow data natively. This skips building Python tuples for every row and
+        converting them back to columns in `SupersetResultSet`.
+
+        :param cursor: Cursor instance
+        :param limit: Maximum number of rows to be returned by the cursor
+        :return: Result of query, or None if the result must be fetched with
+                 `fetch_data` instead
+        """
+        return None
+
     @classmethod
     def expand_data(
         cls, columns: List[Dict[Any, Any]], data: List[Dict[Any, Any]]
@@ -57,6 +57,7 @@ class MySQLEngineSpec(BaseEngineSpec):
     engine = "mysql"
     engine_name = "MySQL"
     max_column_name_length = 64
+    allows_tuple_in = True
 
     column_type_mappings: Tuple[
         Tuple[
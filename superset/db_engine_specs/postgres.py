@@ -22,6 +22,7 @@ from typing import (
     Any,
     Callable,
     Dict,
+    Iterator,
     List,
     Match,
     Optional,
@@ -138,6 +139,13 @@ class PostgresBaseEngineSpec(BaseEngineSpec):
             return []
         return super().fetch_data(cursor, limit)
 
+    @classmethod
+    def fetch_data_batches(
+        cls, cursor: Any, batch_size: int, limit: Optional[int] = None
+    ) -> Iterator[List[Tuple[Any, ...]]]:
+        cursor.tzinfo_factory = FixedOffsetTimezone
+        return super().fetch_data_batches(cursor, batch_size, limit)
+
     @classmethod
     def epoch_to_dttm(cls) -> str:
         return "(timestamp 'epoch' + {col} * interval '1 second')"
@@ -148,6 +156,7 @@ class PostgresEngineSpec(PostgresBaseEngineSpec):
     engine_aliases = ("postgres",)
     max_column_name_length = 63
     try_remove_schema_from_table_name = False
+    allows_tuple_in = True
 
     column_type_mappings = (
         (
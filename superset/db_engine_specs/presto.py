@@ -148,6 +148,7 @@ class PrestoEngineSpec(BaseEngineSpec):  # pylint: disable=too-many-public-metho
     engine = "presto"
     engine_name = "Presto"
     allows_alias_to_source_column = False
+    allows_tuple_in = True
 
     _time_grain_expressions = {
         None: "{col}",
@@ -15,18 +15,23 @@
 # specific language governing permissions and limitations
 # under the License.
 import json
+import logging
 from datetime import datetime
-from typing import Optional, TYPE_CHECKING
+from typing import Any, Optional, TYPE_CHECKING
 from urllib import parse
 
+import pyarrow as pa
 from sqlalchemy.engine.url import URL
 
+from superset.db_engine_specs.base import LimitMethod
 from superset.db_engine_specs.postgres import PostgresBaseEngineSpec
 from superset.utils import core as utils
 
 if TYPE_CHECKING:
     from superset.models.core import Database
 
+logger = logging.getLogger(__name__)
+
 
 class SnowflakeEngineSpec(PostgresBaseEngineSpec):
     engine = "snowflake"
@@ -54,6 +59,35 @@ class SnowflakeEngineSpec(PostgresBaseEngineSpec):
         "P1Y": "DATE_TRUNC('YEAR', {col})",
     }
 
+    @classmethod
+    def fetch_data_arrow(
+        cls, cursor: Any, limit: Optional[int] = None
+    ) -> Optional[pa.Table]:
+        # only available when the connector is installed with its pandas extra,
+        # and for results returned in the Arrow format
+        if not hasattr(cursor, "fetch_arrow_all"):
+            return None
+        # the connector is installed if its cursor has `fetch_arrow_all`
+        from snowflake.connector.errors import (  # pylint: disable=import-error
+            NotSupportedError,
+        )
+
+        try:
+            table = cursor.fetch_arrow_all()
+        except NotSupportedError as ex:
+            # the result isn't in the Arrow format, no rows have been fetched
+            logger.debug("Unable to fetch the result as Arrow: %s", ex)
+            return None
+        except Exception as ex:
+            logger.warning("Failed to fetch the result as Arrow: %s", ex)
+            raise
+        if table is None:
+            # no rows, let `fetch_data` return an empty result
+            return None
+        if cls.limit_method == LimitMethod.FETCH_MANY and limit:
+            table = table.slice(0, limit)
+        return table
+
     @classmethod
     def adjust_database_uri(
         cls, uri: URL, selected_schema: Optional[str] = None
@@ -27,6 +27,7 @@ from superset.utils import core as utils
 class TrinoEngineSpec(BaseEngineSpec):
     engine = "trino"
     engine_name = "Trino"
+    allows_tuple_in = True
 
     # pylint: disable=line-too-long
     _time_grain_expressions = {
@@ -0,0 +1,81 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""add activity rollups
+
+Revision ID: 4b633e66731f
+Revises: 19e978e1b9c3
+Create Date: 2026-10-17 10:12:41.417552
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = "4b633e66731f"
+down_revision = "19e978e1b9c3"
+
+import sqlalchemy as sa
+from alembic import op
+
+
+def upgrade():
+    rollup_state = op.create_table(
+        "activity_rollup_state",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("last_log_id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # a single row, with a fixed id for concurrent rollups not to insert another
+    op.bulk_insert(rollup_state, [{"id": 1, "last_log_id": 0}])
+    op.create_table(
+        "user_recent_activity",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("action", sa.String(512), nullable=False),
+        sa.Column("dashboard_id", sa.Integer(), nullable=False),
+        sa.Column("slice_id", sa.Integer(), nullable=False),
+        sa.Column("dttm", sa.DateTime(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_user_recent_activity_user_id_dttm",
+        "user_recent_activity",
+        ["user_id", "dttm"],
+        unique=False,
+    )
+    op.create_table(
+        "hourly_activity",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("hour", sa.DateTime(), nullable=False),
+        sa.Column("action", sa.String(512), nullable=False),
+        sa.Column("dashboard_id", sa.Integer(), nullable=False),
+        sa.Column("slice_id", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_hourly_activity_hour"), "hourly_activity", ["hour"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_hourly_activity_hour"), table_name="hourly_activity")
+    op.drop_table("hourly_activity")
+    op.drop_index(
+        "ix_user_recent_activity_user_id_dttm", table_name="user_recent_activity"
+    )
+    op.drop_table("user_recent_activity")
+    op.drop_table("activity_rollup_state")
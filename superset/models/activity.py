@@ -0,0 +1,65 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Rollups of the logs table, maintained by `superset.utils.activity.rollup_logs`.
+
+Logs without a dashboard or a chart aren't rolled up. Missing dashboard and chart
+ids are stored as 0 rather than NULL, for rows to be unique by their key columns.
+"""
+from flask_appbuilder import Model
+from sqlalchemy import Column, DateTime, Index, Integer, String
+
+
+class ActivityRollupState(Model):  # pylint: disable=too-few-public-methods
+
+    """
+    The id of the last log rolled up, logs after it are only in the logs table.
+    The table has a single row, see `superset.utils.activity.ROLLUP_STATE_ID`.
+    """
+
+    __tablename__ = "activity_rollup_state"
+    id = Column(Integer, primary_key=True)
+    last_log_id = Column(Integer, nullable=False, default=0)
+
+
+class UserRecentActivity(Model):  # pylint: disable=too-few-public-methods
+
+    """The last time a user performed an action on a dashboard or chart"""
+
+    __tablename__ = "user_recent_activity"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    action = Column(String(512), nullable=False)
+    dashboard_id = Column(Integer, nullable=False, default=0)
+    slice_id = Column(Integer, nullable=False, default=0)
+    dttm = Column(DateTime, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index("ix_user_recent_activity_user_id_dttm", user_id, dttm),)
+
+
+class HourlyActivity(Model):  # pylint: disable=too-few-public-methods
+
+    """The number of times an action was performed on a dashboard or chart by hour"""
+
+    __tablename__ = "hourly_activity"
+    id = Column(Integer, primary_key=True)
+    hour = Column(DateTime, nullable=False, index=True)
+    action = Column(String(512), nullable=False)
+    dashboard_id = Column(Integer, nullable=False, default=0)
+    slice_id = Column(Integer, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
@@ -23,7 +23,7 @@ from contextlib import closing
 from copy import deepcopy
 from datetime import datetime
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Type
 
 import numpy
 import pandas as pd
@@ -55,11 +55,18 @@ from sqlalchemy.sql import expression, Select
 
 from superset import app, db_engine_specs, is_feature_enabled
 from superset.db_engine_specs.base import TimeGrain
-from superset.extensions import cache_manager, encrypted_field_factory, security_manager
+from superset.extensions import (
+    cache_manager,
+    encrypted_field_factory,
+    engine_manager,
+    security_manager,
+    tracer,
+)
 from superset.models.helpers import AuditMixinNullable, ImportExportMixin
 from superset.models.tags import FavStarUpdater
 from superset.result_set import SupersetResultSet
 from superset.utils import cache as cache_util, core as utils
+from superset.utils.engine_manager import EngineKey, get_connection_hash
 
 config = app.config
 custom_password_store = config["SQLALCHEMY_CUSTOM_PASSWORD_STORE"]
@@ -297,13 +304,51 @@ class Database(
                 effective_username = g.user.username
         return effective_username
 
-    @utils.memoized(watch=("impersonate_user", "sqlalchemy_uri_decrypted", "extra"))
-    def get_sqla_engine(
+    def get_sqla_engine(  # pylint: disable=too-many-arguments
         self,
         schema: Optional[str] = None,
         nullpool: bool = True,
         user_name: Optional[str] = None,
         source: Optional[utils.QuerySource] = None,
+        pooled: bool = False,
+    ) -> Engine:
+        """
+        Create a SQLAlchemy engine for this database.
+
+        :param schema: schema to connect to, if supported by the engine
+        :param nullpool: open a new DB-API connection for every checkout
+        :param user_name: username to impersonate, defaults to the logged in user
+        :param source: where the query originates from, see `DB_CONNECTION_MUTATOR`
+        :param pooled: when `DB_ENGINE_POOL_ENABLED` is set, return a long-lived
+            engine with a connection pool shared by all callers of the same
+            database, schema, effective user and connection mutator output
+        :return: SQLAlchemy engine
+        """
+        if pooled and engine_manager.is_enabled and self.id is not None:
+            # pooled engines are always looked up in the engine manager, which
+            # disposes of the engines it evicts
+            return self._create_sqla_engine(
+                schema, nullpool, user_name, source, pooled=True
+            )
+        return self._get_memoized_sqla_engine(schema, nullpool, user_name, source)
+
+    @utils.memoized(watch=("impersonate_user", "sqlalchemy_uri_decrypted", "extra"))
+    def _get_memoized_sqla_engine(
+        self,
+        schema: Optional[str],
+        nullpool: bool,
+        user_name: Optional[str],
+        source: Optional[utils.QuerySource],
+    ) -> Engine:
+        return self._create_sqla_engine(schema, nullpool, user_name, source)
+
+    def _create_sqla_engine(  # pylint: disable=too-many-arguments
+        self,
+        schema: Optional[str],
+        nullpool: bool,
+        user_name: Optional[str],
+        source: Optional[utils.QuerySource],
+        pooled: bool = False,
     ) -> Engine:
         extra = self.get_extra()
         sqlalchemy_url = make_url(self.sqlalchemy_uri_decrypted)
@@ -320,7 +365,7 @@ class Database(
         logger.debug("Database.get_sqla_engine(). Masked URL: %s", str(masked_url))
 
         params = extra.get("engine_params", {})
-        if nullpool:
+        if nullpool and not pooled:
             params["poolclass"] = NullPool
 
         connect_args = params.get("connect_args", {})
@@ -347,6 +392,15 @@ class Database(
                 sqlalchemy_url, params, effective_username, security_manager, source
             )
 
+        if pooled:
+            key = EngineKey(
+                database_id=self.id,
+                schema=schema,
+                effective_username=effective_username,
+                connection_hash=get_connection_hash(sqlalchemy_url, params),
+            )
+            return engine_manager.get_engine(key, sqlalchemy_url, params)
+
         return create_engine(sqlalchemy_url, **params)
 
     def get_reserved_words(self) -> Set[str]:
@@ -355,23 +409,67 @@ class Database(
     def get_quoter(self) -> Callable[[str, Any], str]:
         return self.get_dialect().identifier_preparer.quote
 
+    @tracer.traced("database.get_df")
     def get_df(  # pylint: disable=too-many-locals
         self,
         sql: str,
         schema: Optional[str] = None,
         mutator: Optional[Callable[[pd.DataFrame], None]] = None,
     ) -> pd.DataFrame:
+        span = tracer.current_span()
+        span.set_attribute("database", self.database_name)
         sqls = [str(s).strip(" ;") for s in sqlparse.parse(sql)]
 
-        engine = self.get_sqla_engine(schema=schema)
+        engine = self.get_sqla_engine(schema=schema, pooled=True)
         username = utils.get_username()
 
-        def needs_conversion(df_series: pd.Series) -> bool:
-            return (
-                not df_series.empty
-                and isinstance(df_series, pd.Series)
-                and isinstance(df_series[0], (list, dict))
-            )
+        def _log_query(sql: str) -> None:
+            if log_query:
+                log_query(engine.url, sql, schema, username, __name__, security_manager)
+
+        with closing(engine.raw_connection()) as conn:
+            cursor = conn.cursor()
+            with tracer.span("database.execute"):
+                for sql_ in sqls[:-1]:
+                    _log_query(sql_)
+                    self.db_engine_spec.execute(cursor, sql_)
+                    cursor.fetchall()
+
+                _log_query(sqls[-1])
+                self.db_engine_spec.execute(cursor, sqls[-1])
+
+            with tracer.span("database.fetch"):
+                arrow_table = self.db_engine_spec.fetch_data_arrow(cursor)
+                if arrow_table is not None:
+                    result_set = SupersetResultSet.from_arrow_table(
+                        arrow_table, cursor.description, self.db_engine_spec
+                    )
+                else:
+                    data = self.db_engine_spec.fetch_data(cursor)
+                    result_set = SupersetResultSet(
+                        data, cursor.description, self.db_engine_spec
+                    )
+            with tracer.span("result_set.to_pandas_df"):
+                df = result_set.to_pandas_df()
+                if mutator:
+                    df = mutator(df)
+                df = self._stringify_nested_columns(df)
+
+            span.set_attribute("rows", len(df.index))
+            return df
+
+    def iter_df(
+        self, sql: str, batch_size: int, schema: Optional[str] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Run a query like `get_df`, yielding its result in DataFrames of at most
+        `batch_size` rows rather than fetching it all at once. An empty DataFrame
+        is yielded when the query returns no rows.
+        """
+        sqls = [str(s).strip(" ;") for s in sqlparse.parse(sql)]
+
+        engine = self.get_sqla_engine(schema=schema, pooled=True)
+        username = utils.get_username()
 
         def _log_query(sql: str) -> None:
             if log_query:
@@ -387,19 +485,33 @@ class Database(
             _log_query(sqls[-1])
             self.db_engine_spec.execute(cursor, sqls[-1])
 
-            data = self.db_engine_spec.fetch_data(cursor)
-            result_set = SupersetResultSet(
-                data, cursor.description, self.db_engine_spec
+            has_rows = False
+            for rows in self.db_engine_spec.fetch_data_batches(cursor, batch_size):
+                has_rows = True
+                result_set = SupersetResultSet(
+                    rows, cursor.description, self.db_engine_spec
+                )
+                yield self._stringify_nested_columns(result_set.to_pandas_df())
+            if not has_rows:
+                result_set = SupersetResultSet(
+                    [], cursor.description, self.db_engine_spec
+                )
+                yield result_set.to_pandas_df()
+
+    @staticmethod
+    def _stringify_nested_columns(df: pd.DataFrame) -> pd.DataFrame:
+        def needs_conversion(df_series: pd.Series) -> bool:
+            return (
+                not df_series.empty
+                and isinstance(df_series, pd.Series)
+                and isinstance(df_series[0], (list, dict))
             )
-            df = result_set.to_pandas_df()
-            if mutator:
-                df = mutator(df)
 
-            for col, coltype in df.dtypes.to_dict().items():
-                if coltype == numpy.object_ and needs_conversion(df[col]):
-                    df[col] = df[col].apply(utils.json_dumps_w_dates)
+        for col, coltype in df.dtypes.to_dict().items():
+            if coltype == numpy.object_ and needs_conversion(df[col]):
+                df[col] = df[col].apply(utils.json_dumps_w_dates)
 
-            return df
+        return df
 
     def compile_sqla_query(self, qry: Select, schema: Optional[str] = None) -> str:
         engine = self.get_sqla_engine(schema=schema)
@@ -694,8 +806,16 @@ class Database(
         return sqla_url.get_dialect()()  # pylint: disable=no-member
 
 
+def dispose_pooled_engines(  # pylint: disable=unused-argument
+    mapper: Any, connection: Any, target: Database
+) -> None:
+    engine_manager.dispose(target.id)
+
+
 sqla.event.listen(Database, "after_insert", security_manager.set_perm)
 sqla.event.listen(Database, "after_update", security_manager.set_perm)
+sqla.event.listen(Database, "after_update", dispose_pooled_engines)
+sqla.event.listen(Database, "after_delete", dispose_pooled_engines)
 
 
 class Log(Model):  # pylint: disable=too-few-public-methods
@@ -0,0 +1,145 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import logging
+
+from flask import make_response, Response
+from flask_appbuilder import expose
+from flask_appbuilder.api import BaseApi, safe
+from flask_appbuilder.security.decorators import permission_name, protect
+
+from superset.extensions import event_logger
+from superset.utils.profiler import get_profile, get_profiles
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilerRestApi(BaseApi):
+    resource_name = "profiler"
+    allow_browser_login = True
+    class_permission_name = "Profiler"
+    openapi_spec_tag = "Profiler"
+
+    @expose("/", methods=["GET"])
+    @event_logger.log_this
+    @protect()
+    @safe
+    @permission_name("read")
+    def profiles(self) -> Response:
+        """
+        List the stored request profiles
+        ---
+        get:
+          description: >-
+            List the summaries of the stored request profiles, newest first
+          responses:
+            200:
+              description: Profile summaries
+              content:
+                application/json:
+                  schema:
+                    type: object
+                    properties:
+                      result:
+                        type: array
+                        items:
+                          type: object
+            401:
+              $ref: '#/components/responses/401'
+            500:
+              $ref: '#/components/responses/500'
+        """
+        return self.response(200, result=get_profiles())
+
+    @expose("/<profile_id>", methods=["GET"])
+    @event_logger.log_this
+    @protect()
+    @safe
+    @permission_name("read")
+    def profile(self, profile_id: str) -> Response:
+        """
+        Get a request profile
+        ---
+        get:
+          description: >-
+            Get a request profile: its sampled stacks, the functions found the most
+            in them, and the number of metadata database queries and cache calls
+          parameters:
+          - in: path
+            schema:
+              type: string
+            name: profile_id
+          responses:
+            200:
+              description: The profile
+              content:
+                application/json:
+                  schema:
+                    type: object
+                    properties:
+                      result:
+                        type: object
+            401:
+              $ref: '#/components/responses/401'
+            404:
+              $ref: '#/components/responses/404'
+            500:
+              $ref: '#/components/responses/500'
+        """
+        profile = get_profile(profile_id)
+        if profile is None:
+            return self.response_404()
+        return self.response(200, result=profile)
+
+    @expose("/<profile_id>/stacks", methods=["GET"])
+    @event_logger.log_this
+    @protect()
+    @safe
+    @permission_name("read")
+    def stacks(self, profile_id: str) -> Response:
+        """
+        Get the sampled stacks of a request profile, for flame graph tools
+        ---
+        get:
+          description: >-
+            Get the sampled stacks of a request profile in the collapsed format of
+            flame graph tools, one stack per line followed by its number of samples
+          parameters:
+          - in: path
+            schema:
+              type: string
+            name: profile_id
+          responses:
+            200:
+              description: The sampled stacks
+              content:
+                text/plain:
+                  schema:
+                    type: string
+            401:
+              $ref: '#/components/responses/401'
+            404:
+              $ref: '#/components/responses/404'
+            500:
+              $ref: '#/components/responses/500'
+        """
+        profile = get_profile(profile_id)
+        if profile is None:
+            return self.response_404()
+        lines = [f"{stack} {count}" for stack, count in profile["stacks"].items()]
+        resp = make_response("\n".join(lines), 200)
+        resp.headers["Content-Type"] = "text/plain; charset=utf-8"
+        return resp
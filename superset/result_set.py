@@ -19,15 +19,17 @@
 import datetime
 import json
 import logging
-from typing import Any, Dict, List, Optional, Tuple, Type
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
 
 import numpy as np
 import pandas as pd
 import pyarrow as pa
 
 from superset import db_engine_specs
+from superset.extensions import tracer
 from superset.typing import DbapiDescription, DbapiResult
 from superset.utils import core as utils
+from superset.utils.core import GenericDataType
 
 logger = logging.getLogger(__name__)
 
@@ -62,17 +64,35 @@ def stringify(obj: Any) -> str:
     return json.dumps(obj, default=utils.json_iso_dttm_ser)
 
 
-def stringify_values(array: np.ndarray) -> np.ndarray:
-    vstringify = np.vectorize(stringify)
-    return vstringify(array)
-
-
 def destringify(obj: str) -> Any:
     return json.loads(obj)
 
 
+def stringify_offending_values(values: Sequence[Any]) -> pa.Array:
+    """
+    Convert a column Arrow can't type as is to strings, serializing the values
+    that aren't strings already and keeping nulls.
+    """
+    return pa.array(
+        [
+            value if value is None or isinstance(value, str) else stringify(value)
+            for value in values
+        ],
+        type=pa.string(),
+    )
+
+
+# Arrow types used directly, i.e. without inference, for columns of these generic
+# types. Numeric columns are left out as they may hold ints, floats or decimals.
+GENERIC_TYPE_ARROW_TYPES = {
+    GenericDataType.STRING: pa.string(),
+    GenericDataType.BOOLEAN: pa.bool_(),
+}
+
+
 class SupersetResultSet:
-    def __init__(  # pylint: disable=too-many-locals,too-many-branches
+    @tracer.traced("result_set.init")
+    def __init__(  # pylint: disable=too-many-locals
         self,
         data: DbapiResult,
         cursor_description: DbapiDescription,
@@ -83,8 +103,6 @@ class SupersetResultSet:
         column_names: List[str] = []
         pa_data: List[pa.Array] = []
         deduped_cursor_desc: List[Tuple[Any, ...]] = []
-        numpy_dtype: List[Tuple[str, ...]] = []
-        stringified_arr: np.ndarray
 
         if cursor_description:
             # get deduped list of column names
@@ -96,57 +114,6 @@ class SupersetResultSet:
                 for column_name, description in zip(column_names, cursor_description)
             ]
 
-            # generate numpy structured array dtype
-            numpy_dtype = [(column_name, "object") for column_name in column_names]
-
-        # only do expensive recasting if datatype is not standard list of tuples
-        if data and (not isinstance(data, list) or not isinstance(data[0], tuple)):
-            data = [tuple(row) for row in data]
-        array = np.array(data, dtype=numpy_dtype)
-        if array.size > 0:
-            for column in column_names:
-                try:
-                    pa_data.append(pa.array(array[column].tolist()))
-                except (
-                    pa.lib.ArrowInvalid,
-                    pa.lib.ArrowTypeError,
-                    pa.lib.ArrowNotImplementedError,
-                    TypeError,  # this is super hackey,
-                    # https://issues.apache.org/jira/browse/ARROW-7855
-                ):
-                    # attempt serialization of values as strings
-                    stringified_arr = stringify_values(array[column])
-                    pa_data.append(pa.array(stringified_arr.tolist()))
-
-        if pa_data:  # pylint: disable=too-many-nested-blocks
-            for i, column in enumerate(column_names):
-                if pa.types.is_nested(pa_data[i].type):
-                    # TODO: revisit nested column serialization once nested types
-                    #  are added as a natively supported column type in Superset
-                    #  (superset.utils.core.GenericDataType).
-                    stringified_arr = stringify_values(array[column])
-                    pa_data[i] = pa.array(stringified_arr.tolist())
-
-                elif pa.types.is_temporal(pa_data[i].type):
-                    # workaround for bug converting
-                    # `psycopg2.tz.FixedOffsetTimezone` tzinfo values.
-                    # related: https://issues.apache.org/jira/browse/ARROW-5248
-                    sample = self.first_nonempty(array[column])
-                    if sample and isinstance(sample, datetime.datetime):
-                        try:
-                            if sample.tzinfo:
-                                tz = sample.tzinfo
-                                series = pd.Series(
-                                    array[column], dtype="datetime64[ns]"
-                                )
-                                series = pd.to_datetime(series).dt.tz_localize(tz)
-                                pa_data[i] = pa.Array.from_pandas(
-                                    series, type=pa.timestamp("ns", tz=tz)
-                                )
-                        except Exception as ex:  # pylint: disable=broad-except
-                            logger.exception(ex)
-
-        self.table = pa.Table.from_arrays(pa_data, names=column_names)
         self._type_dict: Dict[str, Any] = {}
         try:
             # The driver may not be passing a cursor.description
@@ -158,6 +125,114 @@ class SupersetResultSet:
         except Exception as ex:  # pylint: disable=broad-except
             logger.exception(ex)
 
+        if data and column_names:
+            # transpose rows to columns in a single pass
+            columns: List[Sequence[Any]] = list(zip(*data))
+            for column_name, values in zip(column_names, columns):
+                pa_data.append(
+                    self.convert_column(values, self._type_dict.get(column_name))
+                )
+
+        self.table = pa.Table.from_arrays(
+            pa_data, names=column_names if pa_data else []
+        )
+        tracer.current_span().set_attributes(
+            rows=len(data), columns=len(column_names)
+        )
+
+    @classmethod
+    def from_arrow_table(
+        cls,
+        table: pa.Table,
+        cursor_description: DbapiDescription,
+        db_engine_spec: Type[db_engine_specs.BaseEngineSpec],
+    ) -> "SupersetResultSet":
+        """
+        Build a result set from an Arrow table fetched natively from the driver,
+        see `BaseEngineSpec.fetch_data_arrow`.
+
+        :param table: the query result
+        :param cursor_description: the cursor description, may be empty
+        :param db_engine_spec: the engine spec of the database
+        :return: the result set
+        """
+        result_set = cls([], cursor_description, db_engine_spec)
+        column_names = dedup(table.column_names)
+        columns = []
+        for column in table.columns:
+            if pa.types.is_nested(column.type):
+                # serialized as in `convert_column`
+                column = stringify_offending_values(column.to_pylist())
+            columns.append(column)
+        result_set.table = pa.Table.from_arrays(columns, names=column_names)
+        return result_set
+
+    def convert_column(
+        self, values: Sequence[Any], db_type_str: Optional[str]
+    ) -> pa.Array:
+        """
+        Convert the values of a column to an Arrow array.
+
+        The Arrow type is taken from the column type in the cursor description when
+        it maps to a generic string or boolean type, and inferred from the values
+        otherwise. Nested values are serialized as JSON strings, as are the values of
+        columns Arrow can't type, except for values that are strings already.
+
+        :param values: the column values
+        :param db_type_str: the column type from the cursor description
+        :return: the Arrow array
+        """
+        pa_type = None
+        column_spec = self.db_engine_spec.get_column_spec(
+            db_type_str, source=utils.ColumnTypeSource.CURSOR_DESCRIPION
+        )
+        if column_spec:
+            pa_type = GENERIC_TYPE_ARROW_TYPES.get(column_spec.generic_type)
+
+        pa_array = None
+        if pa_type is not None:
+            try:
+                pa_array = pa.array(values, type=pa_type)
+            except (pa.lib.ArrowInvalid, pa.lib.ArrowTypeError, TypeError):
+                pass
+        if pa_array is None:
+            try:
+                pa_array = pa.array(values)
+            except (
+                pa.lib.ArrowInvalid,
+                pa.lib.ArrowTypeError,
+                pa.lib.ArrowNotImplementedError,
+                TypeError,  # this is super hackey,
+                # https://issues.apache.org/jira/browse/ARROW-7855
+            ):
+                return stringify_offending_values(values)
+
+        if pa.types.is_nested(pa_array.type):
+            # TODO: revisit nested column serialization once nested types
+            #  are added as a natively supported column type in Superset
+            #  (superset.utils.core.GenericDataType).
+            return stringify_offending_values(values)
+
+        if pa.types.is_temporal(pa_array.type):
+            # workaround for bug converting
+            # `psycopg2.tz.FixedOffsetTimezone` tzinfo values.
+            # related: https://issues.apache.org/jira/browse/ARROW-5248
+            sample = self.first_nonempty(values)
+            if sample and isinstance(sample, datetime.datetime) and sample.tzinfo:
+                try:
+                    tz = sample.tzinfo
+                    series = pd.Series(
+                        np.array(values, dtype=object), dtype="datetime64[ns]"
+                    )
+                    series = pd.to_datetime(series).dt.tz_localize(tz)
+                    pa_array = pa.Array.from_pandas(
+                        series, type=pa.timestamp("ns", tz=tz)
+                    )
+                except Exception as ex:  # pylint: disable=broad-except
+                    logger.exception(ex)
+
+        return pa_array
+
     @staticmethod
     def convert_pa_dtype(pa_dtype: pa.DataType) -> Optional[str]:
         if pa.types.is_boolean(pa_dtype):
@@ -18,9 +18,22 @@
 """A set of constants and methods to manage permissions and security"""
 import logging
 import re
-from typing import Any, Callable, cast, List, Optional, Set, Tuple, TYPE_CHECKING, Union
+import time
+from typing import (
+    Any,
+    Callable,
+    cast,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
 
-from flask import current_app, g
+import sqlalchemy as sa
+from flask import current_app, g, has_app_context
 from flask_appbuilder import Model
 from flask_appbuilder.models.sqla.interface import SQLAInterface
 from flask_appbuilder.security.sqla.manager import SecurityManager
@@ -41,16 +54,22 @@ from flask_appbuilder.security.views import (
 from flask_appbuilder.widgets import ListWidget
 from sqlalchemy import and_, or_
 from sqlalchemy.engine.base import Connection
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import object_session, Session
 from sqlalchemy.orm.mapper import Mapper
-from sqlalchemy.orm.query import Query as SqlaQuery
 
 from superset import sql_parse
 from superset.connectors.connector_registry import ConnectorRegistry
 from superset.constants import RouteMethod
 from superset.errors import ErrorLevel, SupersetError, SupersetErrorType
 from superset.exceptions import SupersetSecurityException
+from superset.security.permission_cache import (
+    build_snapshot,
+    PermissionCache,
+    PERMISSIONS_VERSION_CACHE_KEY,
+    PermissionSnapshot,
+)
 from superset.utils.core import DatasourceName, RowLevelSecurityFilterType
+from superset.utils.versioned_cache import bump_version, get_version
 
 if TYPE_CHECKING:
     from superset.common.query_context import QueryContext
@@ -64,6 +83,16 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# cache key of the version of the row level security filters, the cached filters of
+# older versions are ignored
+RLS_FILTERS_VERSION_CACHE_KEY = "rls_filters_version"
+
+
+class RLSFilter(NamedTuple):
+    id: int
+    group_key: Optional[str]
+    clause: str
+
 
 class SupersetSecurityListWidget(ListWidget):
     """
@@ -112,6 +141,7 @@ class SupersetSecurityManager(  # pylint: disable=too-many-public-methods
     SecurityManager
 ):
     userstatschartview = None
+    permission_cache = PermissionCache()
     READ_ONLY_MODEL_VIEWS = {"Database", "DruidClusterModelView", "DynamicPlugin"}
 
     USER_MODEL_VIEWS = {
@@ -137,6 +167,7 @@ class SupersetSecurityManager(  # pylint: disable=too-many-public-methods
         "ResetPasswordView",
         "RoleModelView",
         "Log",
+        "Profiler",
         "Security",
         "Row Level Security",
         "Row Level Security Filters",
@@ -234,6 +265,86 @@ class SupersetSecurityManager(  # pylint: disable=too-many-public-methods
             return self.is_item_public(permission_name, view_name)
         return self._has_view_access(user, permission_name, view_name)
 
+    def _has_view_access(
+        self, user: User, permission_name: str, view_name: str
+    ) -> bool:
+        if current_app.config["PERMISSION_CACHE_TIMEOUT"] is None:
+            return super()._has_view_access(user, permission_name, view_name)
+
+        # same as FAB, with the database roles checked against their snapshot
+        db_role_ids = []
+        for role in user.roles:
+            if role.name in self.builtin_roles:
+                if self._has_access_builtin_roles(role, permission_name, view_name):
+                    return True
+            else:
+                db_role_ids.append(role.id)
+        snapshot = self.get_permission_snapshot(db_role_ids)
+        return view_name in snapshot.get(permission_name, ())
+
+    def get_permission_snapshot(self, role_ids: List[int]) -> PermissionSnapshot:
+        """
+        Return the permissions granted to a set of roles, from the process wide
+        permission cache when the snapshot of the roles is cached and up to date.
+
+        :param role_ids: The ids of the roles
+        :returns: The view menu names of each permission granted to the roles
+        """
+        config = current_app.config
+        stats_logger = config["STATS_LOGGER"]
+        key = tuple(sorted(set(role_ids)))
+        version = self._get_permissions_version()
+        snapshot = self.permission_cache.get(key, version)
+        if snapshot is not None:
+            stats_logger.incr("permission_cache.hit")
+            return snapshot
+
+        stats_logger.incr("permission_cache.miss")
+        start = time.monotonic()
+        snapshot = self._query_permission_snapshot(key)
+        stats_logger.timing(
+            "permission_cache.build", (time.monotonic() - start) * 1000
+        )
+        self.permission_cache.set(
+            key,
+            version,
+            snapshot,
+            timeout=config["PERMISSION_CACHE_TIMEOUT"],
+            max_size=config["PERMISSION_CACHE_MAX_SIZE"],
+        )
+        stats_logger.gauge("permission_cache.size", len(self.permission_cache))
+        return snapshot
+
+    @staticmethod
+    def _get_permissions_version() -> str:
+        return get_version(PERMISSIONS_VERSION_CACHE_KEY, "permissions_version")
+
+    def _query_permission_snapshot(
+        self, role_ids: Tuple[int, ...]
+    ) -> PermissionSnapshot:
+        if not role_ids:
+            return {}
+        query = (
+            self.get_session.query(self.permission_model.name, self.viewmenu_model.name)
+            .select_from(self.permissionview_model)
+            .join(self.permission_model)
+            .join(self.viewmenu_model)
+            .join(assoc_permissionview_role)
+            .filter(assoc_permissionview_role.c.role_id.in_(role_ids))
+            .distinct()
+        )
+        return build_snapshot(query.all())
+
+    def invalidate_permissions(self) -> None:
+        """
+        Invalidate the permission snapshots of all the processes sharing the cache
+        backend, and of the current one.
+        """
+        self.permission_cache.clear()
+        if has_app_context():
+            bump_version(PERMISSIONS_VERSION_CACHE_KEY, "permissions_version")
+            current_app.config["STATS_LOGGER"].incr("permission_cache.invalidated")
+
     def can_access_all_queries(self) -> bool:
         """
         Return True if the user can access all SQL Lab queries, False otherwise.
@@ -421,6 +532,15 @@ class SupersetSecurityManager(  # pylint: disable=too-many-public-methods
         return True
 
     def user_view_menu_names(self, permission_name: str) -> Set[str]:
+        if current_app.config["PERMISSION_CACHE_TIMEOUT"] is not None:
+            if not g.user.is_anonymous:
+                role_ids = [role.id for role in g.user.roles]
+            else:
+                public_role = self.get_public_role()
+                role_ids = [public_role.id] if public_role else []
+            snapshot = self.get_permission_snapshot(role_ids)
+            return set(snapshot.get(permission_name, ()))
+
         base_query = (
             self.get_session.query(self.viewmenu_model.name)
             .join(self.permissionview_model)
@@ -1027,75 +1147,197 @@ class SupersetSecurityManager(  # pylint: disable=too-many-public-methods
             .one_or_none()
         )
 
-    def get_rls_filters(self, table: "BaseDatasource") -> List[SqlaQuery]:
+    def get_rls_filters(self, table: "BaseDatasource") -> List[RLSFilter]:
         """
         Retrieves the appropriate row level security filters for the current user and
         the passed table.
 
+        The filters only depend on the roles of the user, they are cached by role set
+        and table for the duration of the request, and in the cache backend for
+        `RLS_FILTERS_CACHE_TIMEOUT` seconds if set.
+
         :param table: The table to check against
         :returns: A list of filters
         """
-        if hasattr(g, "user") and hasattr(g.user, "id"):
-            from superset.connectors.sqla.models import (
-                RLSFilterRoles,
-                RLSFilterTables,
-                RowLevelSecurityFilter,
-            )
+        if not (hasattr(g, "user") and hasattr(g.user, "id")):
+            return []
 
-            user_roles = (
-                self.get_session.query(assoc_user_role.c.role_id)
-                .filter(assoc_user_role.c.user_id == g.user.id)
-                .subquery()
+        role_ids = tuple(sorted(role.id for role in g.user.roles))
+        cache_key = f"rls_filters__{'_'.join(map(str, role_ids))}__{table.id}"
+        if not hasattr(g, "rls_filters"):
+            g.rls_filters = {}
+        if cache_key not in g.rls_filters:
+            g.rls_filters[cache_key] = self._get_cached_rls_filters(
+                cache_key, role_ids, table.id
             )
-            regular_filter_roles = (
-                self.get_session.query(RLSFilterRoles.c.rls_filter_id)
-                .join(RowLevelSecurityFilter)
-                .filter(
-                    RowLevelSecurityFilter.filter_type
-                    == RowLevelSecurityFilterType.REGULAR
-                )
-                .filter(RLSFilterRoles.c.role_id.in_(user_roles))
-                .subquery()
+        return g.rls_filters[cache_key]
+
+    def _get_cached_rls_filters(
+        self, cache_key: str, role_ids: Tuple[int, ...], table_id: int
+    ) -> List[RLSFilter]:
+        from superset.extensions import cache_manager
+
+        timeout = current_app.config["RLS_FILTERS_CACHE_TIMEOUT"]
+        if timeout is None:
+            return self._query_rls_filters(role_ids, table_id)
+
+        stats_logger = current_app.config["STATS_LOGGER"]
+        cache_key = f"{cache_key}__{self._get_rls_filters_version()}"
+        filters = cache_manager.cache.get(cache_key)
+        if filters is not None:
+            stats_logger.incr("rls_filters.cache_hit")
+            return filters
+
+        stats_logger.incr("rls_filters.cache_miss")
+        filters = self._query_rls_filters(role_ids, table_id)
+        cache_manager.cache.set(cache_key, filters, timeout=timeout)
+        return filters
+
+    @staticmethod
+    def _get_rls_filters_version() -> str:
+        return get_version(RLS_FILTERS_VERSION_CACHE_KEY, "rls_filters_version")
+
+    def _query_rls_filters(
+        self, role_ids: Tuple[int, ...], table_id: int
+    ) -> List[RLSFilter]:
+        from superset.connectors.sqla.models import (
+            RLSFilterRoles,
+            RLSFilterTables,
+            RowLevelSecurityFilter,
+        )
+
+        regular_filter_roles = (
+            self.get_session.query(RLSFilterRoles.c.rls_filter_id)
+            .join(RowLevelSecurityFilter)
+            .filter(
+                RowLevelSecurityFilter.filter_type == RowLevelSecurityFilterType.REGULAR
             )
-            base_filter_roles = (
-                self.get_session.query(RLSFilterRoles.c.rls_filter_id)
-                .join(RowLevelSecurityFilter)
-                .filter(
-                    RowLevelSecurityFilter.filter_type
-                    == RowLevelSecurityFilterType.BASE
-                )
-                .filter(RLSFilterRoles.c.role_id.in_(user_roles))
-                .subquery()
+            .filter(RLSFilterRoles.c.role_id.in_(role_ids))
+            .subquery()
+        )
+        base_filter_roles = (
+            self.get_session.query(RLSFilterRoles.c.rls_filter_id)
+            .join(RowLevelSecurityFilter)
+            .filter(
+                RowLevelSecurityFilter.filter_type == RowLevelSecurityFilterType.BASE
             )
-            filter_tables = (
-                self.get_session.query(RLSFilterTables.c.rls_filter_id)
-                .filter(RLSFilterTables.c.table_id == table.id)
-                .subquery()
+            .filter(RLSFilterRoles.c.role_id.in_(role_ids))
+            .subquery()
+        )
+        filter_tables = (
+            self.get_session.query(RLSFilterTables.c.rls_filter_id)
+            .filter(RLSFilterTables.c.table_id == table_id)
+            .subquery()
+        )
+        query = (
+            self.get_session.query(
+                RowLevelSecurityFilter.id,
+                RowLevelSecurityFilter.group_key,
+                RowLevelSecurityFilter.clause,
             )
-            query = (
-                self.get_session.query(
-                    RowLevelSecurityFilter.id,
-                    RowLevelSecurityFilter.group_key,
-                    RowLevelSecurityFilter.clause,
-                )
-                .filter(RowLevelSecurityFilter.id.in_(filter_tables))
-                .filter(
-                    or_(
-                        and_(
-                            RowLevelSecurityFilter.filter_type
-                            == RowLevelSecurityFilterType.REGULAR,
-                            RowLevelSecurityFilter.id.in_(regular_filter_roles),
-                        ),
-                        and_(
-                            RowLevelSecurityFilter.filter_type
-                            == RowLevelSecurityFilterType.BASE,
-                            RowLevelSecurityFilter.id.notin_(base_filter_roles),
-                        ),
-                    )
+            .filter(RowLevelSecurityFilter.id.in_(filter_tables))
+            .filter(
+                or_(
+                    and_(
+                        RowLevelSecurityFilter.filter_type
+                        == RowLevelSecurityFilterType.REGULAR,
+                        RowLevelSecurityFilter.id.in_(regular_filter_roles),
+                    ),
+                    and_(
+                        RowLevelSecurityFilter.filter_type
+                        == RowLevelSecurityFilterType.BASE,
+                        RowLevelSecurityFilter.id.notin_(base_filter_roles),
+                    ),
                 )
             )
-            return query.all()
-        return []
+        )
+        return [RLSFilter(*row) for row in query.all()]
+
+    def invalidate_rls_filters(self) -> None:  # pylint: disable=no-self-use
+        """
+        Invalidate the row level security filters cached by `get_rls_filters`, in
+        the cache backend and for the current request.
+        """
+        if has_app_context():
+            g.pop("rls_filters", None)
+            # bumped even when the cache is disabled, for the filters cached before
+            # it was disabled not to be served once it's enabled again
+            bump_version(RLS_FILTERS_VERSION_CACHE_KEY, "rls_filters_version")
+            current_app.config["STATS_LOGGER"].incr("rls_filters.invalidated")
+
+    @staticmethod
+    def _flag_session(target: Model, flag: str) -> None:
+        session = object_session(target)
+        if session:
+            session.info[flag] = True
+
+    @staticmethod
+    def on_rls_change(  # pylint: disable=unused-argument
+        mapper: Mapper, connection: Connection, target: Model
+    ) -> None:
+        """
+        Flag the session of a changed row level security filter or role, for the
+        cached filters to be invalidated once the session is committed.
+
+        :param mapper: The mapper
+        :param connection: The DB-API connection
+        :param target: The changed filter or role
+        """
+        SupersetSecurityManager._flag_session(target, "rls_filters_changed")
+
+    @staticmethod
+    def on_user_roles_change(  # pylint: disable=unused-argument
+        target: User, value: Role, initiator: Any
+    ) -> None:
+        """
+        Flag the session of a user whose roles changed, for the cached row level
+        security filters to be invalidated once the session is committed.
+
+        :param target: The user
+        :param value: The added or removed role
+        :param initiator: The attribute event token
+        """
+        SupersetSecurityManager._flag_session(target, "rls_filters_changed")
+
+    @staticmethod
+    def on_permissions_change(  # pylint: disable=unused-argument
+        mapper: Mapper, connection: Connection, target: Model
+    ) -> None:
+        """
+        Flag the session of a deleted role or permission view, for the permission
+        snapshots to be invalidated once the session is committed.
+
+        :param mapper: The mapper
+        :param connection: The DB-API connection
+        :param target: The deleted role or permission view
+        """
+        SupersetSecurityManager._flag_session(target, "permissions_changed")
+
+    @staticmethod
+    def on_role_permissions_change(  # pylint: disable=unused-argument
+        target: Role, value: PermissionView, initiator: Any
+    ) -> None:
+        """
+        Flag the session of a role whose permissions changed, for the permission
+        snapshots to be invalidated once the session is committed.
+
+        :param target: The role
+        :param value: The added or removed permission view
+        :param initiator: The attribute event token
+        """
+        SupersetSecurityManager._flag_session(target, "permissions_changed")
+
+    def on_session_commit(self, session: Session) -> None:
+        """
+        Session event listener invalidating the cached row level security filters
+        and permission snapshots when the committed session changed any of them.
+
+        :param session: The committed session
+        """
+        if session.info.pop("rls_filters_changed", False):
+            self.invalidate_rls_filters()
+        if session.info.pop("permissions_changed", False):
+            self.invalidate_permissions()
 
     def get_rls_ids(self, table: "BaseDatasource") -> List[int]:
         """
@@ -1156,3 +1398,16 @@ class SupersetSecurityManager(  # pylint: disable=too-many-public-methods
 
         exists = db.session.query(query.exists()).scalar()
         return exists
+
+
+# invalidate the permission snapshots when the permissions of roles change
+sa.event.listen(
+    Role.permissions, "append", SupersetSecurityManager.on_role_permissions_change
+)
+sa.event.listen(
+    Role.permissions, "remove", SupersetSecurityManager.on_role_permissions_change
+)
+sa.event.listen(Role, "after_delete", SupersetSecurityManager.on_permissions_change)
+sa.event.listen(
+    PermissionView, "after_delete", SupersetSecurityManager.on_permissions_change
+)
@@ -0,0 +1,50 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Snapshots of the permissions granted to a set of roles, so that access checks are
+set lookups rather than queries over the FAB permission tables.
+"""
+from typing import Dict, FrozenSet, Iterable, Set, Tuple
+
+from superset.utils.versioned_cache import VersionedLRUCache
+
+# permission name -> names of the view menus the permission is granted on
+PermissionSnapshot = Dict[str, FrozenSet[str]]
+
+# cache key of the version of the permissions, snapshots built for older versions
+# are ignored
+PERMISSIONS_VERSION_CACHE_KEY = "permissions_version"
+
+
+def build_snapshot(permission_views: Iterable[Tuple[str, str]]) -> PermissionSnapshot:
+    """
+    Build a snapshot from (permission name, view menu name) pairs.
+
+    :param permission_views: the permission views granted to the roles
+    :return: the view menu names of each permission
+    """
+    view_menu_names: Dict[str, Set[str]] = {}
+    for permission_name, view_menu_name in permission_views:
+        view_menu_names.setdefault(permission_name, set()).add(view_menu_name)
+    return {name: frozenset(names) for name, names in view_menu_names.items()}
+
+
+class PermissionCache(VersionedLRUCache[Tuple[int, ...], PermissionSnapshot]):
+    """
+    Bounded, in-process LRU cache of permission snapshots keyed by the sorted ids of
+    role sets, and tagged with the permissions version they were built for.
+    """
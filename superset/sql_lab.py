@@ -34,12 +34,13 @@ from werkzeug.local import LocalProxy
 from superset import app, results_backend, results_backend_use_msgpack, security_manager
 from superset.dataframe import df_to_records
 from superset.db_engine_specs import BaseEngineSpec
-from superset.extensions import celery_app
+from superset.extensions import celery_app, tracer
 from superset.models.core import Database
 from superset.models.sql_lab import Query
 from superset.result_set import SupersetResultSet
 from superset.sql_parse import CtasMethod, ParsedQuery
 from superset.utils.celery import session_scope
+from superset.utils.chunked_results import ChunkedResultsWriter
 from superset.utils.core import (
     json_iso_dttm_ser,
     QuerySource,
@@ -176,6 +177,7 @@ def get_sql_results(  # pylint: disable=too-many-arguments
 
 
 # pylint: disable=too-many-arguments
+@tracer.traced("sqllab.execute_sql_statement")
 def execute_sql_statement(
     sql_statement: str,
     query: Query,
@@ -184,8 +186,14 @@ def execute_sql_statement(
     cursor: Any,
     log_params: Optional[Dict[str, Any]],
     apply_ctas: bool = False,
-) -> SupersetResultSet:
-    """Executes a single SQL statement"""
+    chunk_writer: Optional[ChunkedResultsWriter] = None,
+) -> Optional[SupersetResultSet]:
+    """
+    Executes a single SQL statement
+
+    When a `chunk_writer` is passed, rows are fetched in batches and written to it
+    as they come rather than returned.
+    """
     database = query.database
     db_engine_spec = database.db_engine_spec
     parsed_query = ParsedQuery(sql_statement)
@@ -233,19 +241,33 @@ def execute_sql_statement(
             )
         query.executed_sql = sql
         session.commit()
-        with stats_timing("sqllab.query.time_executing_query", stats_logger):
+        with stats_timing(
+            "sqllab.query.time_executing_query", stats_logger
+        ), tracer.span("sqllab.execute"):
             logger.debug("Query %d: Running query: %s", query.id, sql)
             db_engine_spec.execute(cursor, sql, async_=True)
             logger.debug("Query %d: Handling cursor", query.id)
             db_engine_spec.handle_cursor(cursor, query, session)
 
-        with stats_timing("sqllab.query.time_fetching_results", stats_logger):
+        with stats_timing(
+            "sqllab.query.time_fetching_results", stats_logger
+        ), tracer.span("sqllab.fetch"):
             logger.debug(
                 "Query %d: Fetching data for query object: %s",
                 query.id,
                 str(query.to_dict()),
             )
-            data = db_engine_spec.fetch_data(cursor, query.limit)
+            if chunk_writer is not None:
+                for rows in db_engine_spec.fetch_data_batches(
+                    cursor, config["RESULTS_BACKEND_CHUNK_SIZE"], query.limit
+                ):
+                    chunk_writer.write(
+                        SupersetResultSet(rows, cursor.description, db_engine_spec)
+                    )
+                return None
+            arrow_table = db_engine_spec.fetch_data_arrow(cursor, query.limit)
+            if arrow_table is None:
+                data = db_engine_spec.fetch_data(cursor, query.limit)
     except Exception as ex:
         logger.error("Query %d: %s", query.id, type(ex))
         logger.debug("Query %d: %s", query.id, ex)
@@ -253,6 +275,10 @@ def execute_sql_statement(
 
     logger.debug("Query %d: Fetching cursor description", query.id)
     cursor_description = cursor.description
+    if arrow_table is not None:
+        return SupersetResultSet.from_arrow_table(
+            arrow_table, cursor_description, db_engine_spec
+        )
     return SupersetResultSet(data, cursor_description, db_engine_spec)
 
 
@@ -266,6 +292,7 @@ def _serialize_payload(
     return json.dumps(payload, default=json_iso_dttm_ser, ignore_nan=True)
 
 
+@tracer.traced("sqllab.serialize_and_expand_data")
 def _serialize_and_expand_data(
     result_set: SupersetResultSet,
     db_engine_spec: BaseEngineSpec,
@@ -304,6 +331,7 @@ def _serialize_and_expand_data(
     return (data, selected_columns, all_columns, expanded_columns)
 
 
+@tracer.traced("sqllab.execute_sql_statements")
 def execute_sql_statements(  # pylint: disable=too-many-arguments, too-many-locals, too-many-statements, too-many-branches
     query_id: int,
     rendered_query: str,
@@ -323,6 +351,8 @@ def execute_sql_statements(  # pylint: disable=too-many-arguments, too-many-loca
     query = get_query(query_id, session)
     payload: Dict[str, Any] = dict(query_id=query_id)
     database = query.database
+    span = tracer.current_span()
+    span.set_attributes(query_id=query_id, database=database.database_name)
     db_engine_spec = database.db_engine_spec
     db_engine_spec.patch()
 
@@ -371,11 +401,31 @@ def execute_sql_statements(  # pylint: disable=too-many-arguments, too-many-loca
             )
         )
 
+    cache_timeout = database.cache_timeout
+    if cache_timeout is None:
+        cache_timeout = config["CACHE_DEFAULT_TIMEOUT"]
+
+    # Results of async queries are written to the results backend as they are
+    # fetched rather than held in memory
+    chunk_writer = None
+    if (
+        store_results
+        and not return_results
+        and results_backend
+        and config["RESULTS_BACKEND_CHUNKED"]
+    ):
+        chunk_writer = ChunkedResultsWriter(
+            results_backend, str(uuid.uuid4()), cache_timeout
+        )
+
+    # DML may leave session state behind (e.g. `SET` statements), so only read-only
+    # databases share pooled connections across queries
     engine = database.get_sqla_engine(
         schema=query.schema,
         nullpool=True,
         user_name=user_name,
         source=QuerySource.SQL_LAB,
+        pooled=not database.allow_dml,
     )
     # Sharing a single connection and cursor across the
     # execution of all statements (if many)
@@ -409,6 +459,8 @@ def execute_sql_statements(  # pylint: disable=too-many-arguments, too-many-loca
                     cursor,
                     log_params,
                     apply_ctas,
+                    # only the results of the last statement are kept
+                    chunk_writer if i == statement_count - 1 else None,
                 )
             except Exception as ex:  # pylint: disable=broad-except
                 msg = str(ex)
@@ -421,7 +473,12 @@ def execute_sql_statements(  # pylint: disable=too-many-arguments, too-many-loca
         conn.commit()
 
     # Success, updating the query entry in database
-    query.rows = result_set.size
+    query.rows = (
+        chunk_writer.rows
+        if chunk_writer
+        else cast(SupersetResultSet, result_set).size
+    )
+    span.set_attribute("rows", query.rows)
     query.progress = 100
     query.set_extra_json_key("progress", None)
     if query.select_as_cta:
@@ -435,39 +492,60 @@ def execute_sql_statements(  # pylint: disable=too-many-arguments, too-many-loca
     query.end_time = now_as_float()
 
     use_arrow_data = store_results and cast(bool, results_backend_use_msgpack)
-    data, selected_columns, all_columns, expanded_columns = _serialize_and_expand_data(
-        result_set, db_engine_spec, use_arrow_data, expand_data
-    )
+    if chunk_writer:
+        # the rows are in the results backend already, and expanded when read if
+        # the query asked for it
+        payload.update(
+            {
+                "status": QueryStatus.SUCCESS,
+                "chunks": chunk_writer.chunks,
+                "columns": chunk_writer.columns,
+                "selected_columns": chunk_writer.columns,
+                "expanded_columns": [],
+                "expand_data": expand_data,
+                "query": query.to_dict(),
+            }
+        )
+    else:
+        (
+            data,
+            selected_columns,
+            all_columns,
+            expanded_columns,
+        ) = _serialize_and_expand_data(
+            cast(SupersetResultSet, result_set),
+            db_engine_spec,
+            use_arrow_data,
+            expand_data,
+        )
 
-    # TODO: data should be saved separately from metadata (likely in Parquet)
-    payload.update(
-        {
-            "status": QueryStatus.SUCCESS,
-            "data": data,
-            "columns": all_columns,
-            "selected_columns": selected_columns,
-            "expanded_columns": expanded_columns,
-            "query": query.to_dict(),
-        }
-    )
+        # TODO: data should be saved separately from metadata (likely in Parquet)
+        payload.update(
+            {
+                "status": QueryStatus.SUCCESS,
+                "data": data,
+                "columns": all_columns,
+                "selected_columns": selected_columns,
+                "expanded_columns": expanded_columns,
+                "query": query.to_dict(),
+            }
+        )
     payload["query"]["state"] = QueryStatus.SUCCESS
 
     if store_results and results_backend:
-        key = str(uuid.uuid4())
+        key = chunk_writer.key if chunk_writer else str(uuid.uuid4())
         logger.info(
             "Query %s: Storing results in results backend, key: %s", str(query_id), key
         )
-        with stats_timing("sqllab.query.results_backend_write", stats_logger):
+        with stats_timing(
+            "sqllab.query.results_backend_write", stats_logger
+        ), tracer.span("sqllab.results_backend_write"):
             with stats_timing(
                 "sqllab.query.results_backend_write_serialization", stats_logger
             ):
                 serialized_payload = _serialize_payload(
                     payload, cast(bool, results_backend_use_msgpack)
                 )
-            cache_timeout = database.cache_timeout
-            if cache_timeout is None:
-                cache_timeout = config["CACHE_DEFAULT_TIMEOUT"]
-
             compressed = zlib_compress(serialized_payload)
             logger.debug(
                 "*** serialized payload size: %i", getsizeof(serialized_payload)
@@ -488,7 +566,7 @@ def execute_sql_statements(  # pylint: disable=too-many-arguments, too-many-loca
                 all_columns,
                 expanded_columns,
             ) = _serialize_and_expand_data(
-                result_set, db_engine_spec, False, expand_data
+                cast(SupersetResultSet, result_set), db_engine_spec, False, expand_data
             )
             payload.update(
                 {
@@ -0,0 +1,54 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import logging
+
+from celery.exceptions import SoftTimeLimitExceeded
+from flask import current_app
+
+from superset import app
+from superset.extensions import celery_app
+from superset.utils.activity import prune_logs, rollup_logs
+from superset.utils.celery import session_scope
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="activity.rollup_logs")
+def rollup_logs_task() -> None:
+    with app.app_context():  # type: ignore
+        try:
+            with session_scope(nullpool=True) as session:
+                rollup_logs(session)
+        except SoftTimeLimitExceeded as ex:
+            logger.warning("A timeout occurred while rolling up logs: %s", ex)
+
+
+@celery_app.task(name="activity.prune_logs")
+def prune_logs_task() -> None:
+    with app.app_context():  # type: ignore
+        if current_app.config["LOG_RETENTION_DAYS"] is None:
+            logger.info("LOG_RETENTION_DAYS isn't set, not pruning logs")
+            return
+        try:
+            with session_scope(nullpool=True) as session:
+                prune_logs(
+                    session,
+                    current_app.config["LOG_RETENTION_DAYS"],
+                    current_app.config["ACTIVITY_ROLLUP_RETENTION_DAYS"],
+                )
+        except SoftTimeLimitExceeded as ex:
+            logger.warning("A timeout occurred while pruning logs: %s", ex)
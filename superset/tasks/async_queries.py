@@ -16,12 +16,13 @@
 # under the License.
 
 import logging
-from typing import Any, cast, Dict, Optional
+from typing import Any, cast, Dict, List, Optional
 
 from celery.exceptions import SoftTimeLimitExceeded
 from flask import current_app, g
 
 from superset import app
+from superset.connectors.base.models import BaseDatasource
 from superset.exceptions import SupersetVizException
 from superset.extensions import (
     async_query_manager,
@@ -44,13 +45,58 @@ def ensure_user_is_set(user_id: Optional[int]) -> None:
         g.user = security_manager.get_user_by_id(user_id)
 
 
+def get_explore_json_dedup_key(
+    form_data: Dict[str, Any],
+    response_type: Optional[str],
+    datasource: BaseDatasource,
+    force: bool = False,
+) -> str:
+    """
+    Key identifying explore_json jobs that produce identical results, see
+    `QUERY_SINGLE_FLIGHT_ENABLED`. Forced jobs are only attached to forced jobs,
+    as the others may serve cached results.
+    """
+    cache_value = {
+        "form_data": form_data,
+        "response_type": response_type,
+        "force": force,
+        "rls": security_manager.get_rls_ids(datasource)
+        if datasource.is_rls_supported
+        else [],
+    }
+    return generate_cache_key(cache_value, "ejr-inflight-")
+
+
+def get_attached_jobs(
+    job_metadata: Dict[str, Any], dedup_key: Optional[str]
+) -> List[Dict[str, Any]]:
+    """Return all jobs waiting for the results of the job that ran"""
+    if dedup_key is None:
+        return [job_metadata]
+    return async_query_manager.detach_jobs(dedup_key, job_metadata)
+
+
+def update_attached_jobs(
+    job_metadata: Dict[str, Any],
+    dedup_key: Optional[str],
+    status: str,
+    **kwargs: Any,
+) -> None:
+    for job in get_attached_jobs(job_metadata, dedup_key):
+        async_query_manager.update_job(job, status, **kwargs)
+
+
 @celery_app.task(name="load_chart_data_into_cache", soft_time_limit=query_timeout)
 def load_chart_data_into_cache(
-    job_metadata: Dict[str, Any], form_data: Dict[str, Any],
+    job_metadata: Dict[str, Any],
+    form_data: Dict[str, Any],
+    dedup_key: Optional[str] = None,
 ) -> None:
     from superset.charts.commands.data import ChartDataCommand
 
     with app.app_context():  # type: ignore
+        # the jobs attached to this one wait until they're told how it completed
+        notified = False
         try:
             ensure_user_is_set(job_metadata.get("user_id"))
             command = ChartDataCommand()
@@ -58,22 +104,41 @@ def load_chart_data_into_cache(
             result = command.run(cache=True)
             cache_key = result["cache_key"]
             result_url = f"/api/v1/chart/data/{cache_key}"
-            async_query_manager.update_job(
-                job_metadata, async_query_manager.STATUS_DONE, result_url=result_url,
+            update_attached_jobs(
+                job_metadata,
+                dedup_key,
+                async_query_manager.STATUS_DONE,
+                result_url=result_url,
             )
+            notified = True
         except SoftTimeLimitExceeded as exc:
             logger.warning(
                 "A timeout occurred while loading chart data, error: %s", exc
             )
+            errors = [{"message": "A timeout occurred while loading chart data"}]
+            update_attached_jobs(
+                job_metadata, dedup_key, async_query_manager.STATUS_ERROR, errors=errors
+            )
+            notified = True
             raise exc
         except Exception as exc:
             # TODO: QueryContext should support SIP-40 style errors
             error = exc.message if hasattr(exc, "message") else str(exc)  # type: ignore # pylint: disable=no-member
             errors = [{"message": error}]
-            async_query_manager.update_job(
-                job_metadata, async_query_manager.STATUS_ERROR, errors=errors
+            update_attached_jobs(
+                job_metadata, dedup_key, async_query_manager.STATUS_ERROR, errors=errors
             )
+            notified = True
             raise exc
+        finally:
+            if not notified:
+                errors = [{"message": "Loading chart data was interrupted"}]
+                update_attached_jobs(
+                    job_metadata,
+                    dedup_key,
+                    async_query_manager.STATUS_ERROR,
+                    errors=errors,
+                )
 
         return None
 
@@ -84,9 +149,12 @@ def load_explore_json_into_cache(  # pylint: disable=too-many-locals
     form_data: Dict[str, Any],
     response_type: Optional[str] = None,
     force: bool = False,
+    dedup_key: Optional[str] = None,
 ) -> None:
     with app.app_context():  # type: ignore
         cache_key_prefix = "ejr-"  # ejr: explore_json request
+        # the jobs attached to this one wait until they're told how it completed
+        notified = False
         try:
             ensure_user_is_set(job_metadata.get("user_id"))
             datasource_id, datasource_type = get_datasource_info(None, None, form_data)
@@ -107,13 +175,22 @@ def load_explore_json_into_cache(  # pylint: disable=too-many-locals
             cache_key = generate_cache_key(cache_value, cache_key_prefix)
             set_and_log_cache(cache_manager.cache, cache_key, cache_value)
             result_url = f"/superset/explore_json/data/{cache_key}"
-            async_query_manager.update_job(
-                job_metadata, async_query_manager.STATUS_DONE, result_url=result_url,
+            update_attached_jobs(
+                job_metadata,
+                dedup_key,
+                async_query_manager.STATUS_DONE,
+                result_url=result_url,
             )
+            notified = True
         except SoftTimeLimitExceeded as ex:
             logger.warning(
                 "A timeout occurred while loading explore json, error: %s", ex
             )
+            errors = ["A timeout occurred while loading explore json"]
+            update_attached_jobs(
+                job_metadata, dedup_key, async_query_manager.STATUS_ERROR, errors=errors
+            )
+            notified = True
             raise ex
         except Exception as exc:
             if isinstance(exc, SupersetVizException):
@@ -124,9 +201,65 @@ def load_explore_json_into_cache(  # pylint: disable=too-many-locals
                 )
                 errors = [error]
 
-            async_query_manager.update_job(
-                job_metadata, async_query_manager.STATUS_ERROR, errors=errors
+            update_attached_jobs(
+                job_metadata, dedup_key, async_query_manager.STATUS_ERROR, errors=errors
             )
+            notified = True
             raise exc
+        finally:
+            if not notified:
+                errors = ["Loading explore json was interrupted"]
+                update_attached_jobs(
+                    job_metadata,
+                    dedup_key,
+                    async_query_manager.STATUS_ERROR,
+                    errors=errors,
+                )
 
         return None
+
+
+@celery_app.task(name="refresh_chart_data_cache", soft_time_limit=query_timeout)
+def refresh_chart_data_cache(
+    query_context: Dict[str, Any], query_index: int, user_id: Optional[int]
+) -> None:
+    """
+    Refresh the data cache of a query of a chart data request, see
+    `DATA_CACHE_STALE_TIMEOUT`.
+
+    :param query_context: the arguments of the `QueryContext` of the request
+    :param query_index: index of the query to refresh
+    :param user_id: id of the user the query ran as
+    """
+    from superset.common.query_context import QueryContext
+
+    with app.app_context():  # type: ignore
+        ensure_user_is_set(user_id)
+        query_context_obj = QueryContext(**query_context, force=True)
+        query_context_obj.get_df_payload(query_context_obj.queries[query_index])
+
+
+@celery_app.task(name="refresh_explore_json_cache", soft_time_limit=query_timeout)
+def refresh_explore_json_cache(
+    datasource_type: str,
+    datasource_id: int,
+    form_data: Dict[str, Any],
+    user_id: Optional[int],
+) -> None:
+    """
+    Refresh the data cache of a legacy chart, see `DATA_CACHE_STALE_TIMEOUT`.
+
+    :param datasource_type: type of the datasource of the chart
+    :param datasource_id: id of the datasource of the chart
+    :param form_data: form data of the chart
+    :param user_id: id of the user the chart was loaded as
+    """
+    with app.app_context():  # type: ignore
+        ensure_user_is_set(user_id)
+        viz_obj = get_viz(
+            datasource_type=datasource_type,
+            datasource_id=datasource_id,
+            form_data=form_data,
+            force=True,
+        )
+        viz_obj.get_payload()
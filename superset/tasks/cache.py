@@ -18,21 +18,34 @@
 
 import json
 import logging
-from typing import Any, Dict, List, Optional, Union
+import time
+from collections import defaultdict
+from datetime import datetime
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple, Union
 from urllib import request
 from urllib.error import URLError
 
 from celery.utils.log import get_task_logger
-from sqlalchemy import and_, func
+from flask import g
+from sqlalchemy import and_, extract
 
-from superset import app, db
+from superset import app, db, security_manager
+from superset.exceptions import SupersetException
 from superset.extensions import celery_app
 from superset.models.core import Log
 from superset.models.dashboard import Dashboard
 from superset.models.slice import Slice
 from superset.models.tags import Tag, TaggedObject
+from superset.utils.activity import get_top_dashboard_ids
+from superset.utils.concurrency import get_database_key, iter_concurrently
+from superset.utils.core import error_msg_from_exception
 from superset.utils.date_parser import parse_human_datetime
-from superset.views.utils import build_extra_filters
+from superset.views.utils import (
+    build_extra_filters,
+    get_form_data as get_explore_form_data,
+    get_viz,
+)
 
 logger = get_task_logger(__name__)
 logger.setLevel(logging.INFO)
@@ -89,8 +102,10 @@ class Strategy:
     """
     A cache warm up strategy.
 
-    Each strategy defines a `get_urls` method that returns a list of URLs to
-    be fetched from the `/superset/warm_up_cache/` endpoint.
+    Each strategy defines a `get_payloads` method that returns the charts to warm
+    up, as the form data overrides of each chart, i.e. its `slice_id` and the
+    `extra_filters` applied to it. They are loaded by the Celery worker, or fetched
+    from their explore URL (`get_urls`) when `CACHE_WARMUP_IN_PROCESS` is disabled.
 
     Strategies can be configured in `superset/config.py`:
 
@@ -111,8 +126,23 @@ class Strategy:
     def __init__(self) -> None:
         pass
 
+    def get_payloads(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError("Subclasses must implement get_payloads!")
+
     def get_urls(self) -> List[str]:
-        raise NotImplementedError("Subclasses must implement get_urls!")
+        payloads = self.get_payloads()
+        session = db.create_scoped_session()
+        charts = {
+            chart.id: chart
+            for chart in session.query(Slice).filter(
+                Slice.id.in_({payload["slice_id"] for payload in payloads})
+            )
+        }
+        return [
+            get_url(charts[payload["slice_id"]], payload)
+            for payload in payloads
+            if payload["slice_id"] in charts
+        ]
 
 
 class DummyStrategy(Strategy):
@@ -133,11 +163,11 @@ class DummyStrategy(Strategy):
 
     name = "dummy"
 
-    def get_urls(self) -> List[str]:
+    def get_payloads(self) -> List[Dict[str, Any]]:
         session = db.create_scoped_session()
-        charts = session.query(Slice).all()
+        charts = session.query(Slice.id).all()
 
-        return [get_url(chart) for chart in charts]
+        return [get_form_data(chart.id) for chart in charts]
 
 
 class TopNDashboardsStrategy(Strategy):
@@ -165,26 +195,17 @@ class TopNDashboardsStrategy(Strategy):
         self.top_n = top_n
         self.since = parse_human_datetime(since) if since else None
 
-    def get_urls(self) -> List[str]:
-        urls = []
+    def get_payloads(self) -> List[Dict[str, Any]]:
+        payloads = []
         session = db.create_scoped_session()
 
-        records = (
-            session.query(Log.dashboard_id, func.count(Log.dashboard_id))
-            .filter(and_(Log.dashboard_id.isnot(None), Log.dttm >= self.since))
-            .group_by(Log.dashboard_id)
-            .order_by(func.count(Log.dashboard_id).desc())
-            .limit(self.top_n)
-            .all()
-        )
-        dash_ids = [record.dashboard_id for record in records]
+        dash_ids = get_top_dashboard_ids(session, self.top_n, self.since)
         dashboards = session.query(Dashboard).filter(Dashboard.id.in_(dash_ids)).all()
         for dashboard in dashboards:
             for chart in dashboard.slices:
-                form_data_with_filters = get_form_data(chart.id, dashboard)
-                urls.append(get_url(chart, form_data_with_filters))
+                payloads.append(get_form_data(chart.id, dashboard))
 
-        return urls
+        return payloads
 
 
 class DashboardTagsStrategy(Strategy):
@@ -209,8 +230,8 @@ class DashboardTagsStrategy(Strategy):
         super(DashboardTagsStrategy, self).__init__()
         self.tags = tags or []
 
-    def get_urls(self) -> List[str]:
-        urls = []
+    def get_payloads(self) -> List[Dict[str, Any]]:
+        payloads = []
         session = db.create_scoped_session()
 
         tags = session.query(Tag).filter(Tag.name.in_(self.tags)).all()
@@ -231,7 +252,7 @@ class DashboardTagsStrategy(Strategy):
         tagged_dashboards = session.query(Dashboard).filter(Dashboard.id.in_(dash_ids))
         for dashboard in tagged_dashboards:
             for chart in dashboard.slices:
-                urls.append(get_url(chart))
+                payloads.append(get_form_data(chart.id))
 
         # add charts that are tagged
         tagged_objects = (
@@ -247,18 +268,229 @@ class DashboardTagsStrategy(Strategy):
         chart_ids = [tagged_object.object_id for tagged_object in tagged_objects]
         tagged_charts = session.query(Slice).filter(Slice.id.in_(chart_ids))
         for chart in tagged_charts:
-            urls.append(get_url(chart))
+            payloads.append(get_form_data(chart.id))
 
-        return urls
+        return payloads
 
 
-strategies = [DummyStrategy, TopNDashboardsStrategy, DashboardTagsStrategy]
+class PredictiveStrategy(Strategy):
+    """
+    Warm up the charts, with the filters, users load at this time of the day.
+
+    The `explore_json` requests logged over the period starting `since` are grouped
+    by chart and `extra_filters`, e.g. the dashboard filters and time range applied
+    to the chart, counting only the requests made within the next `lookahead`
+    minutes of the day. The `top_n` most frequent ones, requested at least
+    `min_count` times, are warmed up, as long as the warehouse time they are
+    expected to take fits in `budget` seconds. The expected time of a chart is the
+    slowest of its logged requests, as most of them are served from the cache.
+
+    Runs should be scheduled every `lookahead` minutes, shortly before the period
+    they warm up:
+
+        CELERYBEAT_SCHEDULE = {
+            'cache-warmup-predictive': {
+                'task': 'cache-warmup',
+                'schedule': crontab(minute='*/30'),
+                'kwargs': {
+                    'strategy_name': 'predictive',
+                    'top_n': 50,
+                    'since': '14 days ago',
+                    'lookahead': 30,
+                    'budget': 600,
+                },
+            },
+        }
+
+    """
+
+    name = "predictive"
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        top_n: int = 50,
+        since: str = "7 days ago",
+        lookahead: int = 60,
+        budget: Optional[int] = None,
+        min_count: int = 2,
+    ) -> None:
+        super(PredictiveStrategy, self).__init__()
+        self.top_n = top_n
+        self.since = parse_human_datetime(since) if since else None
+        self.lookahead = min(lookahead, 24 * 60)
+        self.budget = budget
+        self.min_count = min_count
+
+    def get_usage(self) -> Dict[Tuple[int, str], Tuple[int, int]]:
+        """
+        :return: the number of requests and the slowest request duration in ms by
+                 chart id and JSON encoded `extra_filters`
+        """
+        session = db.create_scoped_session()
+        now = datetime.utcnow()
+        start = now.hour * 60 + now.minute
+        minutes = {(start + minute) % (24 * 60) for minute in range(self.lookahead)}
+
+        query = (
+            session.query(Log.slice_id, Log.dttm, Log.duration_ms, Log.json)
+            .filter(Log.action == "explore_json")
+            .filter(Log.slice_id > 0)
+            .filter(extract("hour", Log.dttm).in_({minute // 60 for minute in minutes}))
+        )
+        if self.since:
+            query = query.filter(Log.dttm >= self.since)
+
+        usage: Dict[Tuple[int, str], Tuple[int, int]] = defaultdict(lambda: (0, 0))
+        for record in query.yield_per(1000):
+            if record.dttm.hour * 60 + record.dttm.minute not in minutes:
+                continue
+            try:
+                form_data = json.loads(record.json)["form_data"]
+                extra_filters = form_data.get("extra_filters") or []
+            except (AttributeError, KeyError, TypeError, ValueError):
+                continue
+            key = (record.slice_id, json.dumps(extra_filters, sort_keys=True))
+            count, duration = usage[key]
+            usage[key] = (count + 1, max(duration, record.duration_ms or 0))
+
+        return usage
+
+    def get_payloads(self) -> List[Dict[str, Any]]:
+        usage = sorted(
+            self.get_usage().items(), key=lambda item: (-item[1][0], item[0])
+        )
+        payloads = []
+        total_duration = 0
+        for (chart_id, extra_filters), (count, duration) in usage[: self.top_n]:
+            if count < self.min_count:
+                break
+            if self.budget is not None and total_duration + duration > (
+                self.budget * 1000
+            ):
+                logger.info(
+                    "Skipping chart %s, %sms over the warm up budget",
+                    chart_id,
+                    total_duration + duration - self.budget * 1000,
+                )
+                continue
+            total_duration += duration
+            payload: Dict[str, Any] = {"slice_id": chart_id}
+            if extra_filters != "[]":
+                payload["extra_filters"] = json.loads(extra_filters)
+            payloads.append(payload)
+
+        return payloads
+
+
+strategies = [
+    DummyStrategy,
+    TopNDashboardsStrategy,
+    DashboardTagsStrategy,
+    PredictiveStrategy,
+]
+
+
+def warm_up_chart(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Load the data of a chart into the cache, as the `/superset/warm_up_cache/`
+    endpoint does.
+
+    :param payload: the form data overrides of the chart, see `Strategy`
+    :return: the chart id, the duration of the warm up in ms and the errors of the
+             chart, if any
+    """
+    start = time.monotonic()
+    chart_id = payload["slice_id"]
+    try:
+        # the chart form data is loaded and completed the way explore requests do,
+        # for the cache keys to match theirs
+        g.form_data = payload
+        try:
+            form_data, chart = get_explore_form_data(chart_id, use_slice_data=True)
+        finally:
+            g.pop("form_data", None)
+        if not chart or not chart.datasource:
+            errors = [f"Chart {chart_id} or its datasource not found"]
+        else:
+            viz_obj = get_viz(
+                datasource_type=chart.datasource.type,
+                datasource_id=chart.datasource.id,
+                form_data=form_data,
+                force=True,
+            )
+            errors = viz_obj.get_payload()["errors"]
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.exception("Error warming up chart %s", chart_id)
+        errors = [error_msg_from_exception(ex)]
+
+    return {
+        "chart_id": chart_id,
+        "extra_filters": payload.get("extra_filters"),
+        "duration": round((time.monotonic() - start) * 1000),
+        "errors": errors or [],
+    }
+
+
+def warm_up_charts(payloads: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Warm up the cache of charts in the current process, as `CACHE_WARMUP_USER`,
+    running up to `CACHE_WARMUP_MAX_WORKERS` charts at once.
+
+    :param payloads: the form data overrides of the charts, see `Strategy`
+    :return: the result of each chart, see `warm_up_chart`, by outcome
+    :raises SupersetException: If `CACHE_WARMUP_USER` doesn't exist
+    """
+    config = app.config
+    stats_logger = config["STATS_LOGGER"]
+    results: Dict[str, List[Dict[str, Any]]] = {"success": [], "errors": []}
+    # a new app context, for the user not to leak into the calling context, and a
+    # request context, as the form data of charts is loaded from the request and
+    # Jinja macros, e.g. `url_param`, read it
+    with app.app_context(), app.test_request_context():
+        username = config["CACHE_WARMUP_USER"]
+        g.user = security_manager.find_user(username=username)
+        if not g.user:
+            raise SupersetException(f"CACHE_WARMUP_USER {username} not found")
+        charts = {
+            chart.id: chart
+            for chart in db.session.query(Slice).filter(
+                Slice.id.in_({payload["slice_id"] for payload in payloads})
+            )
+        }
+        database_keys = [
+            get_database_key(charts[payload["slice_id"]].datasource)
+            if payload["slice_id"] in charts
+            else None
+            for payload in payloads
+        ]
+        for _, result in iter_concurrently(
+            [partial(warm_up_chart, payload) for payload in payloads],
+            database_keys,
+            max_workers=config["CACHE_WARMUP_MAX_WORKERS"],
+        ):
+            stats_logger.timing("cache_warmup.chart", result["duration"])
+            if result["errors"]:
+                logger.error(
+                    "Error warming up chart %s: %s",
+                    result["chart_id"],
+                    result["errors"],
+                )
+                stats_logger.incr("cache_warmup.error")
+                results["errors"].append(result)
+            else:
+                logger.info(
+                    "Warmed up chart %s in %sms", result["chart_id"], result["duration"]
+                )
+                stats_logger.incr("cache_warmup.success")
+                results["success"].append(result)
+
+    return results
 
 
 @celery_app.task(name="cache-warmup")
 def cache_warmup(
     strategy_name: str, *args: Any, **kwargs: Any
-) -> Union[Dict[str, List[str]], str]:
+) -> Union[Dict[str, List[Any]], str]:
     """
     Warm up cache.
 
@@ -284,7 +516,15 @@ def cache_warmup(
         logger.exception(message)
         return message
 
-    results: Dict[str, List[str]] = {"success": [], "errors": []}
+    if app.config["CACHE_WARMUP_IN_PROCESS"]:
+        try:
+            return warm_up_charts(strategy.get_payloads())
+        except SupersetException as ex:
+            message = f"Error warming up cache: {ex}"
+            logger.error(message)
+            return message
+
+    results: Dict[str, List[Any]] = {"success": [], "errors": []}
     for url in strategy.get_urls():
         try:
             logger.info("Fetching %s", url)
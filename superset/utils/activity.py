@@ -0,0 +1,383 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Activity of users, read from rollups of the logs table rather than from the logs
+themselves once `rollup_logs` ran. Logs added since its last run are read from the
+logs table, so the activity is up to date regardless of how often it runs.
+"""
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import and_, func, or_, select, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import Alias
+
+from superset.models.activity import (
+    ActivityRollupState,
+    HourlyActivity,
+    UserRecentActivity,
+)
+from superset.models.core import Log
+
+logger = logging.getLogger(__name__)
+
+# (action, dashboard_id, slice_id)
+ObjectAction = Tuple[str, int, int]
+
+# the id of the only row of the rollup state, seeded by its migration
+ROLLUP_STATE_ID = 1
+
+
+def get_last_rolled_up_log_id(session: Session) -> Optional[int]:
+    """
+    :return: the id of the last log rolled up, 0 if none was, or None if the rollup
+             state is missing
+    """
+    return (
+        session.query(ActivityRollupState.last_log_id)
+        .filter_by(id=ROLLUP_STATE_ID)
+        .scalar()
+    )
+
+
+def _lock_rollup_state(session: Session) -> ActivityRollupState:
+    """
+    Lock the rollup state, which serializes concurrent runs on databases supporting
+    row locks. If the row is missing, concurrent runs can't both insert it: the
+    second insert fails on the primary key, and the row inserted first is used.
+    """
+    query = (
+        session.query(ActivityRollupState)
+        .filter_by(id=ROLLUP_STATE_ID)
+        .with_for_update()
+    )
+    state = query.one_or_none()
+    if state is None:
+        try:
+            session.add(ActivityRollupState(id=ROLLUP_STATE_ID, last_log_id=0))
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+        state = query.one()
+    return state
+
+
+def _floor_hour(dttm: datetime) -> datetime:
+    return dttm.replace(minute=0, second=0, microsecond=0)
+
+
+def rollup_logs(session: Session, batch_size: int = 10000) -> int:
+    """
+    Roll up the logs added since the last run, `batch_size` logs per transaction.
+
+    Logs are only rolled up once they are `ACTIVITY_ROLLUP_LAG` seconds old, for
+    logs committed out of order not to be skipped.
+
+    :param session: the session of the metadata database
+    :param batch_size: the number of logs rolled up per transaction
+    :return: the number of logs rolled up
+    """
+    cutoff = datetime.utcnow() - timedelta(
+        seconds=current_app.config["ACTIVITY_ROLLUP_LAG"]
+    )
+    total = 0
+    while True:
+        state = _lock_rollup_state(session)
+        logs = (
+            session.query(
+                Log.id,
+                Log.user_id,
+                Log.action,
+                Log.dashboard_id,
+                Log.slice_id,
+                Log.dttm,
+            )
+            .filter(Log.id > state.last_log_id)
+            .order_by(Log.id)
+            .limit(batch_size)
+            .all()
+        )
+        recent_logs = [log for log in logs if log.dttm and log.dttm >= cutoff]
+        if recent_logs:
+            logs = [log for log in logs if log.id < recent_logs[0].id]
+        if not logs:
+            session.commit()
+            break
+
+        _rollup_hourly_activity(session, logs)
+        _rollup_user_recent_activity(session, logs)
+        state.last_log_id = logs[-1].id
+        session.commit()
+        total += len(logs)
+        if recent_logs or len(logs) < batch_size:
+            break
+
+    logger.info("Rolled up %s logs", total)
+    return total
+
+
+def _rollup_hourly_activity(session: Session, logs: List[Any]) -> None:
+    counts: Dict[Tuple[datetime, str, int, int], int] = Counter()
+    for log in logs:
+        if (log.dashboard_id or log.slice_id) and log.dttm and log.action:
+            key = (
+                _floor_hour(log.dttm),
+                log.action,
+                log.dashboard_id or 0,
+                log.slice_id or 0,
+            )
+            counts[key] += 1
+    if not counts:
+        return
+
+    rows = {
+        (row.hour, row.action, row.dashboard_id, row.slice_id): row
+        for row in session.query(HourlyActivity).filter(
+            HourlyActivity.hour.in_({hour for hour, _, _, _ in counts})
+        )
+    }
+    for key, count in counts.items():
+        row = rows.get(key)
+        if row:
+            row.count += count
+        else:
+            hour, action, dashboard_id, slice_id = key
+            session.add(
+                HourlyActivity(
+                    hour=hour,
+                    action=action,
+                    dashboard_id=dashboard_id,
+                    slice_id=slice_id,
+                    count=count,
+                )
+            )
+
+
+def _rollup_user_recent_activity(session: Session, logs: List[Any]) -> None:
+    activity: Dict[Tuple[int, ObjectAction], Tuple[datetime, int]] = {}
+    for log in logs:
+        if (log.dashboard_id or log.slice_id) and log.dttm and log.action:
+            if not log.user_id:
+                continue
+            object_action = (log.action, log.dashboard_id or 0, log.slice_id or 0)
+            key = (log.user_id, object_action)
+            dttm, count = activity.get(key, (log.dttm, 0))
+            activity[key] = (max(dttm, log.dttm), count + 1)
+    if not activity:
+        return
+
+    object_actions = {object_action for _, object_action in activity}
+    rows = {
+        (row.user_id, (row.action, row.dashboard_id, row.slice_id)): row
+        for row in session.query(UserRecentActivity).filter(
+            UserRecentActivity.user_id.in_({user_id for user_id, _ in activity}),
+            UserRecentActivity.action.in_({action for action, _, _ in object_actions}),
+            UserRecentActivity.dashboard_id.in_({id_ for _, id_, _ in object_actions}),
+            UserRecentActivity.slice_id.in_({id_ for _, _, id_ in object_actions}),
+        )
+    }
+    for key, (dttm, count) in activity.items():
+        row = rows.get(key)
+        if row:
+            row.dttm = max(row.dttm, dttm)
+            row.count += count
+        else:
+            user_id, (action, dashboard_id, slice_id) = key
+            session.add(
+                UserRecentActivity(
+                    user_id=user_id,
+                    action=action,
+                    dashboard_id=dashboard_id,
+                    slice_id=slice_id,
+                    dttm=dttm,
+                    count=count,
+                )
+            )
+
+
+def prune_logs(
+    session: Session,
+    retention_days: int,
+    rollup_retention_days: Optional[int] = None,
+    batch_size: int = 10000,
+) -> int:
+    """
+    Delete the logs older than `retention_days`, `batch_size` logs per transaction.
+    Logs that weren't rolled up yet are kept regardless.
+
+    :param session: the session of the metadata database
+    :param retention_days: the number of days of logs to keep
+    :param rollup_retention_days: the number of days of rollups to keep, if set
+    :param batch_size: the number of logs deleted per transaction
+    :return: the number of deleted logs
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    last_log_id = get_last_rolled_up_log_id(session) or 0
+    total = 0
+    while True:
+        # logs are walked by id, old logs come first
+        log_ids = [
+            log_id
+            for (log_id,) in session.query(Log.id)
+            .filter(Log.id <= last_log_id, Log.dttm < cutoff)
+            .order_by(Log.id)
+            .limit(batch_size)
+        ]
+        if not log_ids:
+            break
+        session.query(Log).filter(Log.id.in_(log_ids)).delete(
+            synchronize_session=False
+        )
+        session.commit()
+        total += len(log_ids)
+
+    if rollup_retention_days is not None:
+        rollup_cutoff = datetime.utcnow() - timedelta(days=rollup_retention_days)
+        session.query(HourlyActivity).filter(
+            HourlyActivity.hour < rollup_cutoff
+        ).delete(synchronize_session=False)
+        session.query(UserRecentActivity).filter(
+            UserRecentActivity.dttm < rollup_cutoff
+        ).delete(synchronize_session=False)
+        session.commit()
+
+    logger.info("Deleted %s logs", total)
+    return total
+
+
+def get_recent_activity_subquery(
+    session: Session, user_id: int, actions: List[str], since: datetime
+) -> Alias:
+    """
+    The last time a user performed actions on dashboards and charts.
+
+    :param session: the session of the metadata database
+    :param user_id: the id of the user
+    :param actions: the actions to include
+    :param since: the time from which to include actions
+    :return: a subquery with `dashboard_id`, `slice_id`, `action` and `dttm` columns
+    """
+    log_filters = and_(
+        Log.action.in_(actions),
+        Log.user_id == user_id,
+        Log.dttm > since,
+        or_(Log.dashboard_id.isnot(None), Log.slice_id.isnot(None)),
+    )
+    last_log_id = get_last_rolled_up_log_id(session)
+    if last_log_id is None:
+        return (
+            session.query(
+                Log.dashboard_id,
+                Log.slice_id,
+                Log.action,
+                func.max(Log.dttm).label("dttm"),
+            )
+            .group_by(Log.dashboard_id, Log.slice_id, Log.action)
+            .filter(log_filters)
+            .subquery()
+        )
+
+    activity = union_all(
+        select(
+            [
+                UserRecentActivity.dashboard_id.label("dashboard_id"),
+                UserRecentActivity.slice_id.label("slice_id"),
+                UserRecentActivity.action.label("action"),
+                UserRecentActivity.dttm.label("dttm"),
+            ]
+        ).where(
+            and_(
+                UserRecentActivity.user_id == user_id,
+                UserRecentActivity.action.in_(actions),
+                UserRecentActivity.dttm > since,
+            )
+        ),
+        select(
+            [
+                func.coalesce(Log.dashboard_id, 0).label("dashboard_id"),
+                func.coalesce(Log.slice_id, 0).label("slice_id"),
+                Log.action.label("action"),
+                Log.dttm.label("dttm"),
+            ]
+        ).where(and_(Log.id > last_log_id, log_filters)),
+    ).alias("activity")
+    return (
+        session.query(
+            activity.c.dashboard_id,
+            activity.c.slice_id,
+            activity.c.action,
+            func.max(activity.c.dttm).label("dttm"),
+        )
+        .group_by(activity.c.dashboard_id, activity.c.slice_id, activity.c.action)
+        .subquery()
+    )
+
+
+def get_top_dashboard_ids(
+    session: Session, top_n: int, since: Optional[datetime] = None
+) -> List[int]:
+    """
+    The most active dashboards, i.e. with the most logs. Rolled up logs are counted
+    by hour, including the whole hour `since` falls in.
+
+    :param session: the session of the metadata database
+    :param top_n: the number of dashboards
+    :param since: the time from which to count logs, if set
+    :return: the ids of the dashboards, the most active first
+    """
+    log_filters = [Log.dashboard_id.isnot(None)]
+    if since:
+        log_filters.append(Log.dttm >= since)
+    last_log_id = get_last_rolled_up_log_id(session)
+    if last_log_id is None:
+        records = (
+            session.query(Log.dashboard_id, func.count(Log.dashboard_id))
+            .filter(and_(*log_filters))
+            .group_by(Log.dashboard_id)
+            .order_by(func.count(Log.dashboard_id).desc())
+            .limit(top_n)
+            .all()
+        )
+        return [record.dashboard_id for record in records]
+
+    rollup_filters = [HourlyActivity.dashboard_id != 0]
+    if since:
+        rollup_filters.append(HourlyActivity.hour >= _floor_hour(since))
+    activity = union_all(
+        select(
+            [
+                HourlyActivity.dashboard_id.label("dashboard_id"),
+                HourlyActivity.count.label("count"),
+            ]
+        ).where(and_(*rollup_filters)),
+        select([Log.dashboard_id.label("dashboard_id"), func.count().label("count")])
+        .where(and_(Log.id > last_log_id, *log_filters))
+        .group_by(Log.dashboard_id),
+    ).alias("activity")
+    count = func.sum(activity.c.count)
+    records = (
+        session.query(activity.c.dashboard_id, count)
+        .group_by(activity.c.dashboard_id)
+        .order_by(count.desc())
+        .limit(top_n)
+        .all()
+    )
+    return [record.dashboard_id for record in records]
@@ -0,0 +1,82 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import simplejson as json
+
+from superset.utils.core import json_int_dttm_ser
+
+logger = logging.getLogger(__name__)
+
+ARROW_STREAM_MIMETYPE = "application/vnd.apache.arrow.stream"
+# schema metadata key holding the JSON encoded metadata of a query result
+SUPERSET_METADATA_KEY = b"superset"
+
+
+def df_to_arrow_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Convert a DataFrame to an Arrow table column by column, without building any
+    per-row Python objects. Object columns Arrow can't type, e.g. with mixed
+    types, are converted to strings.
+
+    :param df: the DataFrame to convert
+    :return: an Arrow table, including the index unless it's a RangeIndex
+    """
+    preserve_index = not isinstance(df.index, pd.RangeIndex)
+    try:
+        return pa.Table.from_pandas(df, preserve_index=preserve_index)
+    except (pa.ArrowException, TypeError, ValueError) as ex:
+        logger.debug("DataFrame can't be converted to Arrow as is: %s", ex)
+
+    df = df.copy()
+    for column in df.columns[df.dtypes == np.object_]:
+        try:
+            pa.array(df[column], from_pandas=True)
+        except (pa.ArrowException, TypeError, ValueError):
+            df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+    return pa.Table.from_pandas(df, preserve_index=preserve_index)
+
+
+def write_ipc_stream(tables: Iterable[Tuple[pa.Table, Dict[str, Any]]]) -> bytes:
+    """
+    Write Arrow tables as consecutive IPC streams, one per table, in a single
+    buffer. Readers that support concatenated streams (e.g. Arrow JS
+    `RecordBatchReader.readAll`) get one table per stream back.
+
+    :param tables: tables with the metadata to store in their schema
+    :return: the IPC streams
+    """
+    sink = pa.BufferOutputStream()
+    for table, metadata in tables:
+        schema_metadata: Dict[bytes, bytes] = dict(table.schema.metadata or {})
+        schema_metadata[SUPERSET_METADATA_KEY] = json.dumps(
+            metadata, default=json_int_dttm_ser, ignore_nan=True
+        ).encode("utf-8")
+        table = table.replace_schema_metadata(schema_metadata)
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def get_result_metadata(table: pa.Table) -> Optional[Dict[str, Any]]:
+    """Return the metadata stored by `write_ipc_stream` in a table's schema"""
+    metadata = (table.schema.metadata or {}).get(SUPERSET_METADATA_KEY)
+    return json.loads(metadata) if metadata else None
@@ -165,6 +165,49 @@ class AsyncQueryManager:
         job_id = str(uuid.uuid4())
         return build_job_metadata(channel_id, job_id, status=self.STATUS_PENDING)
 
+    def attach_job(
+        self, dedup_key: str, job_metadata: Dict[str, Any], timeout: int
+    ) -> bool:
+        """
+        Register a job as waiting for the results of the in-flight job identified by
+        `dedup_key`.
+
+        :param dedup_key: key identifying identical jobs
+        :param job_metadata: metadata of the job to attach
+        :param timeout: seconds after which the in-flight job is considered lost,
+               counted from when it was enqueued
+        :return: True if no identical job is in flight, i.e. the caller should
+                 enqueue the job, False if the job was attached to a running one
+        """
+        list_name = f"{self._stream_prefix}inflight-{dedup_key}"
+        length = self._redis.rpush(list_name, json.dumps(job_metadata))
+        if length == 1:
+            # only the job that is enqueued sets the expiry, so that jobs attached
+            # to a lost job can't keep it in flight
+            self._redis.expire(list_name, timeout)
+        return length == 1
+
+    def detach_jobs(
+        self, dedup_key: str, job_metadata: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the metadata of all jobs attached to `dedup_key`, including the one
+        that ran, and mark the job as no longer in flight.
+
+        :param dedup_key: key identifying identical jobs
+        :param job_metadata: metadata of the job that ran
+        :return: metadata of all jobs waiting for the results
+        """
+        list_name = f"{self._stream_prefix}inflight-{dedup_key}"
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.lrange(list_name, 0, -1)
+        pipe.delete(list_name)
+        attached, _ = pipe.execute()
+        jobs = [json.loads(job) for job in attached]
+        if job_metadata["job_id"] not in {job["job_id"] for job in jobs}:
+            jobs.append(job_metadata)
+        return jobs
+
     def read_events(
         self, channel: str, last_id: Optional[str]
     ) -> List[Optional[Dict[str, Any]]]:
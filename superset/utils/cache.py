@@ -17,9 +17,11 @@
 import hashlib
 import json
 import logging
+import time
+import uuid
 from datetime import datetime, timedelta
 from functools import wraps
-from typing import Any, Callable, Dict, Optional, Union
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
 from flask import current_app as app, request
 from flask_caching import Cache
@@ -53,11 +55,28 @@ def set_and_log_cache(
     cache_value: Dict[str, Any],
     cache_timeout: Optional[int] = None,
     datasource_uid: Optional[str] = None,
+    stale_timeout: Optional[int] = None,
 ) -> None:
+    """
+    Cache a value along with the time it was cached at.
+
+    :param cache_instance: the cache to store the value in
+    :param cache_key: key of the value
+    :param cache_value: the value
+    :param cache_timeout: seconds after which the value expires
+    :param datasource_uid: uid of the datasource the value was computed from
+    :param stale_timeout: seconds the value is kept past its expiry, to be served
+           while it's refreshed, see `should_refresh`
+    """
     timeout = cache_timeout if cache_timeout else config["CACHE_DEFAULT_TIMEOUT"]
     try:
         dttm = datetime.utcnow().isoformat().split(".")[0]
         value = {**cache_value, "dttm": dttm}
+        if stale_timeout is not None:
+            value["expires_at"] = time.time() + timeout
+            timeout += stale_timeout
+            cache_instance.set(f"{cache_key}__hits", 0, timeout=timeout)
+            cache_instance.delete(f"{cache_key}__refresh")
         cache_instance.set(cache_key, value, timeout=timeout)
         stats_logger.incr("set_cache_key")
 
@@ -75,6 +94,122 @@ def set_and_log_cache(
         logger.exception(ex)
 
 
+class CacheLease:
+    """
+    A lease on computing the value of a cache key, stored in the cache backend itself
+    so that it is visible to all web and Celery workers sharing that backend.
+    """
+
+    def __init__(self, cache_instance: Cache, cache_key: str) -> None:
+        self.cache_instance = cache_instance
+        self.lease_key = f"{cache_key}__lease"
+        self.token = str(uuid.uuid4())
+
+    def acquire(self) -> bool:
+        # `add` only sets the key if it doesn't exist yet, atomically on backends
+        # that can be shared between workers (e.g. Redis, Memcached)
+        return bool(
+            self.cache_instance.add(
+                self.lease_key,
+                self.token,
+                timeout=config["QUERY_SINGLE_FLIGHT_LEASE_TIMEOUT"],
+            )
+        )
+
+    def release(self) -> None:
+        # the lease may have expired and been acquired by another worker since
+        if self.cache_instance.get(self.lease_key) == self.token:
+            self.cache_instance.delete(self.lease_key)
+
+
+def get_cached_value_or_lease(
+    cache_instance: Cache, cache_key: str
+) -> Tuple[Optional[Dict[str, Any]], Optional[CacheLease]]:
+    """
+    Single-flight cache lookup.
+
+    When the value isn't cached and `QUERY_SINGLE_FLIGHT_ENABLED` is set, only the
+    first caller gets a lease and is expected to compute and cache the value before
+    releasing it. Other callers wait for the value to show up in the cache, for at
+    most `QUERY_SINGLE_FLIGHT_WAIT_TIMEOUT` seconds, and take over the lease if the
+    leader gives up without caching a value.
+
+    :param cache_instance: the cache holding both the values and the leases
+    :param cache_key: key of the value
+    :return: the cached value if there is one, else a lease held by the caller, if
+             any; with neither, the caller should compute the value on its own
+    """
+    cache_value = cache_instance.get(cache_key)
+    if cache_value or not config["QUERY_SINGLE_FLIGHT_ENABLED"]:
+        return cache_value, None
+
+    lease = CacheLease(cache_instance, cache_key)
+    deadline = time.monotonic() + config["QUERY_SINGLE_FLIGHT_WAIT_TIMEOUT"]
+    while True:
+        if lease.acquire():
+            # the previous leader may have cached the value in the meantime
+            cache_value = cache_instance.get(cache_key)
+            if cache_value:
+                lease.release()
+                return cache_value, None
+            stats_logger.incr("single_flight.lease_acquired")
+            return None, lease
+        if time.monotonic() >= deadline:
+            logger.warning("Timed out waiting for in-flight cache key %s", cache_key)
+            stats_logger.incr("single_flight.wait_timeout")
+            return None, None
+        time.sleep(config["QUERY_SINGLE_FLIGHT_POLL_INTERVAL"])
+        cache_value = cache_instance.get(cache_key)
+        if cache_value:
+            stats_logger.incr("single_flight.served_in_flight")
+            return cache_value, None
+
+
+def should_refresh(
+    cache_instance: Cache, cache_key: str, cache_value: Dict[str, Any]
+) -> bool:
+    """
+    Stale-while-revalidate check, to be called on each read of a value cached with a
+    `stale_timeout`.
+
+    Values read past their expiry are stale and should be refreshed. Values read at
+    least `DATA_CACHE_REFRESH_AHEAD_MIN_HITS` times are refreshed ahead of their
+    expiry, within the last `DATA_CACHE_REFRESH_AHEAD_WINDOW` seconds. Only the
+    first caller gets to refresh a value, other callers keep being served the
+    cached value until it's refreshed or `DATA_CACHE_REFRESH_LEASE_TIMEOUT` passed.
+
+    :param cache_instance: the cache holding the value
+    :param cache_key: key of the value
+    :param cache_value: the cached value
+    :return: whether the caller should refresh the value in the background
+    """
+    expires_at = cache_value.get("expires_at")
+    if expires_at is None:
+        return False
+
+    remaining = expires_at - time.time()
+    if remaining > 0:
+        hits = cache_instance.inc(f"{cache_key}__hits") or 0
+        if (
+            remaining > config["DATA_CACHE_REFRESH_AHEAD_WINDOW"]
+            or hits < config["DATA_CACHE_REFRESH_AHEAD_MIN_HITS"]
+        ):
+            return False
+    else:
+        stats_logger.incr("data_cache.served_stale")
+
+    if not cache_instance.add(
+        f"{cache_key}__refresh",
+        True,
+        timeout=config["DATA_CACHE_REFRESH_LEASE_TIMEOUT"],
+    ):
+        return False
+    stats_logger.incr(
+        "data_cache.refresh_stale" if remaining <= 0 else "data_cache.refresh_ahead"
+    )
+    return True
+
+
 # If a user sets `max_age` to 0, for long the browser should cache the
 # resource? Flask-Caching will cache forever, but for the HTTP header we need
 # to specify a "far future" date.
@@ -0,0 +1,158 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import logging
+import time
+from typing import Any, NamedTuple, Optional
+
+import pandas as pd
+import pyarrow as pa
+from flask import Flask
+from flask_caching import Cache
+
+from superset.stats_logger import BaseStatsLogger, DummyStatsLogger
+
+logger = logging.getLogger(__name__)
+
+
+class EncodedDataFrame(NamedTuple):
+    """A DataFrame serialized as an Arrow IPC stream"""
+
+    data: bytes
+    compression: Optional[str]
+
+
+def _is_nested(data_type: pa.DataType) -> bool:
+    return (
+        pa.types.is_list(data_type)
+        or pa.types.is_large_list(data_type)
+        or pa.types.is_struct(data_type)
+        or pa.types.is_map(data_type)
+        or pa.types.is_union(data_type)
+    )
+
+
+def encode_dataframe(
+    df: pd.DataFrame, compression: Optional[str] = None
+) -> Optional[EncodedDataFrame]:
+    """
+    Serialize a DataFrame as an Arrow IPC stream.
+
+    :param df: the DataFrame to serialize
+    :param compression: IPC buffer compression, None, "lz4" or "zstd"
+    :return: the encoded DataFrame, or None if Arrow can't represent the DataFrame
+             faithfully, e.g. object columns with mixed types or nested values
+    """
+    # Arrow field names are strings, other column labels wouldn't round trip
+    if not all(isinstance(column, str) for column in df.columns):
+        return None
+    try:
+        table = pa.Table.from_pandas(df)
+    except (pa.ArrowException, TypeError, ValueError) as ex:
+        logger.debug("DataFrame can't be converted to Arrow: %s", ex)
+        return None
+    # nested values would come back as numpy arrays rather than lists/dicts
+    if any(_is_nested(field.type) for field in table.schema):
+        return None
+
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return EncodedDataFrame(sink.getvalue().to_pybytes(), compression)
+
+
+def decode_dataframe(encoded_df: EncodedDataFrame) -> pd.DataFrame:
+    """Deserialize a DataFrame serialized with `encode_dataframe`"""
+    reader = pa.ipc.open_stream(pa.py_buffer(encoded_df.data))
+    table = reader.read_all()
+    # integer columns with nulls are object columns of ints and None, as built by
+    # `SupersetResultSet`, rather than float columns with NaN
+    df = table.to_pandas(split_blocks=True, integer_object_nulls=True)
+    # object columns of a single type, e.g. ints, come back with that type
+    pandas_metadata = table.schema.pandas_metadata or {}
+    for column in pandas_metadata.get("columns", []):
+        name = column["name"]
+        if (
+            column["numpy_type"] == "object"
+            and name in df.columns
+            and df[name].dtype != object
+        ):
+            df[name] = df[name].astype(object)
+    return df
+
+
+class DataFrameCache(Cache):
+    """
+    Cache storing the DataFrames of cached values, i.e. the `df` key of the dicts
+    set by `set_and_log_cache`, as Arrow IPC streams rather than letting the
+    backend pickle them. Values without a DataFrame are stored as is.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._codec = "pickle"
+        self._compression: Optional[str] = None
+        self._stats_logger: BaseStatsLogger = DummyStatsLogger()
+
+    def init_app(self, app: Flask, config: Optional[Any] = None) -> None:
+        super().init_app(app, config)
+        self._codec = app.config["DATA_CACHE_DATAFRAME_CODEC"]
+        self._compression = app.config["DATA_CACHE_ARROW_COMPRESSION"]
+        self._stats_logger = app.config["STATS_LOGGER"]
+
+    def encode(self, value: Any) -> Any:
+        if (
+            self._codec != "arrow"
+            or not isinstance(value, dict)
+            or not isinstance(value.get("df"), pd.DataFrame)
+        ):
+            return value
+
+        start = time.monotonic()
+        encoded_df = encode_dataframe(value["df"], self._compression)
+        if encoded_df is None:
+            self._stats_logger.incr("data_cache.arrow.fallback")
+            return value
+        self._stats_logger.timing(
+            "data_cache.arrow.encode", (time.monotonic() - start) * 1000
+        )
+        self._stats_logger.gauge("data_cache.arrow.encoded_bytes", len(encoded_df.data))
+        return {**value, "df": encoded_df}
+
+    def decode(self, value: Any) -> Any:
+        # decode regardless of the codec, values may have been cached before it
+        # was changed
+        if not isinstance(value, dict) or not isinstance(
+            value.get("df"), EncodedDataFrame
+        ):
+            return value
+
+        start = time.monotonic()
+        df = decode_dataframe(value["df"])
+        self._stats_logger.timing(
+            "data_cache.arrow.decode", (time.monotonic() - start) * 1000
+        )
+        return {**value, "df": df}
+
+    def get(self, *args: Any, **kwargs: Any) -> Any:
+        return self.decode(super().get(*args, **kwargs))
+
+    def set(self, key: str, value: Any, *args: Any, **kwargs: Any) -> Any:
+        return super().set(key, self.encode(value), *args, **kwargs)
+
+    def add(self, key: str, value: Any, *args: Any, **kwargs: Any) -> Any:
+        return super().add(key, self.encode(value), *args, **kwargs)
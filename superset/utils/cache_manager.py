@@ -17,13 +17,15 @@
 from flask import Flask
 from flask_caching import Cache
 
+from superset.utils.cache_codec import DataFrameCache
+
 
 class CacheManager:
     def __init__(self) -> None:
         super().__init__()
 
         self._cache = Cache()
-        self._data_cache = Cache()
+        self._data_cache = DataFrameCache()
         self._thumbnail_cache = Cache()
 
     def init_app(self, app: Flask) -> None:
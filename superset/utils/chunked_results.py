@@ -0,0 +1,111 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Query results stored in the results backend as a list of chunks, each holding a
+slice of the rows as an Arrow IPC stream. The payload stored under the results key
+then only holds the metadata of the query and the list of chunks.
+"""
+from typing import Any, Dict, Iterator, List, Optional, TYPE_CHECKING
+
+import pyarrow as pa
+from cachelib.base import BaseCache
+
+from superset.exceptions import SerializationError
+
+if TYPE_CHECKING:
+    from superset.result_set import SupersetResultSet
+
+CHUNK_COMPRESSION = "lz4"
+
+
+def serialize_table(table: pa.Table) -> bytes:
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression=CHUNK_COMPRESSION)
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def deserialize_table(data: bytes) -> pa.Table:
+    return pa.ipc.open_stream(pa.py_buffer(data)).read_all()
+
+
+class ChunkedResultsWriter:
+    """Writes the result of a query to the results backend one chunk at a time"""
+
+    def __init__(self, cache: BaseCache, key: str, timeout: int) -> None:
+        self.cache = cache
+        self.key = key
+        self.timeout = timeout
+        self.chunks: List[Dict[str, Any]] = []
+        self.columns: List[Dict[str, Any]] = []
+        self.rows = 0
+
+    def write(self, result_set: "SupersetResultSet") -> None:
+        """
+        Store the rows of a result set as the next chunk.
+
+        :param result_set: the next rows of the query result
+        """
+        if not self.columns:
+            self.columns = result_set.columns
+        if not result_set.size:
+            return
+        chunk_key = f"{self.key}-chunk-{len(self.chunks)}"
+        self.cache.set(chunk_key, serialize_table(result_set.pa_table), self.timeout)
+        self.chunks.append(
+            {"key": chunk_key, "offset": self.rows, "rows": result_set.size}
+        )
+        self.rows += result_set.size
+
+
+def read_chunks(
+    cache: BaseCache,
+    chunks: List[Dict[str, Any]],
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Iterator[pa.Table]:
+    """
+    Read a range of rows of a chunked result, only loading the chunks it overlaps.
+
+    Chunks are yielded one at a time rather than concatenated, as the Arrow types of
+    a column may differ between chunks, e.g. when a column only holds nulls in a
+    chunk.
+
+    :param cache: the results backend
+    :param chunks: the chunks of the result
+    :param offset: index of the first row to read
+    :param limit: maximum number of rows to read
+    :return: tables holding the rows, in order
+    :raises SerializationError: If a chunk is missing, e.g. it expired
+    """
+    end = offset + limit if limit is not None else None
+    for chunk in chunks:
+        chunk_start = chunk["offset"]
+        chunk_end = chunk_start + chunk["rows"]
+        if chunk_end <= offset:
+            continue
+        if end is not None and chunk_start >= end:
+            break
+
+        data = cache.get(chunk["key"])
+        if data is None:
+            raise SerializationError("Results chunk not found")
+        table = deserialize_table(data)
+        start = max(offset - chunk_start, 0)
+        stop = chunk["rows"] if end is None else min(end - chunk_start, chunk["rows"])
+        yield table.slice(start, stop - start)
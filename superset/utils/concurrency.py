@@ -0,0 +1,197 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Run the independent queries of a request concurrently, e.g. the queries of a chart
+data request, so that its latency is the one of the slowest query rather than the
+sum of all of them.
+"""
+import contextvars
+import logging
+import threading
+from concurrent.futures import as_completed, Future, ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from flask import _request_ctx_stack, current_app, g, has_app_context
+
+from superset.utils import query_accounting
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_database_semaphores: Dict[Hashable, threading.BoundedSemaphore] = {}
+_database_semaphores_lock = threading.Lock()
+_local = threading.local()
+
+
+def _get_database_semaphore(database_key: Hashable) -> threading.BoundedSemaphore:
+    with _database_semaphores_lock:
+        if database_key not in _database_semaphores:
+            _database_semaphores[database_key] = threading.BoundedSemaphore(
+                current_app.config["QUERY_CONCURRENCY_PER_DATABASE"]
+            )
+        return _database_semaphores[database_key]
+
+
+def get_database_key(datasource: Any) -> Optional[Hashable]:
+    """The database queried by a datasource, Druid datasources have none"""
+    return getattr(datasource, "database_id", None)
+
+
+def load_datasource_relationships(datasource: Any) -> None:
+    """
+    Load the relationships of a datasource its queries rely on. The datasource is
+    bound to the session of the calling thread, which can't be used by queries
+    running in other threads to lazy load them.
+    """
+    for attr in ("columns", "metrics", "database", "cluster"):
+        getattr(datasource, attr, None)
+
+
+def _run_in_context(
+    func: Callable[[], T],
+    database_key: Optional[Hashable],
+    app: Any,
+    g_state: Dict[str, Any],
+    request_ctx: Any,
+) -> T:
+    with ExitStack() as stack:
+        # a new app context holds its own `g` and database session
+        stack.enter_context(app.app_context())
+        g.__dict__.update(g_state)
+        if request_ctx is not None:
+            stack.enter_context(request_ctx)
+        if database_key is not None:
+            stack.enter_context(_get_database_semaphore(database_key))
+        _local.running = True
+        try:
+            return func()
+        finally:
+            _local.running = False
+
+
+def _get_max_workers(func_count: int, max_workers: Optional[int]) -> int:
+    if not has_app_context() or getattr(_local, "running", False):
+        return 1
+    if max_workers is None:
+        max_workers = current_app.config["QUERY_CONCURRENCY_MAX_WORKERS"]
+    return min(func_count, max_workers)
+
+
+def _submit(
+    executor: ThreadPoolExecutor,
+    funcs: Sequence[Callable[[], T]],
+    database_keys: Optional[Sequence[Optional[Hashable]]],
+) -> List["Future[T]"]:
+    app = current_app._get_current_object()  # pylint: disable=protected-access
+    # the account of the request is carried by the context variables, its token can
+    # only be reset by the calling thread when the request is torn down
+    g_state = {
+        key: value
+        for key, value in g.__dict__.items()
+        if key not in query_accounting.G_ATTRIBUTES
+    }
+    user = g_state.get("user")
+    if user is not None and hasattr(user, "roles"):
+        # the user is bound to the session of the calling thread, which can't be
+        # used by the other threads to lazy load its roles
+        user.roles  # pylint: disable=pointless-statement
+    request_ctx = _request_ctx_stack.top
+
+    # each function runs in a copy of the context variables of the calling thread,
+    # e.g. the current tracing span
+    return [
+        executor.submit(
+            contextvars.copy_context().run,
+            _run_in_context,
+            func,
+            database_key,
+            app,
+            g_state,
+            request_ctx.copy() if request_ctx is not None else None,
+        )
+        for func, database_key in zip(funcs, database_keys or [None] * len(funcs))
+    ]
+
+
+def run_concurrently(
+    funcs: Sequence[Callable[[], T]],
+    database_keys: Optional[Sequence[Optional[Hashable]]] = None,
+) -> List[T]:
+    """
+    Run functions concurrently in threads carrying the Flask app and request
+    contexts and the `g` attributes, e.g. `g.user`, of the calling thread.
+
+    Functions run one after the other in the calling thread when concurrency is
+    disabled, or when called from a function already run concurrently, so that
+    nested calls can't starve the per database limit.
+
+    :param funcs: the functions to run, without arguments
+    :param database_keys: the database each function queries, at most
+           QUERY_CONCURRENCY_PER_DATABASE functions run at once per database
+    :return: the results of the functions, in order
+    :raises Exception: The first exception raised by a function, in order, once all
+            the functions have completed
+    """
+    max_workers = _get_max_workers(len(funcs), None)
+    if max_workers <= 1:
+        return [func() for func in funcs]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = _submit(executor, funcs, database_keys)
+    return [future.result() for future in futures]
+
+
+def iter_concurrently(
+    funcs: Sequence[Callable[[], T]],
+    database_keys: Optional[Sequence[Optional[Hashable]]] = None,
+    max_workers: Optional[int] = None,
+) -> Iterator[Tuple[int, T]]:
+    """
+    Like `run_concurrently`, but yield the result of each function as soon as it
+    completes rather than waiting for all of them.
+
+    :param funcs: the functions to run, without arguments
+    :param database_keys: the database each function queries
+    :param max_workers: maximum number of threads, QUERY_CONCURRENCY_MAX_WORKERS
+           by default
+    :return: the index of each function with its result, in completion order
+    :raises Exception: The exception raised by a function, when it completes
+    """
+    max_workers = _get_max_workers(len(funcs), max_workers)
+    if max_workers <= 1:
+        for i, func in enumerate(funcs):
+            yield i, func()
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = _submit(executor, funcs, database_keys)
+        indexes = {future: i for i, future in enumerate(futures)}
+        for future in as_completed(futures):
+            yield indexes[future], future.result()
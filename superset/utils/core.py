@@ -164,6 +164,7 @@ class ChartDataResultFormat(str, Enum):
     Chart data response format
     """
 
+    ARROW = "arrow"
     CSV = "csv"
     JSON = "json"
     XLSX = "xlsx"
@@ -15,12 +15,16 @@
 # specific language governing permissions and limitations
 # under the License.
 import re
+import time
 import urllib.request
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
 from urllib.error import URLError
 
+import numpy as np
 import pandas as pd
 
+from superset.stats_logger import BaseStatsLogger
+
 negative_number_re = re.compile(r"^-[0-9.]+$")
 
 # This regex will match if the string starts with:
@@ -58,15 +62,109 @@ def escape_value(value: str) -> str:
 
 
 def df_to_escaped_csv(df: pd.DataFrame, **kwargs: Any) -> Any:
-    escape_values = lambda v: escape_value(v) if isinstance(v, str) else v
+    return escape_dataframe(df).to_csv(**kwargs)
 
-    # Escape csv headers
-    df = df.rename(columns=escape_values)
 
-    # Escape csv rows
-    df = df.applymap(escape_values)
+def escape_series(series: pd.Series) -> pd.Series:
+    """
+    Column-wise equivalent of applying `escape_value` to the strings of a series.
 
-    return df.to_csv(**kwargs)
+    Only object and string columns can hold strings, other columns are returned as
+    is. Columns only holding strings are factorized so that each distinct value is
+    escaped once, which is where most of the time goes for the low cardinality
+    columns typical of query results.
+    """
+    if not (
+        pd.api.types.is_string_dtype(series.dtype)
+        or pd.api.types.is_categorical_dtype(series.dtype)
+    ) or series.empty:
+        return series
+    if pd.api.types.is_categorical_dtype(series.dtype):
+        series = series.astype(object)
+    inferred_type = pd.api.types.infer_dtype(series, skipna=True)
+    if inferred_type in ("mixed", "mixed-integer"):
+        # values of other types may hash like each other, e.g. 1 and True, so they
+        # can't be factorized
+        return series.map(lambda v: escape_value(v) if isinstance(v, str) else v)
+    if inferred_type != "string":
+        return series
+
+    values = series.to_numpy(dtype=object)
+    codes, uniques = pd.factorize(values)
+    escaped_uniques = np.array([escape_value(v) for v in uniques], dtype=object)
+    changed = escaped_uniques != uniques
+    if not changed.any():
+        return series
+
+    # missing values have a -1 code
+    to_escape = codes >= 0
+    to_escape[to_escape] = changed[codes[to_escape]]
+    values = values.copy()
+    values[to_escape] = escaped_uniques[codes[to_escape]]
+    # build the series positionally, the index may hold duplicates
+    return pd.Series(values, index=series.index, name=series.name, dtype=object)
+
+
+def escape_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """Escape the headers and the string values of a DataFrame"""
+    df = df.rename(columns=lambda v: escape_value(v) if isinstance(v, str) else v)
+    # select columns by position, names may hold duplicates
+    original = [df.iloc[:, i] for i in range(len(df.columns))]
+    escaped = [escape_series(series) for series in original]
+    if all(new is old for new, old in zip(escaped, original)):
+        return df
+    escaped_df = pd.concat(escaped, axis=1)
+    escaped_df.columns = df.columns
+    return escaped_df
+
+
+def split_dataframe(df: pd.DataFrame, batch_size: int) -> Iterator[pd.DataFrame]:
+    """Split a DataFrame in batches of rows, yielding it as is when it's empty"""
+    yield df.iloc[:batch_size]
+    for start in range(batch_size, len(df.index), batch_size):
+        yield df.iloc[start : start + batch_size]
+
+
+def stream_escaped_csv(
+    frames: Iterable[pd.DataFrame],
+    stats_logger: Optional[BaseStatsLogger] = None,
+    metric_prefix: str = "csv_export",
+    on_complete: Optional[Callable[[int], None]] = None,
+    **kwargs: Any,
+) -> Iterator[str]:
+    """
+    Render DataFrames holding consecutive rows of a result as escaped CSV, one
+    chunk per DataFrame, so that the CSV can be streamed to the client without
+    ever holding it whole in memory.
+
+    :param frames: the rows to render, the header is taken from the first one
+    :param stats_logger: logger recording the time to the first chunk and the
+           throughput of the export
+    :param metric_prefix: prefix of the recorded metrics
+    :param on_complete: called with the number of rows once all are rendered
+    :param kwargs: arguments passed to `DataFrame.to_csv`
+    :return: CSV chunks
+    """
+    start = time.monotonic()
+    header = kwargs.pop("header", True)
+    rows = 0
+    first = True
+    for df in frames:
+        yield escape_dataframe(df).to_csv(header=header if first else False, **kwargs)
+        if first and stats_logger:
+            stats_logger.timing(
+                f"{metric_prefix}.time_to_first_byte", (time.monotonic() - start) * 1000
+            )
+        first = False
+        rows += len(df.index)
+
+    duration = time.monotonic() - start
+    if stats_logger:
+        stats_logger.timing(f"{metric_prefix}.duration", duration * 1000)
+        if duration:
+            stats_logger.gauge(f"{metric_prefix}.rows_per_second", rows / duration)
+    if on_complete:
+        on_complete(rows)
 
 
 def get_chart_csv_data(
@@ -0,0 +1,230 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+from flask import Flask
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import URL
+from sqlalchemy.pool import QueuePool
+
+from superset.stats_logger import BaseStatsLogger, DummyStatsLogger
+
+logger = logging.getLogger(__name__)
+
+
+class EngineKey(NamedTuple):
+    database_id: int
+    schema: Optional[str]
+    effective_username: Optional[str]
+    # hash of the final URL and engine params, i.e. after DB_CONNECTION_MUTATOR
+    connection_hash: str
+
+
+def get_connection_hash(sqlalchemy_url: URL, params: Dict[str, Any]) -> str:
+    """
+    Hash the URL and engine params an engine would be created with, so that any
+    change to credentials, `extra` or the connection mutator output results in a
+    new engine rather than reusing a stale one.
+    """
+    json_data = json.dumps(
+        {"url": str(sqlalchemy_url), "params": params}, default=str, sort_keys=True
+    )
+    return hashlib.sha256(json_data.encode("utf-8")).hexdigest()
+
+
+class InstrumentedQueuePool(QueuePool):  # pylint: disable=too-many-ancestors
+    """QueuePool that reports how long a checkout waited for a free connection"""
+
+    stats_logger: BaseStatsLogger = DummyStatsLogger()
+
+    def _do_get(self) -> Any:
+        start = time.monotonic()
+        try:
+            return super()._do_get()
+        finally:
+            self.stats_logger.timing(
+                f"engine_pool.{self._orig_logging_name}.wait",
+                (time.monotonic() - start) * 1000,
+            )
+
+
+class _PooledEngine:  # pylint: disable=too-few-public-methods
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.last_used = time.monotonic()
+
+
+class EngineManager:
+    """
+    Keeps long-lived, pooled SQLAlchemy engines per database connection.
+
+    Engines are keyed by database id, schema, effective user and a hash of the final
+    connection URL/params, so impersonation and `DB_CONNECTION_MUTATOR` output never
+    share connections. Engines that have not been used for
+    `DB_ENGINE_POOL_IDLE_TIMEOUT` seconds are disposed of, as are the least recently
+    used engines once `DB_ENGINE_POOL_MAX_ENGINES` is reached.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._engines: "OrderedDict[EngineKey, _PooledEngine]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._enabled = False
+        self._pool_size = 5
+        self._max_overflow = 10
+        self._pool_timeout = 30
+        self._pool_recycle = 3600
+        self._pool_pre_ping = True
+        self._idle_timeout = 600
+        self._max_engines = 100
+        self._last_eviction = time.monotonic()
+        self._stats_logger: BaseStatsLogger = DummyStatsLogger()
+
+    def init_app(self, app: Flask) -> None:
+        config = app.config
+        self._enabled = config["DB_ENGINE_POOL_ENABLED"]
+        self._pool_size = config["DB_ENGINE_POOL_SIZE"]
+        self._max_overflow = config["DB_ENGINE_POOL_MAX_OVERFLOW"]
+        self._pool_timeout = config["DB_ENGINE_POOL_TIMEOUT"]
+        self._pool_recycle = config["DB_ENGINE_POOL_RECYCLE"]
+        self._pool_pre_ping = config["DB_ENGINE_POOL_PRE_PING"]
+        self._idle_timeout = config["DB_ENGINE_POOL_IDLE_TIMEOUT"]
+        self._max_engines = config["DB_ENGINE_POOL_MAX_ENGINES"]
+        self._stats_logger = config["STATS_LOGGER"]
+
+        # pooled connections must never be shared between forked processes,
+        # e.g. Celery prefork workers or gunicorn workers with `--preload`
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    @property
+    def is_enabled(self) -> bool:
+        return self._enabled
+
+    def get_engine(
+        self, key: EngineKey, sqlalchemy_url: URL, params: Dict[str, Any]
+    ) -> Engine:
+        """
+        Return the pooled engine for `key`, creating it on first use.
+
+        :param key: the engine key, see `EngineKey`
+        :param sqlalchemy_url: URL the engine connects to
+        :param params: `create_engine` params; pool params are set by the manager
+        :return: a long-lived engine backed by a `QueuePool`
+        """
+        self.evict_idle()
+        with self._lock:
+            pooled_engine = self._engines.get(key)
+            if pooled_engine is None:
+                pooled_engine = _PooledEngine(
+                    self._create_engine(key, sqlalchemy_url, params)
+                )
+                self._engines[key] = pooled_engine
+                self._stats_logger.incr("engine_pool.engine_created")
+                while len(self._engines) > self._max_engines:
+                    _, evicted = self._engines.popitem(last=False)
+                    evicted.engine.dispose()
+                    self._stats_logger.incr("engine_pool.engine_evicted")
+            else:
+                self._engines.move_to_end(key)
+            pooled_engine.last_used = time.monotonic()
+            self._stats_logger.gauge("engine_pool.engines", len(self._engines))
+            return pooled_engine.engine
+
+    def _create_engine(
+        self, key: EngineKey, sqlalchemy_url: URL, params: Dict[str, Any]
+    ) -> Engine:
+        params = {
+            **params,
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": self._pool_size,
+            "max_overflow": self._max_overflow,
+            "pool_timeout": self._pool_timeout,
+            "pool_recycle": self._pool_recycle,
+            "pool_pre_ping": self._pool_pre_ping,
+            "pool_logging_name": str(key.database_id),
+        }
+        engine = create_engine(sqlalchemy_url, **params)
+        InstrumentedQueuePool.stats_logger = self._stats_logger
+        self._register_pool_metrics(engine, key.database_id)
+        return engine
+
+    def _register_pool_metrics(self, engine: Engine, database_id: int) -> None:
+        stats_logger = self._stats_logger
+        prefix = f"engine_pool.{database_id}"
+
+        @event.listens_for(engine, "connect")
+        def on_connect(  # pylint: disable=unused-variable
+            dbapi_connection: Any, connection_record: Any
+        ) -> None:
+            stats_logger.incr(f"{prefix}.connect")
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(  # pylint: disable=unused-variable
+            dbapi_connection: Any, connection_record: Any, connection_proxy: Any
+        ) -> None:
+            pool = engine.pool
+            stats_logger.incr(f"{prefix}.checkout")
+            stats_logger.gauge(f"{prefix}.checked_out", pool.checkedout())
+            stats_logger.gauge(f"{prefix}.overflow", max(pool.overflow(), 0))
+
+    def evict_idle(self) -> None:
+        """Dispose of engines that have been idle for longer than the timeout"""
+        now = time.monotonic()
+        # sweeping is cheap but there's no need to do it on every checkout
+        if now - self._last_eviction < min(self._idle_timeout, 60):
+            return
+        with self._lock:
+            self._last_eviction = now
+            idle_keys = [
+                key
+                for key, pooled_engine in self._engines.items()
+                if now - pooled_engine.last_used >= self._idle_timeout
+            ]
+            for key in idle_keys:
+                self._engines.pop(key).engine.dispose()
+                self._stats_logger.incr("engine_pool.engine_idle_evicted")
+
+    def dispose(self, database_id: Optional[int] = None) -> None:
+        """
+        Dispose of pooled engines, e.g. after a database connection was changed.
+
+        :param database_id: only dispose of engines for this database
+        """
+        with self._lock:
+            keys = [
+                key
+                for key in self._engines
+                if database_id is None or key.database_id == database_id
+            ]
+            for key in keys:
+                self._engines.pop(key).engine.dispose()
+
+    def _reset_after_fork(self) -> None:
+        # the parent's connections are left alone: the child only forgets them
+        self._lock = threading.RLock()
+        self._engines = OrderedDict()
@@ -14,23 +14,42 @@
 # KIND, either express or implied.  See the License for the
 # specific language governing permissions and limitations
 # under the License.
+import atexit
 import functools
 import inspect
 import json
 import logging
+import os
 import textwrap
+import threading
+import time
 from abc import ABC, abstractmethod
 from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Any, Callable, cast, Dict, Iterator, Optional, Type, Union
-
-from flask import current_app, g, request
+from queue import Empty, Full, Queue
+from typing import (
+    Any,
+    Callable,
+    cast,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Type,
+    TYPE_CHECKING,
+    Union,
+)
+
+from flask import current_app, Flask, g, request
 from flask_appbuilder.const import API_URI_RIS_KEY
 from sqlalchemy.exc import SQLAlchemyError
 from typing_extensions import Literal
 
 from superset.stats_logger import BaseStatsLogger
 
+if TYPE_CHECKING:
+    from superset.models.core import Log
+
 
 def collect_request_payload() -> Dict[str, Any]:
     """Collect log payload identifiable from request context"""
@@ -297,7 +316,7 @@ def get_event_logger_from_cfg_value(cfg_value: Any) -> AbstractEventLogger:
 class DBEventLogger(AbstractEventLogger):
     """Event logger that commits logs to Superset DB"""
 
-    def log(  # pylint: disable=too-many-arguments,too-many-locals
+    def log(  # pylint: disable=too-many-arguments
         self,
         user_id: Optional[int],
         action: str,
@@ -308,9 +327,31 @@ class DBEventLogger(AbstractEventLogger):
         *args: Any,
         **kwargs: Any,
     ) -> None:
+        self.save_logs(
+            self.build_logs(
+                user_id,
+                action,
+                dashboard_id,
+                duration_ms,
+                slice_id,
+                referrer,
+                kwargs.get("records", []),
+            )
+        )
+
+    @staticmethod
+    def build_logs(  # pylint: disable=too-many-arguments
+        user_id: Optional[int],
+        action: str,
+        dashboard_id: Optional[int],
+        duration_ms: Optional[int],
+        slice_id: Optional[int],
+        referrer: Optional[str],
+        records: List[Dict[str, Any]],
+    ) -> List["Log"]:
         from superset.models.core import Log
 
-        records = kwargs.get("records", [])
+        dttm = datetime.utcnow()
         logs = []
         for record in records:
             json_string: Optional[str]
@@ -326,8 +367,13 @@ class DBEventLogger(AbstractEventLogger):
                 duration_ms=duration_ms,
                 referrer=referrer,
                 user_id=user_id,
+                dttm=dttm,
             )
             logs.append(log)
+        return logs
+
+    @staticmethod
+    def save_logs(logs: List["Log"]) -> None:
         try:
             sesh = current_app.appbuilder.get_session
             sesh.bulk_save_objects(logs)
@@ -335,3 +381,120 @@ class DBEventLogger(AbstractEventLogger):
         except SQLAlchemyError as ex:
             logging.error("DBEventLogger failed to log event(s)")
             logging.exception(ex)
+
+
+class BufferedDBEventLogger(DBEventLogger):
+    """
+    Event logger that commits logs to Superset DB in batches from a background
+    thread, so that requests don't wait on the metadata database.
+
+    Logs are queued in memory and committed once `batch_size` of them are queued, or
+    `flush_interval` seconds after the first of them was. When `max_queue_size` logs
+    are queued, e.g. as the metadata database is slow or down, logging waits up to
+    `block_timeout` seconds for the queue to drain before dropping the logs. Queued
+    logs are committed when the process exits, unless it's killed.
+
+        EVENT_LOGGER = BufferedDBEventLogger(batch_size=500, flush_interval=2)
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 100,
+        flush_interval: float = 5,
+        max_queue_size: int = 10000,
+        block_timeout: float = 0,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.block_timeout = block_timeout
+        self._queue: "Queue[Log]" = Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._app: Optional[Flask] = None
+
+    def log(  # pylint: disable=too-many-arguments
+        self,
+        user_id: Optional[int],
+        action: str,
+        dashboard_id: Optional[int],
+        duration_ms: Optional[int],
+        slice_id: Optional[int],
+        referrer: Optional[str],
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        self._ensure_started()
+        logs = self.build_logs(
+            user_id,
+            action,
+            dashboard_id,
+            duration_ms,
+            slice_id,
+            referrer,
+            kwargs.get("records", []),
+        )
+        for log in logs:
+            try:
+                self._queue.put(log, timeout=self.block_timeout)
+            except Full:
+                self.stats_logger.incr("event_logger.dropped")
+        self.stats_logger.gauge("event_logger.queue_depth", self._queue.qsize())
+
+    def flush(self) -> None:
+        """Commit the queued logs from the calling thread"""
+        logs = []
+        while True:
+            try:
+                logs.append(self._queue.get_nowait())
+            except Empty:
+                break
+        for i in range(0, len(logs), self.batch_size):
+            self._save_batch(logs[i : i + self.batch_size])
+
+    def _ensure_started(self) -> None:  # pylint: disable=protected-access
+        pid = os.getpid()
+        if self._pid == pid and self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._thread and self._thread.is_alive():
+                return
+            if self._pid is None:
+                atexit.register(self.flush)
+            elif self._pid != pid:
+                # in a forked worker, the logs queued before the fork are committed
+                # by the parent process
+                self._queue = Queue(maxsize=self.max_queue_size)
+            self._app = current_app._get_current_object()
+            self._pid = pid
+            self._thread = threading.Thread(
+                target=self._run, name="event-logger", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            logs = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(logs) < self.batch_size:
+                try:
+                    logs.append(
+                        self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                    )
+                except Empty:
+                    break
+            self._save_batch(logs)
+
+    def _save_batch(self, logs: List["Log"]) -> None:
+        if not self._app:
+            return
+        with self._app.app_context():
+            start = time.monotonic()
+            try:
+                self.save_logs(logs)
+            except Exception as ex:  # pylint: disable=broad-except
+                logging.exception(ex)
+            stats_logger = self.stats_logger
+            stats_logger.timing("event_logger.flush", (time.monotonic() - start) * 1000)
+            stats_logger.gauge("event_logger.queue_depth", self._queue.qsize())
@@ -0,0 +1,364 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+On-demand profiling of requests, see PROFILER_ENABLED.
+
+A profiled request records the stacks of the thread handling it, sampled every
+PROFILER_INTERVAL seconds, along with the number of metadata database queries and
+cache calls it made. Profiles are stored in PROFILER_STORAGE_DIR, or in the cache,
+and served by `ProfilerRestApi`.
+"""
+import functools
+import glob
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from types import FrameType
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import parse_qs
+
+from flask import current_app, Flask, g, Response
+from flask_login import current_user
+
+from superset.extensions import cache_manager, security_manager
+from superset.utils.query_accounting import account_queries, QueryAccount
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "HTTP_X_SUPERSET_PROFILE"
+PROFILE_QUERY_PARAM = "_profile"
+PROFILE_ID_HEADER = "X-Superset-Profile-Id"
+PROFILES_CACHE_KEY = "profiler_profiles"
+CACHE_METHODS = ("get", "get_many", "set", "set_many", "add", "delete", "inc", "has")
+SUMMARY_KEYS = (
+    "id",
+    "trigger",
+    "method",
+    "path",
+    "started_at",
+    "duration_ms",
+    "status",
+    "user_id",
+    "samples",
+    "db_queries",
+    "cache_calls",
+)
+
+_current_profile: "ContextVar[Optional[Profile]]" = ContextVar(
+    "profile", default=None
+)
+
+
+def _get_frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Sample the stack of a thread from a background thread"""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Dict[str, int] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(  # pylint: disable=protected-access
+                self.thread_id
+            )
+            names = []
+            while frame is not None:
+                names.append(_get_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                # the collapsed format of flame graph tools, outermost frame first
+                self.stacks[";".join(reversed(names))] += 1
+
+
+class Profile:  # pylint: disable=too-many-instance-attributes
+    def __init__(self, environ: Dict[str, Any], trigger: str, interval: float):
+        self.id = uuid.uuid4().hex
+        self.trigger = trigger
+        self.method = environ.get("REQUEST_METHOD")
+        self.path = environ.get("PATH_INFO")
+        self.query_string = environ.get("QUERY_STRING")
+        self.started_at = datetime.utcnow()
+        self.duration_ms = 0.0
+        self.status: Optional[str] = None
+        self.user_id: Optional[int] = None
+        self.authorized = trigger == "sample"
+        self.started = False
+        self.queries = QueryAccount()
+        self.cache_calls: Dict[str, int] = Counter()
+        self.sampler = StackSampler(threading.get_ident(), interval)
+
+    def start(self) -> None:
+        self.started = True
+        self.sampler.start()
+
+    def stop(self) -> None:
+        if self.started:
+            self.sampler.stop()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "trigger": self.trigger,
+            "method": self.method,
+            "path": self.path,
+            "query_string": self.query_string,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "user_id": self.user_id,
+            "samples": sum(self.sampler.stacks.values()),
+            "db_queries": self.queries.count,
+            "db_query_duration_ms": round(self.queries.duration_ms, 3),
+            "cache_calls": sum(self.cache_calls.values()),
+        }
+
+    def to_dict(self, top_n: int = 30) -> Dict[str, Any]:
+        self_samples: Dict[str, int] = Counter()
+        total_samples: Dict[str, int] = Counter()
+        for stack, count in self.sampler.stacks.items():
+            frames = stack.split(";")
+            self_samples[frames[-1]] += count
+            for frame in set(frames):
+                total_samples[frame] += count
+
+        return {
+            **self.summary(),
+            "interval_ms": self.sampler.interval * 1000,
+            "cache_calls_by_method": dict(self.cache_calls),
+            "repeated_db_queries": [
+                {"statement": shape, "count": count}
+                for shape, count in list(self.queries.get_repeated(2).items())[:top_n]
+            ],
+            "top_self": [
+                {"function": name, "samples": count}
+                for name, count in self_samples.most_common(top_n)
+            ],
+            "top_total": [
+                {"function": name, "samples": count}
+                for name, count in total_samples.most_common(top_n)
+            ],
+            "stacks": dict(self.sampler.stacks),
+        }
+
+
+def _get_summary(profile: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: profile.get(key) for key in SUMMARY_KEYS}
+
+
+def save_profile(profile: Dict[str, Any]) -> None:
+    """
+    Store a profile, evicting the oldest profiles beyond PROFILER_MAX_PROFILES.
+
+    :param profile: the profile, as returned by `Profile.to_dict`
+    """
+    storage_dir = current_app.config["PROFILER_STORAGE_DIR"]
+    max_profiles = current_app.config["PROFILER_MAX_PROFILES"]
+    if storage_dir:
+        os.makedirs(storage_dir, exist_ok=True)
+        with open(os.path.join(storage_dir, f"{profile['id']}.json"), "w") as file:
+            json.dump(profile, file)
+        paths = sorted(
+            glob.glob(os.path.join(storage_dir, "*.json")), key=os.path.getmtime
+        )
+        for path in paths[:-max_profiles]:
+            os.remove(path)
+        return
+
+    timeout = current_app.config["PROFILER_CACHE_TIMEOUT"]
+    cache_manager.cache.set(f"profiler_{profile['id']}", profile, timeout=timeout)
+    # the summaries of the latest profiles, newest first
+    summaries = cache_manager.cache.get(PROFILES_CACHE_KEY) or []
+    cache_manager.cache.set(
+        PROFILES_CACHE_KEY,
+        [_get_summary(profile)] + summaries[: max_profiles - 1],
+        timeout=timeout,
+    )
+
+
+def get_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    storage_dir = current_app.config["PROFILER_STORAGE_DIR"]
+    if not storage_dir:
+        return cache_manager.cache.get(f"profiler_{profile_id}")
+    if not profile_id.isalnum():
+        return None
+    try:
+        with open(os.path.join(storage_dir, f"{profile_id}.json")) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def get_profiles() -> List[Dict[str, Any]]:
+    """The summaries of the stored profiles, newest first"""
+    storage_dir = current_app.config["PROFILER_STORAGE_DIR"]
+    if not storage_dir:
+        return cache_manager.cache.get(PROFILES_CACHE_KEY) or []
+
+    summaries = []
+    paths = sorted(
+        glob.glob(os.path.join(storage_dir, "*.json")),
+        key=os.path.getmtime,
+        reverse=True,
+    )
+    for path in paths:
+        try:
+            with open(path) as file:
+                summaries.append(_get_summary(json.load(file)))
+        except (OSError, ValueError):
+            continue
+    return summaries
+
+
+def _count_calls(func: Callable[..., Any], key: str) -> Callable[..., Any]:
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.cache_calls[key] += 1
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+class ProfilerMiddleware:  # pylint: disable=too-few-public-methods
+    """
+    Profile the requests of users allowed to read profiles sending the
+    X-Superset-Profile header or the `_profile` query parameter, and a
+    PROFILER_SAMPLE_RATE fraction of all the requests.
+
+    The caches are only instrumented once a request is profiled, requests aren't
+    slowed down until then. Requests asking to be profiled are only sampled once the
+    user is known to be allowed to, from within Flask.
+    """
+
+    def __init__(self, wsgi_app: Callable[..., Any], app: Flask) -> None:
+        self.wsgi_app = wsgi_app
+        self.app = app
+        self.sample_rate = app.config["PROFILER_SAMPLE_RATE"]
+        self.interval = app.config["PROFILER_INTERVAL"]
+        self._instrumented = False
+        self._lock = threading.Lock()
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _get_trigger(self, environ: Dict[str, Any]) -> Optional[str]:
+        query_string = environ.get("QUERY_STRING", "")
+        if environ.get(PROFILE_HEADER) or (
+            PROFILE_QUERY_PARAM in query_string
+            and PROFILE_QUERY_PARAM in parse_qs(query_string, keep_blank_values=True)
+        ):
+            return "request"
+        if (
+            self.sample_rate
+            and random.random() < self.sample_rate
+            and not environ.get("PATH_INFO", "").startswith("/static/")
+        ):
+            return "sample"
+        return None
+
+    def _instrument(self) -> None:
+        with self._lock:
+            if self._instrumented:
+                return
+            backends = self.app.extensions.get("cache", {})
+            for name in ("cache", "data_cache", "thumbnail_cache"):
+                backend = backends.get(getattr(cache_manager, name))
+                for method in CACHE_METHODS:
+                    func = getattr(backend, method, None)
+                    if func is not None:
+                        key = f"{name}.{method}"
+                        setattr(backend, method, _count_calls(func, key))
+            self._instrumented = True
+
+    def _before_request(self) -> None:
+        profile = _current_profile.get()
+        if profile is None or profile.started:
+            return
+        if profile.trigger == "request":
+            # FAB sets `g.user` in its own hook, which may run after this one
+            if getattr(g, "user", None) is None:
+                g.user = current_user
+            profile.authorized = security_manager.can_access("can_read", "Profiler")
+            if not profile.authorized:
+                return
+
+        if not self._instrumented:
+            self._instrument()
+        profile.start()
+
+    @staticmethod
+    def _after_request(response: Response) -> Response:
+        profile = _current_profile.get()
+        if profile is not None and profile.started:
+            user = getattr(g, "user", None)
+            profile.user_id = user.get_id() if user else None
+            if security_manager.can_access("can_read", "Profiler"):
+                response.headers[PROFILE_ID_HEADER] = profile.id
+        return response
+
+    def __call__(
+        self, environ: Dict[str, Any], start_response: Callable[..., Any]
+    ) -> Iterable[bytes]:
+        trigger = self._get_trigger(environ)
+        if trigger is None:
+            return self.wsgi_app(environ, start_response)
+
+        profile = Profile(environ, trigger, self.interval)
+
+        def _start_response(status: str, *args: Any) -> Any:
+            profile.status = status
+            return start_response(status, *args)
+
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            with account_queries() as account:
+                profile.queries = account
+                return self.wsgi_app(environ, _start_response)
+        finally:
+            profile.stop()
+            profile.duration_ms = (time.perf_counter() - start) * 1000
+            _current_profile.reset(token)
+            if profile.started and profile.authorized:
+                with self.app.app_context():
+                    try:
+                        save_profile(profile.to_dict())
+                    except Exception:  # pylint: disable=broad-except
+                        logger.warning("Failed to save profile", exc_info=True)
@@ -0,0 +1,222 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Accounting of the statements run against the metadata database:
+
+    with account_queries() as account:
+        dashboard.full_data()
+    account.count, account.duration_ms, account.get_repeated(threshold=5)
+
+Statements only differing by their parameters share a shape, a shape executed many
+times by a single request is usually a relationship lazily loaded in a loop (N+1
+queries). Requests are accounted for when METADATA_QUERY_ACCOUNTING_ENABLED is set.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from flask import current_app, Flask, g, request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+QUERIES_HEADER = "X-Superset-Metadata-Queries"
+QUERIES_DURATION_HEADER = "X-Superset-Metadata-Queries-Duration-Ms"
+REPEATED_QUERIES_HEADER = "X-Superset-Metadata-Repeated-Queries"
+# the `g` attributes of a request account, which must not be copied to the threads
+# running the queries of the request concurrently, see `superset.utils.concurrency`
+G_ATTRIBUTES = ("query_account", "query_account_token")
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PARAMETER_RE = re.compile(r"%\(\w+\)s|%s|(?<![:\w]):\w+|\b\d+(?:\.\d+)?\b")
+_PARAMETER_LIST_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_current_account: "ContextVar[Optional[QueryAccount]]" = ContextVar(
+    "query_account", default=None
+)
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    The shape of a statement, its literals and parameters replaced by `?`, lists of
+    parameters included, e.g. for `IN` clauses.
+
+    :param statement: the statement, as sent to the DBAPI cursor
+    """
+    statement = _STRING_RE.sub("?", statement)
+    statement = _PARAMETER_RE.sub("?", statement)
+    statement = _PARAMETER_LIST_RE.sub("?", statement)
+    return _WHITESPACE_RE.sub(" ", statement).strip()
+
+
+class QueryAccount:
+    """The statements run while the account is current, and those of nested accounts"""
+
+    def __init__(self, parent: Optional["QueryAccount"] = None) -> None:
+        self.parent = parent
+        self.count = 0
+        self.duration_ms = 0.0
+        # statements are only normalized when the repeated shapes are asked for
+        self.statements: Dict[str, int] = Counter()
+        # statements can be run by several threads at once, see `run_concurrently`
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        account: Optional[QueryAccount] = self
+        while account is not None:
+            with account._lock:  # pylint: disable=protected-access
+                account.count += 1
+                account.duration_ms += duration_ms
+                account.statements[statement] += 1
+            account = account.parent
+
+    def get_shapes(self) -> Dict[str, int]:
+        """The number of executions of each statement shape"""
+        shapes: Dict[str, int] = Counter()
+        with self._lock:
+            statements = list(self.statements.items())
+        for statement, count in statements:
+            shapes[normalize_statement(statement)] += count
+        return shapes
+
+    def get_repeated(self, threshold: int) -> Dict[str, int]:
+        """
+        The statement shapes executed at least `threshold` times, most executed first.
+
+        :param threshold: the minimum number of executions of a shape
+        """
+        shapes = self.get_shapes()
+        return {
+            shape: count
+            for shape, count in sorted(shapes.items(), key=lambda item: -item[1])
+            if count >= threshold
+        }
+
+
+@contextmanager
+def account_queries() -> Iterator[QueryAccount]:
+    """Account for the statements run within the block, nested in the current account"""
+    account = QueryAccount(_current_account.get())
+    token = _current_account.set(account)
+    try:
+        yield account
+    finally:
+        _current_account.reset(token)
+
+
+def _before_cursor_execute(  # pylint: disable=too-many-arguments
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    if _current_account.get() is not None:
+        conn.info.setdefault("query_accounting_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(  # pylint: disable=too-many-arguments
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    account = _current_account.get()
+    if account is not None and conn.info.get("query_accounting_start"):
+        start = conn.info["query_accounting_start"].pop()
+        account.record(statement, (time.perf_counter() - start) * 1000)
+
+
+class QueryAccounting:
+    def __init__(self) -> None:
+        self._repeat_threshold = 0
+
+    def init_app(self, app: Flask, engine: Engine) -> None:
+        """
+        Listen to the statements run against the metadata database, and account for
+        them per request if METADATA_QUERY_ACCOUNTING_ENABLED is set.
+
+        :param app: the Flask app
+        :param engine: the engine of the metadata database
+        """
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+        if app.config["METADATA_QUERY_ACCOUNTING_ENABLED"]:
+            self.init_request_accounting(app)
+
+    def init_request_accounting(self, app: Flask) -> None:
+        """
+        Account for the statements run by each request, and report them.
+
+        :param app: the Flask app
+        """
+        self._repeat_threshold = app.config["METADATA_QUERY_REPEAT_THRESHOLD"]
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    @staticmethod
+    def _before_request() -> None:
+        account = QueryAccount(_current_account.get())
+        g.query_account = account
+        g.query_account_token = _current_account.set(account)
+
+    def _after_request(self, response: Response) -> Response:
+        account = g.get("query_account")
+        if account is None:
+            return response
+
+        stats_logger = current_app.config["STATS_LOGGER"]
+        key = f"metadata_queries.{request.endpoint or 'unknown'}"
+        stats_logger.gauge(f"{key}.count", account.count)
+        stats_logger.timing(f"{key}.duration", account.duration_ms)
+        repeated = account.get_repeated(self._repeat_threshold)
+        for shape, count in repeated.items():
+            stats_logger.incr(f"{key}.repeated")
+            logger.warning(
+                "Statement executed %i times by %s %s: %s",
+                count,
+                request.method,
+                request.path,
+                shape,
+            )
+
+        if current_app.debug:
+            response.headers[QUERIES_HEADER] = str(account.count)
+            response.headers[QUERIES_DURATION_HEADER] = str(
+                round(account.duration_ms, 3)
+            )
+            response.headers[REPEATED_QUERIES_HEADER] = str(len(repeated))
+        return response
+
+    @staticmethod
+    def _teardown_request(exc: Optional[BaseException]) -> None:
+        token = g.pop("query_account_token", None)
+        if token is not None:
+            _current_account.reset(token)
+        g.pop("query_account", None)
@@ -0,0 +1,213 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Tracing of the stages of chart and SQL Lab queries, e.g. SQL generation, the query
+to the database or the serialization of the results, as nested spans:
+
+    with tracer.span("database.get_df", database=database.name) as span:
+        ...
+        span.set_attribute("rows", len(df.index))
+
+Spans are handed to the TRACING_EXPORTERS once the outermost span ends, children
+included. Without exporters, `tracer.span` returns a shared span doing nothing.
+"""
+import functools
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from typing import Any, Callable, cast, Dict, Iterator, List, Optional, TypeVar
+
+from flask import current_app, Flask
+
+from superset.stats_logger import BaseStatsLogger
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_current_span: "ContextVar[Optional[Span]]" = ContextVar("span", default=None)
+
+
+class Span:
+    """A timed stage, with attributes, e.g. the number of rows, and child stages"""
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.children: List["Span"] = []
+        self.parent: Optional["Span"] = None
+        self.start = 0.0
+        self.duration_ms = 0.0
+        self._start_counter = 0.0
+        self._token: Any = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        self.parent = _current_span.get()
+        self._token = _current_span.set(self)
+        self.start = time.time()
+        self._start_counter = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.duration_ms = (time.perf_counter() - self._start_counter) * 1000
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        _current_span.reset(self._token)
+        if self.parent is None:
+            self.tracer.export(self)
+        else:
+            self.parent.children.append(self)
+
+    def walk(self) -> Iterator["Span"]:
+        """The span, then its descendants"""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class _NoopSpan(Span):
+    def __init__(self) -> None:  # pylint: disable=super-init-not-called
+        pass
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class AbstractSpanExporter(ABC):
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        """
+        Export a finished outermost span.
+
+        :param span: the span, its descendants are in `span.children`
+        """
+
+
+class LogSpanExporter(AbstractSpanExporter):
+    """Log spans as JSON, e.g. to be shipped by a log collector"""
+
+    def __init__(self, level: int = logging.INFO, min_duration_ms: float = 0) -> None:
+        self.level = level
+        self.min_duration_ms = min_duration_ms
+
+    def export(self, span: Span) -> None:
+        if span.duration_ms >= self.min_duration_ms:
+            logger.log(self.level, json.dumps(span.to_dict(), default=str))
+
+
+class StatsdSpanExporter(AbstractSpanExporter):
+    """
+    Report the duration of each span, descendants included, as a timing named after
+    the span, through STATS_LOGGER by default.
+    """
+
+    def __init__(
+        self, stats_logger: Optional[BaseStatsLogger] = None, prefix: str = "span"
+    ) -> None:
+        self.stats_logger = stats_logger
+        self.prefix = prefix
+
+    def export(self, span: Span) -> None:
+        stats_logger = self.stats_logger or current_app.config["STATS_LOGGER"]
+        for descendant in span.walk():
+            key = f"{self.prefix}.{descendant.name}"
+            stats_logger.timing(key, descendant.duration_ms)
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.exporters: List[AbstractSpanExporter] = []
+
+    def init_app(self, app: Flask) -> None:
+        self.exporters = list(app.config["TRACING_EXPORTERS"])
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def span(self, name: str, **attributes: Any) -> Span:
+        """
+        A span, to be used as a context manager, nested in the current span if any.
+
+        :param name: the name of the stage, e.g. `database.get_df`
+        :param attributes: the attributes of the span, more can be set later on
+        """
+        if not self.exporters:
+            return NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def traced(self, name: str) -> Callable[[F], F]:
+        """
+        Decorate a function to run it in a span, attributes can be set on
+        `tracer.current_span()` by the function.
+
+        :param name: the name of the stage
+        """
+
+        def decorator(func: F) -> F:
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not self.exporters:
+                    return func(*args, **kwargs)
+                with Span(self, name, {}):
+                    return func(*args, **kwargs)
+
+            return cast(F, wrapper)
+
+        return decorator
+
+    @staticmethod
+    def current_span() -> Span:
+        """The innermost span in progress, a span doing nothing if none"""
+        return _current_span.get() or NOOP_SPAN
+
+    def export(self, span: Span) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception:  # pylint: disable=broad-except
+                logger.warning("Failed to export span %s", span.name, exc_info=True)
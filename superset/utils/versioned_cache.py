@@ -0,0 +1,128 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+from flask import g
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _CachedValue(Generic[V]):  # pylint: disable=too-few-public-methods
+    def __init__(self, version: str, value: V, timeout: int):
+        self.version = version
+        self.value = value
+        self.expires_at = time.monotonic() + timeout
+
+
+class VersionedLRUCache(Generic[K, V]):
+    """
+    Bounded, in-process LRU cache.
+
+    Values are tagged with the version of the data they were built from, and
+    ignored once the version changes or after their timeout. Versions are usually
+    stored in the cache backend shared by all processes, so that a change made by
+    one process invalidates the values cached by all of them.
+    """
+
+    def __init__(self) -> None:
+        self._values: "OrderedDict[K, _CachedValue[V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, key: K, version: str) -> Optional[V]:
+        """
+        :param key: the key of the value
+        :param version: the current version
+        :return: the cached value, unless missing, stale or expired
+        """
+        with self._lock:
+            cached_value = self._values.get(key)
+            if cached_value is None:
+                return None
+            if (
+                cached_value.version != version
+                or cached_value.expires_at <= time.monotonic()
+            ):
+                del self._values[key]
+                return None
+            self._values.move_to_end(key)
+            return cached_value.value
+
+    def set(  # pylint: disable=too-many-arguments
+        self, key: K, version: str, value: V, timeout: int, max_size: int,
+    ) -> None:
+        """
+        Cache a value, evicting the least recently used values beyond `max_size`.
+
+        :param key: the key of the value
+        :param version: the version the value was built from
+        :param value: the value
+        :param timeout: seconds after which the value expires
+        :param max_size: maximum number of cached values
+        """
+        with self._lock:
+            self._values[key] = _CachedValue(version, value, timeout)
+            self._values.move_to_end(key)
+            while len(self._values) > max_size:
+                self._values.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+def get_version(cache_key: str, g_attr: str) -> str:
+    """
+    Return the version stored in the cache backend, read once per request.
+
+    A new version is started if it's missing, e.g. evicted, rather than reusing the
+    values cached before it was first set.
+
+    :param cache_key: the cache key of the version
+    :param g_attr: the `g` attribute holding the version for the current request
+    :return: the current version
+    """
+    from superset.extensions import cache_manager
+
+    if g_attr not in g:
+        version = cache_manager.cache.get(cache_key)
+        if version is None:
+            cache_manager.cache.add(cache_key, uuid.uuid4().hex, timeout=0)
+            version = cache_manager.cache.get(cache_key)
+        setattr(g, g_attr, version or "")
+    return getattr(g, g_attr)
+
+
+def bump_version(cache_key: str, g_attr: str) -> None:
+    """
+    Start a new version, for all the processes sharing the cache backend and for
+    the current request.
+
+    :param cache_key: the cache key of the version
+    :param g_attr: the `g` attribute holding the version for the current request
+    """
+    from superset.extensions import cache_manager
+
+    g.pop(g_attr, None)
+    cache_manager.cache.set(cache_key, uuid.uuid4().hex, timeout=0)
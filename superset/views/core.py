@@ -20,7 +20,7 @@ import re
 from contextlib import closing
 from datetime import datetime, timedelta
 from io import BytesIO, StringIO
-from typing import Any, Callable, cast, Dict, List, Optional, Union
+from typing import Any, Callable, cast, Dict, Iterable, List, Optional, Union
 from urllib import parse
 
 import backoff
@@ -28,7 +28,17 @@ import humanize
 import pandas
 import pandas as pd
 import simplejson as json
-from flask import abort, flash, g, Markup, redirect, render_template, request, Response
+from flask import (
+    abort,
+    flash,
+    g,
+    Markup,
+    redirect,
+    render_template,
+    request,
+    Response,
+    stream_with_context,
+)
 from flask_appbuilder import expose
 from flask_appbuilder.models.sqla.interface import SQLAInterface
 from flask_appbuilder.security.decorators import (
@@ -44,7 +54,6 @@ from sqlalchemy import and_, or_
 from sqlalchemy.engine.url import make_url
 from sqlalchemy.exc import ArgumentError, DBAPIError, NoSuchModuleError, SQLAlchemyError
 from sqlalchemy.orm.session import Session
-from sqlalchemy.sql import functions as func
 from werkzeug.urls import Href
 
 from superset import (
@@ -86,7 +95,7 @@ from superset.exceptions import (
     SupersetTemplateParamsErrorException,
     SupersetTimeoutException,
 )
-from superset.extensions import async_query_manager, cache_manager
+from superset.extensions import async_query_manager, cache_manager, tracer
 from superset.jinja_context import get_template_processor
 from superset.models.core import Database, FavStar, Log
 from superset.models.dashboard import Dashboard
@@ -95,14 +104,20 @@ from superset.models.slice import Slice
 from superset.models.sql_lab import Query, TabState
 from superset.models.user_attributes import UserAttribute
 from superset.queries.dao import QueryDAO
+from superset.result_set import SupersetResultSet
 from superset.security.analytics_db_safety import check_sqlalchemy_uri
 from superset.sql_parse import CtasMethod, ParsedQuery, Table
 from superset.sql_validators import get_validator_by_name
-from superset.tasks.async_queries import load_explore_json_into_cache
+from superset.tasks.async_queries import (
+    get_explore_json_dedup_key,
+    load_explore_json_into_cache,
+)
 from superset.typing import FlaskResponse
 from superset.utils import core as utils, csv
+from superset.utils.activity import get_recent_activity_subquery
 from superset.utils.async_query_manager import AsyncQueryTokenException
 from superset.utils.cache import etag_cache
+from superset.utils.chunked_results import read_chunks
 from superset.utils.core import ReservedUrlParameters
 from superset.utils.dates import now_as_float
 from superset.utils.decorators import check_dashboard_access
@@ -137,6 +152,7 @@ from superset.views.utils import (
     get_form_data,
     get_viz,
     is_owner,
+    load_results_chunks,
 )
 from superset.viz import BaseViz
 
@@ -464,7 +480,9 @@ class Superset(BaseSupersetView):  # pylint: disable=too-many-public-methods
             return self.get_samples(viz_obj)
 
         payload = viz_obj.get_payload()
-        return data_payload_response(*viz_obj.payload_json_and_has_error(payload))
+        with tracer.span("viz.serialize"):
+            payload_json, has_error = viz_obj.payload_json_and_has_error(payload)
+        return data_payload_response(payload_json, has_error)
 
     @event_logger.log_this
     @api
@@ -567,6 +585,7 @@ class Superset(BaseSupersetView):  # pylint: disable=too-many-public-methods
         methods=EXPLORE_JSON_METHODS,
     )
     @expose("/explore_json/", methods=EXPLORE_JSON_METHODS)
+    @tracer.traced("explore_json.request")
     @etag_cache()
     @check_resource_permissions(check_datasource_perms)
     def explore_json(
@@ -612,9 +631,24 @@ class Superset(BaseSupersetView):  # pylint: disable=too-many-public-methods
                         request
                     )["channel"]
                     job_metadata = async_query_manager.init_job(async_channel_id)
-                    load_explore_json_into_cache.delay(
-                        job_metadata, form_data, response_type, force
-                    )
+                    dedup_key = None
+                    should_enqueue = True
+                    if config["QUERY_SINGLE_FLIGHT_ENABLED"]:
+                        datasource = ConnectorRegistry.get_datasource(
+                            cast(str, datasource_type), datasource_id, db.session
+                        )
+                        dedup_key = get_explore_json_dedup_key(
+                            form_data, response_type, datasource, force
+                        )
+                        should_enqueue = async_query_manager.attach_job(
+                            dedup_key,
+                            job_metadata,
+                            config["QUERY_SINGLE_FLIGHT_LEASE_TIMEOUT"],
+                        )
+                    if should_enqueue:
+                        load_explore_json_into_cache.delay(
+                            job_metadata, form_data, response_type, force, dedup_key
+                        )
                 except AsyncQueryTokenException:
                     return json_error_response("Not authorized", 401)
 
@@ -1341,24 +1375,9 @@ class Superset(BaseSupersetView):  # pylint: disable=too-many-public-methods
 
         if distinct:
             one_year_ago = datetime.today() - timedelta(days=365)
-            subqry = (
-                db.session.query(
-                    Log.dashboard_id,
-                    Log.slice_id,
-                    Log.action,
-                    func.max(Log.dttm).label("dttm"),
-                )
-                .group_by(Log.dashboard_id, Log.slice_id, Log.action)
-                .filter(
-                    and_(
-                        Log.action.in_(actions),
-                        Log.user_id == user_id,
-                        # limit to one year of data to improve performance
-                        Log.dttm > one_year_ago,
-                        or_(Log.dashboard_id.isnot(None), Log.slice_id.isnot(None)),
-                    )
-                )
-                .subquery()
+            # limit to one year of data to improve performance
+            subqry = get_recent_activity_subquery(
+                db.session, user_id, actions, one_year_ago
             )
             qry = (
                 db.session.query(
@@ -2179,11 +2198,32 @@ class Superset(BaseSupersetView):  # pylint: disable=too-many-public-methods
                 status=404,
             )
 
+        rows: Optional[int] = None
         if "rows" in request.args:
             try:
                 rows = int(request.args["rows"])
             except ValueError:
                 return json_error_response("Invalid `rows` argument", status=400)
+
+        if obj.get("chunks") is not None:
+            try:
+                offset = int(request.args.get("offset", 0))
+            except ValueError:
+                return json_error_response("Invalid `offset` argument", status=400)
+            try:
+                obj = load_results_chunks(
+                    obj, query, results_backend, offset=offset, rows=rows
+                )
+            except SerializationError:
+                return json_error_response(
+                    __(
+                        "Data could not be deserialized. "
+                        "You may want to re-run the query."
+                    ),
+                    status=404,
+                )
+
+        if rows is not None:
             obj = apply_display_max_row_limit(obj, rows)
 
         return json_success(
@@ -2592,6 +2632,8 @@ class Superset(BaseSupersetView):  # pylint: disable=too-many-public-methods
         if results_backend and query.results_key:
             logger.info("Fetching CSV from results backend [%s]", query.results_key)
             blob = results_backend.get(query.results_key)
+        batch_size = config["CSV_EXPORT_BATCH_SIZE"]
+        frames: Iterable[pd.DataFrame]
         if blob:
             logger.info("Decompressing")
             payload = utils.zlib_decompress(
@@ -2600,30 +2642,51 @@ class Superset(BaseSupersetView):  # pylint: disable=too-many-public-methods
             obj = _deserialize_results_payload(
                 payload, query, cast(bool, results_backend_use_msgpack)
             )
-            columns = [c["name"] for c in obj["columns"]]
-            df = pd.DataFrame.from_records(obj["data"], columns=columns)
+            if obj.get("chunks"):
+                frames = (
+                    SupersetResultSet.convert_table_to_df(table)
+                    for table in read_chunks(results_backend, obj["chunks"])
+                )
+            else:
+                columns = [c["name"] for c in obj["columns"]]
+                df = pd.DataFrame.from_records(obj.get("data") or [], columns=columns)
+                frames = csv.split_dataframe(df, batch_size)
             logger.info("Using pandas to convert to CSV")
         else:
             logger.info("Running a query to turn into CSV")
             sql = query.select_sql or query.executed_sql
-            df = query.database.get_df(sql, query.schema)
-        csv_data = csv.df_to_escaped_csv(df, index=False, **config["CSV_EXPORT"])
-        quoted_csv_name = parse.quote(query.name)
-        response = CsvResponse(
-            csv_data, headers=generate_download_headers("csv", quoted_csv_name)
-        )
+            frames = query.database.iter_df(sql, batch_size, query.schema)
+
         event_info = {
             "event_type": "data_export",
             "client_id": client_id,
-            "row_count": len(df.index),
             "database": query.database.name,
             "schema": query.schema,
             "sql": query.sql,
             "exported_format": "csv",
         }
-        event_rep = repr(event_info)
-        logger.info("CSV exported: %s", event_rep, extra={"superset_event": event_info})
-        return response
+
+        def on_complete(row_count: int) -> None:
+            event_info["row_count"] = row_count
+            event_rep = repr(event_info)
+            logger.info(
+                "CSV exported: %s", event_rep, extra={"superset_event": event_info}
+            )
+
+        csv_chunks = csv.stream_escaped_csv(
+            frames,
+            stats_logger=stats_logger,
+            metric_prefix="sqllab.csv_export",
+            on_complete=on_complete,
+            index=False,
+            **config["CSV_EXPORT"],
+        )
+        quoted_csv_name = parse.quote(query.name)
+        # the rows are fetched and rendered while the response is sent
+        return CsvResponse(
+            stream_with_context(csv_chunks),
+            headers=generate_download_headers("csv", quoted_csv_name),
+        )
 
     @api
     @handle_api_exception
@@ -24,6 +24,7 @@ from urllib import parse
 import msgpack
 import pyarrow as pa
 import simplejson as json
+from cachelib.base import BaseCache
 from flask import g, request
 from flask_appbuilder.security.sqla import models as ab_models
 from flask_appbuilder.security.sqla.models import User
@@ -40,13 +41,14 @@ from superset.exceptions import (
     SupersetException,
     SupersetSecurityException,
 )
-from superset.extensions import cache_manager
+from superset.extensions import cache_manager, tracer
 from superset.legacy import update_time_range
 from superset.models.core import Database
 from superset.models.dashboard import Dashboard
 from superset.models.slice import Slice
 from superset.models.sql_lab import Query
 from superset.typing import FormData
+from superset.utils.chunked_results import read_chunks
 from superset.utils.core import QueryStatus, TimeRangeEndpoint
 from superset.utils.decorators import stats_timing
 from superset.viz import BaseViz
@@ -442,7 +444,8 @@ def check_resource_permissions(check_perms: Callable[..., Any],) -> Callable[...
         @wraps(f)
         def wrapper(*args: Any, **kwargs: Any) -> None:
             # check if the user can access the resource
-            check_perms(*args, **kwargs)
+            with tracer.span("check_resource_permissions"):
+                check_perms(*args, **kwargs)
             return f(*args, **kwargs)
 
         return wrapper
@@ -568,6 +571,10 @@ def _deserialize_results_payload(
         ):
             ds_payload = msgpack.loads(payload, raw=False)
 
+        if "chunks" in ds_payload:
+            # rows are stored separately, see `load_results_chunks`
+            return ds_payload
+
         with stats_timing("sqllab.query.results_backend_pa_deserialize", stats_logger):
             try:
                 pa_table = pa.deserialize(ds_payload["data"])
@@ -591,6 +598,42 @@ def _deserialize_results_payload(
         return json.loads(payload)
 
 
+def load_results_chunks(
+    payload: Dict[str, Any],
+    query: Query,
+    cache: BaseCache,
+    offset: int = 0,
+    rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Load a range of rows of a chunked results payload, see
+    `superset.utils.chunked_results`, only reading the chunks holding them.
+
+    :param payload: the deserialized results payload
+    :param query: the query the results belong to
+    :param cache: the results backend
+    :param offset: index of the first row to load
+    :param rows: maximum number of rows to load
+    :return: the payload, with its `data`, expanded if the query was run with
+             `expand_data`
+    :raises SerializationError: If a chunk is missing
+    """
+    data: List[Dict[str, Any]] = []
+    with stats_timing("sqllab.query.results_backend_chunks_read", stats_logger):
+        for table in read_chunks(cache, payload["chunks"], offset, rows):
+            df = result_set.SupersetResultSet.convert_table_to_df(table)
+            data.extend(dataframe.df_to_records(df) or [])
+
+    if payload.pop("expand_data", False):
+        db_engine_spec = query.database.db_engine_spec
+        all_columns, data, expanded_columns = db_engine_spec.expand_data(
+            payload["selected_columns"], data
+        )
+        payload.update({"columns": all_columns, "expanded_columns": expanded_columns})
+    payload["data"] = data
+    return payload
+
+
 def get_cta_schema_name(
     database: Database, user: ab_models.User, schema: str, sql: str
 ) -> Optional[str]:
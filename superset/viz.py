@@ -27,6 +27,7 @@ import math
 import re
 from collections import defaultdict, OrderedDict
 from datetime import date, datetime, timedelta
+from functools import partial
 from itertools import product
 from typing import (
     Any,
@@ -48,7 +49,7 @@ import pandas as pd
 import polyline
 import simplejson as json
 from dateutil import relativedelta as rdelta
-from flask import request
+from flask import g, request
 from flask_babel import lazy_gettext as _
 from geopy.point import Point
 from pandas.tseries.frequencies import to_offset
@@ -63,12 +64,21 @@ from superset.exceptions import (
     SpatialException,
     SupersetSecurityException,
 )
-from superset.extensions import cache_manager, security_manager
+from superset.extensions import cache_manager, security_manager, tracer
 from superset.models.cache import CacheKey
 from superset.models.helpers import QueryResult
 from superset.typing import QueryObjectDict, VizData, VizPayload
 from superset.utils import core as utils, csv
-from superset.utils.cache import set_and_log_cache
+from superset.utils.cache import (
+    get_cached_value_or_lease,
+    set_and_log_cache,
+    should_refresh,
+)
+from superset.utils.concurrency import (
+    get_database_key,
+    load_datasource_relationships,
+    run_concurrently,
+)
 from superset.utils.core import (
     DTTM_ALIAS,
     JS_MAX_INTEGER,
@@ -273,7 +283,7 @@ class BaseViz:
                 timestamp_format = granularity_col.python_date_format
 
         # The datasource here can be different backend but the interface is common
-        self.results = self.datasource.query(query_obj)
+        self.results = self.datasource.query(query_obj, force=self.force)
         self.query = self.results.query
         self.status = self.results.status
         self.errors = self.results.errors
@@ -437,8 +447,12 @@ class BaseViz:
         json_data = self.json_dumps(cache_dict, sort_keys=True)
         return md5_sha_from_str(json_data)
 
+    @tracer.traced("viz.get_payload")
     def get_payload(self, query_obj: Optional[QueryObjectDict] = None) -> VizPayload:
         """Returns a payload of metadata and data"""
+        tracer.current_span().set_attributes(
+            datasource=self.datasource.uid, viz_type=self.viz_type
+        )
 
         try:
             self.run_extra_queries()
@@ -452,7 +466,8 @@ class BaseViz:
         df = payload.get("df")
 
         if self.status != utils.QueryStatus.FAILED:
-            payload["data"] = self.get_data(df)
+            with tracer.span("viz.get_data"):
+                payload["data"] = self.get_data(df)
         if "df" in payload:
             del payload["df"]
 
@@ -484,99 +499,121 @@ class BaseViz:
 
         return payload
 
+    @tracer.traced("viz.get_df_payload")
     def get_df_payload(
         self, query_obj: Optional[QueryObjectDict] = None, **kwargs: Any
     ) -> Dict[str, Any]:
         """Handles caching around the df payload retrieval"""
         if not query_obj:
             query_obj = self.query_obj()
-        cache_key = self.cache_key(query_obj, **kwargs) if query_obj else None
+        with tracer.span("viz.cache_key"):
+            cache_key = self.cache_key(query_obj, **kwargs) if query_obj else None
         cache_value = None
         logger.info("Cache key: {}".format(cache_key))
         is_loaded = False
         stacktrace = None
         df = None
-        if cache_key and cache_manager.data_cache and not self.force:
-            cache_value = cache_manager.data_cache.get(cache_key)
-            if cache_value:
-                stats_logger.incr("loading_from_cache")
-                try:
-                    df = cache_value["df"]
-                    self.query = cache_value["query"]
-                    self.status = utils.QueryStatus.SUCCESS
-                    is_loaded = True
-                    stats_logger.incr("loaded_from_cache")
-                except Exception as ex:
-                    logger.exception(ex)
-                    logger.error(
-                        "Error reading cache: " + utils.error_msg_from_exception(ex)
+        lease = None
+        try:
+            if cache_key and cache_manager.data_cache and not self.force:
+                if self.force_cached:
+                    cache_value = cache_manager.data_cache.get(cache_key)
+                else:
+                    cache_value, lease = get_cached_value_or_lease(
+                        cache_manager.data_cache, cache_key
                     )
-                logger.info("Serving from cache")
-
-        if query_obj and not is_loaded:
-            if self.force_cached:
-                logger.warning(
-                    f"force_cached (viz.py): value not found for cache key {cache_key}"
-                )
-                raise CacheLoadError(_("Cached value not found"))
-            try:
-                invalid_columns = [
-                    col
-                    for col in (query_obj.get("columns") or [])
-                    + (query_obj.get("groupby") or [])
-                    + utils.get_column_names_from_metrics(
-                        cast(
-                            List[Union[str, Dict[str, Any]]],
-                            query_obj.get("metrics") or [],
+                if cache_value:
+                    if should_refresh(cache_manager.data_cache, cache_key, cache_value):
+                        self.enqueue_cache_refresh()
+                    stats_logger.incr("loading_from_cache")
+                    try:
+                        df = cache_value["df"]
+                        self.query = cache_value["query"]
+                        self.status = utils.QueryStatus.SUCCESS
+                        is_loaded = True
+                        stats_logger.incr("loaded_from_cache")
+                    except Exception as ex:
+                        logger.exception(ex)
+                        logger.error(
+                            "Error reading cache: " + utils.error_msg_from_exception(ex)
                         )
+                    logger.info("Serving from cache")
+
+            if query_obj and not is_loaded:
+                if self.force_cached:
+                    logger.warning(
+                        "force_cached (viz.py): value not found for cache key %s",
+                        cache_key,
                     )
-                    if col not in self.datasource.column_names
-                ]
-                if invalid_columns:
-                    raise QueryObjectValidationError(
-                        _(
-                            "Columns missing in datasource: %(invalid_columns)s",
-                            invalid_columns=invalid_columns,
+                    raise CacheLoadError(_("Cached value not found"))
+                try:
+                    invalid_columns = [
+                        col
+                        for col in (query_obj.get("columns") or [])
+                        + (query_obj.get("groupby") or [])
+                        + utils.get_column_names_from_metrics(
+                            cast(
+                                List[Union[str, Dict[str, Any]]],
+                                query_obj.get("metrics") or [],
+                            )
+                        )
+                        if col not in self.datasource.column_names
+                    ]
+                    if invalid_columns:
+                        raise QueryObjectValidationError(
+                            _(
+                                "Columns missing in datasource: %(invalid_columns)s",
+                                invalid_columns=invalid_columns,
+                            )
+                        )
+                    df = self.get_df(query_obj)
+                    if self.status != utils.QueryStatus.FAILED:
+                        stats_logger.incr("loaded_from_source")
+                        if not self.force:
+                            stats_logger.incr("loaded_from_source_without_force")
+                        is_loaded = True
+                except QueryObjectValidationError as ex:
+                    error = dataclasses.asdict(
+                        SupersetError(
+                            message=str(ex),
+                            level=ErrorLevel.ERROR,
+                            error_type=SupersetErrorType.VIZ_GET_DF_ERROR,
                         )
                     )
-                df = self.get_df(query_obj)
-                if self.status != utils.QueryStatus.FAILED:
-                    stats_logger.incr("loaded_from_source")
-                    if not self.force:
-                        stats_logger.incr("loaded_from_source_without_force")
-                    is_loaded = True
-            except QueryObjectValidationError as ex:
-                error = dataclasses.asdict(
-                    SupersetError(
-                        message=str(ex),
-                        level=ErrorLevel.ERROR,
-                        error_type=SupersetErrorType.VIZ_GET_DF_ERROR,
+                    self.errors.append(error)
+                    self.status = utils.QueryStatus.FAILED
+                except Exception as ex:
+                    logger.exception(ex)
+
+                    error = dataclasses.asdict(
+                        SupersetError(
+                            message=str(ex),
+                            level=ErrorLevel.ERROR,
+                            error_type=SupersetErrorType.VIZ_GET_DF_ERROR,
+                        )
                     )
-                )
-                self.errors.append(error)
-                self.status = utils.QueryStatus.FAILED
-            except Exception as ex:
-                logger.exception(ex)
-
-                error = dataclasses.asdict(
-                    SupersetError(
-                        message=str(ex),
-                        level=ErrorLevel.ERROR,
-                        error_type=SupersetErrorType.VIZ_GET_DF_ERROR,
+                    self.errors.append(error)
+                    self.status = utils.QueryStatus.FAILED
+                    stacktrace = utils.get_stacktrace()
+
+                if is_loaded and cache_key and self.status != utils.QueryStatus.FAILED:
+                    set_and_log_cache(
+                        cache_manager.data_cache,
+                        cache_key,
+                        {"df": df, "query": self.query},
+                        self.cache_timeout,
+                        self.datasource.uid,
+                        stale_timeout=config["DATA_CACHE_STALE_TIMEOUT"],
                     )
-                )
-                self.errors.append(error)
-                self.status = utils.QueryStatus.FAILED
-                stacktrace = utils.get_stacktrace()
-
-            if is_loaded and cache_key and self.status != utils.QueryStatus.FAILED:
-                set_and_log_cache(
-                    cache_manager.data_cache,
-                    cache_key,
-                    {"df": df, "query": self.query},
-                    self.cache_timeout,
-                    self.datasource.uid,
-                )
+        finally:
+            if lease:
+                lease.release()
+        tracer.current_span().set_attributes(
+            datasource=self.datasource.uid,
+            is_cached=cache_value is not None,
+            rows=len(df.index) if df is not None else 0,
+            status=self.status,
+        )
         return {
             "cache_key": cache_key,
             "cached_dttm": cache_value["dttm"] if cache_value is not None else None,
@@ -593,6 +630,62 @@ class BaseViz:
             "rowcount": len(df.index) if df is not None else 0,
         }
 
+    def enqueue_cache_refresh(self) -> None:
+        """Refresh the cached data of the chart in a Celery worker"""
+        # pylint: disable=import-outside-toplevel
+        from superset.tasks.async_queries import refresh_explore_json_cache
+
+        try:
+            refresh_explore_json_cache.delay(
+                self.datasource.type,
+                self.datasource.id,
+                self.form_data,
+                g.user.get_id() if getattr(g, "user", None) else None,
+            )
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.warning("Could not enqueue the refresh of the data cache")
+            logger.exception(ex)
+
+    def get_df_payloads(
+        self, query_objs: List[Tuple[QueryObjectDict, Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Run `get_df_payload` for independent query objects concurrently, e.g. the
+        extra queries of `run_extra_queries`.
+
+        Each query runs on its own copy of the viz, as `get_df_payload` sets the
+        query, status and errors of the viz. The state of the copies is applied to
+        the viz in the order of the query objects, as if they had run one after the
+        other, and the errors of all the copies are kept.
+
+        :param query_objs: the query objects with the extra `get_df_payload`
+               arguments of each
+        :return: the payloads, in the order of the query objects
+        """
+        load_datasource_relationships(self.datasource)
+        viz_objs = []
+        for _ in query_objs:
+            viz_obj = copy.copy(self)
+            viz_obj.errors = list(self.errors)
+            viz_objs.append(viz_obj)
+
+        payloads = run_concurrently(
+            [
+                partial(viz_obj.get_df_payload, query_obj, **kwargs)
+                for viz_obj, (query_obj, kwargs) in zip(viz_objs, query_objs)
+            ],
+            [get_database_key(self.datasource)] * len(query_objs),
+        )
+        errors = list(self.errors)
+        for viz_obj in viz_objs:
+            self.query = viz_obj.query
+            self.status = viz_obj.status
+            self.error_msg = viz_obj.error_msg
+            self.results = viz_obj.results
+            errors.extend(error for error in viz_obj.errors if error not in errors)
+        self.errors = errors
+        return payloads
+
     def json_dumps(self, obj: Any, sort_keys: bool = False) -> str:
         return json.dumps(
             obj, default=utils.json_int_dttm_ser, ignore_nan=True, sort_keys=sort_keys
@@ -1341,6 +1434,8 @@ class NVD3TimeSeriesViz(NVD3Viz):
         if not isinstance(time_compare, list):
             time_compare = [time_compare]
 
+        query_objs = []
+        deltas = []
         for option in time_compare:
             query_object = self.query_obj()
             try:
@@ -1359,8 +1454,12 @@ class NVD3TimeSeriesViz(NVD3Viz):
                 )
             query_object["from_dttm"] -= delta
             query_object["to_dttm"] -= delta
+            query_objs.append((query_object, {"time_compare": option}))
+            deltas.append(delta)
 
-            df2 = self.get_df_payload(query_object, time_compare=option).get("df")
+        payloads = self.get_df_payloads(query_objs)
+        for option, delta, payload in zip(time_compare, deltas, payloads):
+            df2 = payload.get("df")
             if df2 is not None and DTTM_ALIAS in df2:
                 dttm_series = df2[DTTM_ALIAS] + delta
                 df2 = df2.drop(DTTM_ALIAS, axis=1)
@@ -2060,21 +2159,30 @@ class FilterBoxViz(BaseViz):
         filters = self.form_data.get("filter_configs") or []
         qry["row_limit"] = self.filter_row_limit
         self.dataframes = {}
+        columns = []
+        query_objs = []
         for flt in filters:
             col = flt.get("column")
             if not col:
                 raise QueryObjectValidationError(
                     _("Invalid filter configuration, please select a column")
                 )
-            qry["groupby"] = [col]
             metric = flt.get("metric")
-            qry["metrics"] = [metric] if metric else []
+            filter_qry = {
+                **qry,
+                "groupby": [col],
+                "metrics": [metric] if metric else [],
+            }
             QueryContext(
                 datasource={"id": self.datasource.id, "type": self.datasource.type},
-                queries=[qry],
+                queries=[filter_qry],
             ).raise_for_access()
-            df = self.get_df_payload(query_obj=qry).get("df")
-            self.dataframes[col] = df
+            columns.append(col)
+            query_objs.append((filter_qry, {}))
+
+        payloads = self.get_df_payloads(query_objs)
+        for col, payload in zip(columns, payloads):
+            self.dataframes[col] = payload.get("df")
 
     def get_data(self, df: pd.DataFrame) -> VizData:
         filters = self.form_data.get("filter_configs") or []
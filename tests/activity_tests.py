@@ -0,0 +1,145 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+from superset import db
+from superset.models.activity import (
+    ActivityRollupState,
+    HourlyActivity,
+    UserRecentActivity,
+)
+from superset.models.core import Log
+from superset.utils.activity import (
+    get_last_rolled_up_log_id,
+    get_recent_activity_subquery,
+    get_top_dashboard_ids,
+    prune_logs,
+    ROLLUP_STATE_ID,
+    rollup_logs,
+)
+
+from .base_tests import SupersetTestCase
+
+
+class TestActivity(SupersetTestCase):
+    def setUp(self):
+        for model in (Log, ActivityRollupState, HourlyActivity, UserRecentActivity):
+            db.session.query(model).delete()
+        db.session.commit()
+
+    def tearDown(self):
+        self.setUp()
+
+    def log(self, dttm, dashboard_id=None, slice_id=None, action="dashboard"):
+        log = Log(
+            action=action,
+            user_id=1,
+            dashboard_id=dashboard_id,
+            slice_id=slice_id,
+            dttm=dttm,
+        )
+        db.session.add(log)
+        db.session.commit()
+        return log
+
+    def test_rollup_logs(self):
+        now = datetime.utcnow().replace(microsecond=0)
+        two_hours_ago = (now - timedelta(hours=2)).replace(minute=10, second=0)
+        self.log(two_hours_ago, dashboard_id=1)
+        self.log(two_hours_ago + timedelta(minutes=1), dashboard_id=1)
+        self.log(two_hours_ago, dashboard_id=2)
+        self.log(two_hours_ago, slice_id=3, action="explore")
+        self.log(two_hours_ago, action="welcome")
+        # too recent to be rolled up
+        recent_log = self.log(now, dashboard_id=2)
+        self.log(now, dashboard_id=2)
+
+        self.assertIsNone(get_last_rolled_up_log_id(db.session))
+        self.assertEqual(get_top_dashboard_ids(db.session, 2), [2, 1])
+
+        self.assertEqual(rollup_logs(db.session, batch_size=2), 5)
+        self.assertEqual(get_last_rolled_up_log_id(db.session), recent_log.id - 1)
+        hourly_counts = {
+            (row.action, row.dashboard_id, row.slice_id): row.count
+            for row in db.session.query(HourlyActivity)
+        }
+        self.assertEqual(
+            hourly_counts,
+            {("dashboard", 1, 0): 2, ("dashboard", 2, 0): 1, ("explore", 0, 3): 1},
+        )
+        recent_activity = {
+            (row.action, row.dashboard_id, row.slice_id): (row.dttm, row.count)
+            for row in db.session.query(UserRecentActivity)
+        }
+        self.assertEqual(
+            recent_activity[("dashboard", 1, 0)],
+            (two_hours_ago + timedelta(minutes=1), 2),
+        )
+        self.assertEqual(len(recent_activity), 3)
+
+        # the logs that weren't rolled up yet are still counted
+        self.assertEqual(get_top_dashboard_ids(db.session, 2), [2, 1])
+        self.assertEqual(
+            get_top_dashboard_ids(db.session, 2, now - timedelta(minutes=1)), [2]
+        )
+        subqry = get_recent_activity_subquery(
+            db.session, 1, ["dashboard", "explore"], now - timedelta(days=1)
+        )
+        activity = {
+            (row.action, row.dashboard_id, row.slice_id): row.dttm
+            for row in db.session.query(subqry)
+        }
+        self.assertEqual(
+            activity,
+            {
+                ("dashboard", 1, 0): two_hours_ago + timedelta(minutes=1),
+                ("dashboard", 2, 0): now,
+                ("explore", 0, 3): two_hours_ago,
+            },
+        )
+
+        # nothing new to roll up
+        self.assertEqual(rollup_logs(db.session), 0)
+
+    def test_rollup_state_is_a_single_row(self):
+        self.log(datetime.utcnow() - timedelta(hours=2), dashboard_id=1)
+        self.assertEqual(rollup_logs(db.session), 1)
+        self.assertEqual(rollup_logs(db.session), 0)
+        self.assertEqual(db.session.query(ActivityRollupState).count(), 1)
+
+        # a concurrent first run can't insert a second row
+        db.session.add(ActivityRollupState(id=ROLLUP_STATE_ID, last_log_id=0))
+        with self.assertRaises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
+
+    def test_prune_logs(self):
+        old = datetime.utcnow() - timedelta(days=10)
+        self.log(old, dashboard_id=1)
+        self.log(datetime.utcnow() - timedelta(days=1), dashboard_id=1)
+        rollup_logs(db.session)
+        # not rolled up yet, kept regardless
+        self.log(old, dashboard_id=1)
+
+        self.assertEqual(prune_logs(db.session, 5, 5), 1)
+        self.assertEqual(db.session.query(Log).count(), 2)
+        self.assertEqual(db.session.query(HourlyActivity).count(), 1)
+        self.assertEqual(db.session.query(UserRecentActivity).count(), 1)
+        # the pruned logs are still counted from the rollups
+        self.assertEqual(get_top_dashboard_ids(db.session, 1), [1])
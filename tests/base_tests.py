@@ -20,7 +20,7 @@ from datetime import datetime
 import imp
 import json
 from contextlib import contextmanager
-from typing import Any, Dict, Union, List, Optional
+from typing import Any, Dict, Iterator, Union, List, Optional
 from unittest.mock import Mock, patch
 
 import pandas as pd
@@ -44,6 +44,7 @@ from superset.models.core import Database
 from superset.models.dashboard import Dashboard
 from superset.models.datasource_access_request import DatasourceAccessRequest
 from superset.utils.core import get_example_database
+from superset.utils.query_accounting import account_queries, QueryAccount
 from superset.views.base_api import BaseSupersetModelRestApi
 
 FAKE_DB_NAME = "fake_db_100"
@@ -527,6 +528,36 @@ class SupersetTestCase(TestCase):
             mock_method.assert_called_once_with("error", func_name)
         return rv
 
+    @contextmanager
+    def assert_max_metadata_queries(
+        self, max_queries: int, max_repeated: Optional[int] = None
+    ) -> Iterator[QueryAccount]:
+        """
+        Fail if the block runs more than a budget of metadata database statements
+
+        :param max_queries: The maximum number of statements
+        :param max_repeated: The maximum number of executions of a statement with
+        only different parameters, to keep N+1 queries out
+        :return: The account of the statements run by the block
+        """
+        with account_queries() as account:
+            yield account
+        shapes = "\n".join(
+            f"{count}: {shape}" for shape, count in account.get_repeated(1).items()
+        )
+        self.assertLessEqual(
+            account.count,
+            max_queries,
+            f"{account.count} statements run, over {max_queries}:\n{shapes}",
+        )
+        if max_repeated is not None:
+            repeated = account.get_repeated(max_repeated + 1)
+            self.assertEqual(
+                repeated,
+                {},
+                f"statements executed over {max_repeated} times:\n{shapes}",
+            )
+
     @classmethod
     def get_dttm(cls):
         return datetime.strptime("2019-01-02 03:04:05.678900", "%Y-%m-%d %H:%M:%S.%f")
@@ -16,11 +16,19 @@
 # under the License.
 """Unit tests for Superset with caching"""
 import json
+import time
+from unittest import mock
 
 import pytest
+from flask_caching import Cache
 
 from superset import app, db
 from superset.extensions import cache_manager
+from superset.utils.cache import (
+    get_cached_value_or_lease,
+    set_and_log_cache,
+    should_refresh,
+)
 from superset.utils.core import QueryStatus
 from tests.fixtures.birth_names_dashboard import load_birth_names_dashboard_with_slices
 
@@ -100,3 +108,68 @@ class TestCache(SupersetTestCase):
         app.config["DATA_CACHE_CONFIG"] = data_cache_config
         app.config["CACHE_DEFAULT_TIMEOUT"] = cache_default_timeout
         cache_manager.init_app(app)
+
+
+@mock.patch.dict(
+    "superset.utils.cache.config",
+    {
+        "QUERY_SINGLE_FLIGHT_ENABLED": True,
+        "QUERY_SINGLE_FLIGHT_WAIT_TIMEOUT": 0,
+        "QUERY_SINGLE_FLIGHT_POLL_INTERVAL": 0,
+    },
+)
+def test_get_cached_value_or_lease():
+    cache = Cache(config={"CACHE_TYPE": "simple"})
+    cache.init_app(app)
+
+    # the first caller gets the lease, identical callers don't
+    cache_value, lease = get_cached_value_or_lease(cache, "key")
+    assert cache_value is None
+    assert lease is not None
+    assert get_cached_value_or_lease(cache, "key") == (None, None)
+
+    # once the leader cached the value, it's served to everyone
+    cache.set("key", {"df": None})
+    lease.release()
+    assert get_cached_value_or_lease(cache, "key") == ({"df": None}, None)
+
+    # a leader giving up without caching a value hands over the lease
+    cache_value, lease = get_cached_value_or_lease(cache, "other_key")
+    lease.release()
+    cache_value, lease = get_cached_value_or_lease(cache, "other_key")
+    assert cache_value is None
+    assert lease is not None
+
+
+@mock.patch.dict(
+    "superset.utils.cache.config",
+    {
+        "DATA_CACHE_REFRESH_AHEAD_WINDOW": 60,
+        "DATA_CACHE_REFRESH_AHEAD_MIN_HITS": 2,
+        "DATA_CACHE_REFRESH_LEASE_TIMEOUT": 60,
+    },
+)
+def test_should_refresh():
+    cache = Cache(config={"CACHE_TYPE": "simple"})
+    cache.init_app(app)
+
+    # values cached without a stale timeout are never refreshed
+    set_and_log_cache(cache, "key", {"df": None}, 600)
+    assert not should_refresh(cache, "key", cache.get("key"))
+
+    # fresh values are only refreshed ahead of their expiry once frequently read
+    set_and_log_cache(cache, "key", {"df": None}, 600, stale_timeout=600)
+    cache_value = cache.get("key")
+    assert not should_refresh(cache, "key", cache_value)
+    cache_value["expires_at"] = time.time() + 30
+    assert not should_refresh(cache, "key", cache_value)
+    assert should_refresh(cache, "key", cache_value)
+    # only one caller refreshes the value
+    assert not should_refresh(cache, "key", cache_value)
+
+    # stale values are refreshed, once, regardless of how often they're read
+    set_and_log_cache(cache, "key", {"df": None}, 600, stale_timeout=600)
+    cache_value = cache.get("key")
+    cache_value["expires_at"] = time.time() - 30
+    assert should_refresh(cache, "key", cache_value)
+    assert not should_refresh(cache, "key", cache_value)
@@ -29,6 +29,7 @@ from tests.fixtures.birth_names_dashboard import load_birth_names_dashboard_with
 
 import humanize
 import prison
+import pyarrow as pa
 import pytest
 import yaml
 from sqlalchemy import and_, or_
@@ -46,6 +47,7 @@ from superset.models.dashboard import Dashboard
 from superset.models.reports import ReportSchedule, ReportScheduleType
 from superset.models.slice import Slice
 from superset.utils import core as utils
+from superset.utils.arrow import ARROW_STREAM_MIMETYPE, get_result_metadata
 from superset.utils.core import AnnotationType, get_example_database, get_main_database
 
 
@@ -1183,6 +1185,46 @@ class TestChartApi(SupersetTestCase, ApiOwnersTestCaseMixin, InsertChartMixin):
         rv = self.post_assert_metric(CHART_DATA_URI, request_payload, "data")
         self.assertEqual(rv.status_code, 200)
 
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_chart_data_arrow_result_format(self):
+        """
+        Chart data API: Test chart data with Arrow result format
+        """
+        self.login(username="admin")
+        request_payload = get_query_context("birth_names")
+        request_payload["result_format"] = "arrow"
+        rv = self.post_assert_metric(CHART_DATA_URI, request_payload, "data")
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.headers["Content-Type"], ARROW_STREAM_MIMETYPE)
+        table = pa.ipc.open_stream(rv.data).read_all()
+        metadata = get_result_metadata(table)
+        self.assertEqual(metadata["status"], "success")
+        self.assertEqual(table.num_rows, metadata["rowcount"])
+        self.assertEqual(table.column_names, metadata["colnames"])
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_chart_data_arrow_content_negotiation(self):
+        """
+        Chart data API: Test Arrow is returned to clients accepting it
+        """
+        self.login(username="admin")
+        request_payload = get_query_context("birth_names")
+        rv = self.client.post(
+            CHART_DATA_URI,
+            json=request_payload,
+            headers={"Accept": f"{ARROW_STREAM_MIMETYPE}, application/json;q=0.9"},
+        )
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.headers["Content-Type"], ARROW_STREAM_MIMETYPE)
+
+        rv = self.client.post(
+            CHART_DATA_URI,
+            json=request_payload,
+            headers={"Accept": f"application/json, {ARROW_STREAM_MIMETYPE};q=0.9"},
+        )
+        self.assertEqual(rv.status_code, 200)
+        self.assertIn("application/json", rv.headers["Content-Type"])
+
     @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
     def test_chart_data_mixed_case_filter_op(self):
         """
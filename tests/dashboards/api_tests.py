@@ -254,6 +254,74 @@ class TestDashboardApi(SupersetTestCase, ApiOwnersTestCaseMixin, InsertChartMixi
             data["result"][0]["slice_name"], dashboard.slices[0].slice_name
         )
 
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_get_dashboard_chart_data(self):
+        """
+        Dashboard API: Test loading the data of the charts of a dashboard
+        """
+        self.login(username="admin")
+        dashboard = db.session.query(Dashboard).filter_by(slug="births").one()
+        chart_ids = [slc.id for slc in dashboard.slices if slc.viz_type == "table"]
+        bad_id = self.get_nonexistent_numeric_id(Slice)
+        uri = f"api/v1/dashboard/{dashboard.id}/chart_data"
+        request_payload = {
+            "charts": [{"id": chart_id} for chart_id in chart_ids + [bad_id]],
+            "extra_filters": [{"col": "gender", "op": "in", "val": ["girl"]}],
+        }
+        response = self.post_assert_metric(uri, request_payload, "get_chart_data")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+
+        payloads = {
+            payload["chart_id"]: payload
+            for payload in map(json.loads, response.data.decode("utf-8").splitlines())
+        }
+        self.assertEqual(set(payloads), set(chart_ids + [bad_id]))
+        self.assertEqual(payloads[bad_id]["status"], 404)
+        for chart_id in chart_ids:
+            self.assertEqual(payloads[chart_id]["status"], 200)
+            self.assertEqual(
+                payloads[chart_id]["result"]["form_data"]["extra_filters"],
+                request_payload["extra_filters"],
+            )
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_get_dashboard_chart_data_unsupported_viz_type(self):
+        """
+        Dashboard API: Test loading the data of a chart without a legacy viz
+        """
+        self.login(username="admin")
+        dashboard = db.session.query(Dashboard).filter_by(slug="births").one()
+        slc = dashboard.slices[0]
+        viz_type = slc.viz_type
+        slc.viz_type = "echarts_timeseries"
+        db.session.commit()
+        uri = f"api/v1/dashboard/{dashboard.id}/chart_data"
+        try:
+            response = self.post_assert_metric(
+                uri, {"charts": [{"id": slc.id}]}, "get_chart_data"
+            )
+        finally:
+            slc.viz_type = viz_type
+            db.session.commit()
+        self.assertEqual(response.status_code, 200)
+        payload = json.loads(response.data.decode("utf-8").splitlines()[0])
+        self.assertEqual(payload["status"], 400)
+        self.assertEqual(
+            payload["message"], "Unsupported chart type: echarts_timeseries"
+        )
+
+    @pytest.mark.usefixtures("create_dashboards")
+    def test_get_dashboard_chart_data_not_found(self):
+        """
+        Dashboard API: Test loading the data of the charts of a missing dashboard
+        """
+        self.login(username="admin")
+        bad_id = self.get_nonexistent_numeric_id(Dashboard)
+        uri = f"api/v1/dashboard/{bad_id}/chart_data"
+        response = self.post_assert_metric(uri, {}, "get_chart_data")
+        self.assertEqual(response.status_code, 404)
+
     @pytest.mark.usefixtures("create_dashboards")
     def test_get_dashboard_charts_not_found(self):
         """
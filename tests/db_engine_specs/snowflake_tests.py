@@ -15,6 +15,10 @@
 # specific language governing permissions and limitations
 # under the License.
 import json
+import sys
+from unittest import mock
+
+import pyarrow as pa
 
 from superset.db_engine_specs.snowflake import SnowflakeEngineSpec
 from superset.models.core import Database
@@ -43,3 +47,33 @@ class TestSnowflakeDbEngineSpec(TestDbEngineSpec):
             {"engine_params": {"connect_args": {"validate_default_parameters": True}}},
             engine_params,
         )
+
+    def test_fetch_data_arrow(self):
+        class NotSupportedError(Exception):
+            pass
+
+        errors = mock.Mock(NotSupportedError=NotSupportedError)
+        modules = {
+            "snowflake": mock.Mock(),
+            "snowflake.connector": mock.Mock(errors=errors),
+            "snowflake.connector.errors": errors,
+        }
+        with mock.patch.dict(sys.modules, modules):
+            table = pa.table({"a": [1, 2, 3]})
+            cursor = mock.Mock()
+            cursor.fetch_arrow_all.return_value = table
+            self.assertIs(SnowflakeEngineSpec.fetch_data_arrow(cursor, 10), table)
+
+            # no rows or no Arrow support: rows are fetched with `fetch_data`
+            cursor.fetch_arrow_all.return_value = None
+            self.assertIsNone(SnowflakeEngineSpec.fetch_data_arrow(cursor))
+            cursor.fetch_arrow_all.side_effect = NotSupportedError("Not supported")
+            self.assertIsNone(SnowflakeEngineSpec.fetch_data_arrow(cursor))
+            self.assertIsNone(
+                SnowflakeEngineSpec.fetch_data_arrow(mock.Mock(spec=[]))
+            )
+
+            # any other error is raised rather than refetching a consumed cursor
+            cursor.fetch_arrow_all.side_effect = ValueError("Connection lost")
+            with self.assertRaises(ValueError):
+                SnowflakeEngineSpec.fetch_data_arrow(cursor)
@@ -27,6 +27,7 @@ from freezegun import freeze_time
 from superset import security_manager
 from superset.utils.log import (
     AbstractEventLogger,
+    BufferedDBEventLogger,
     DBEventLogger,
     get_event_logger_from_cfg_value,
 )
@@ -230,3 +231,44 @@ class TestEventLogger(unittest.TestCase):
             )
 
         assert logger.records[0]["user_id"] == None
+
+    @patch.object(BufferedDBEventLogger, "save_logs")
+    def test_buffered_logger_flushes_batches(self, mock_save_logs):
+        logger = BufferedDBEventLogger(batch_size=2, flush_interval=0.1)
+
+        def wait_for_batches(count):
+            for _ in range(100):
+                if mock_save_logs.call_count >= count:
+                    break
+                time.sleep(0.01)
+            return [
+                [log.action for log in call[0][0]]
+                for call in mock_save_logs.call_args_list
+            ]
+
+        with app.test_request_context():
+            logger.log(1, "foo", None, 10, None, None, records=[{"a": 1}, {"b": 2}])
+            # full batches are committed right away
+            self.assertEqual(wait_for_batches(1), [["foo", "foo"]])
+            logger.log(1, "bar", None, 10, None, None, records=[{"c": 3}])
+
+        # others after the flush interval
+        self.assertEqual(wait_for_batches(2), [["foo", "foo"], ["bar"]])
+        log = mock_save_logs.call_args[0][0][0]
+        self.assertEqual(log.user_id, 1)
+        self.assertIsNotNone(log.dttm)
+
+    @patch.object(BufferedDBEventLogger, "save_logs")
+    @patch.object(BufferedDBEventLogger, "_ensure_started")
+    def test_buffered_logger_drops_logs_when_full(
+        self, mock_ensure_started, mock_save_logs
+    ):
+        logger = BufferedDBEventLogger(max_queue_size=1)
+        logger._app = app
+
+        with app.test_request_context():
+            logger.log(1, "foo", None, 10, None, None, records=[{"a": 1}, {"b": 2}])
+
+        logger.flush()
+        logs = mock_save_logs.call_args[0][0]
+        self.assertEqual([log.json for log in logs], ['{"a": 1}'])
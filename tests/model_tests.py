@@ -111,6 +111,20 @@ class TestDatabaseModel(SupersetTestCase):
         user_name = make_url(model.get_sqla_engine(user_name=example_user).url).username
         self.assertNotEqual(example_user, user_name)
 
+    @mock.patch("superset.models.core.engine_manager")
+    def test_get_sqla_engine_pooled(self, mocked_engine_manager):
+        mocked_engine_manager.is_enabled = True
+        mocked_engine_manager.get_engine.side_effect = [mock.Mock(), mock.Mock()]
+        model = Database(id=1, database_name="test_database", sqlalchemy_uri="sqlite://")
+
+        # engines evicted by the engine manager must not be handed out again
+        first = model.get_sqla_engine(pooled=True)
+        second = model.get_sqla_engine(pooled=True)
+        self.assertIsNot(first, second)
+        self.assertEqual(mocked_engine_manager.get_engine.call_count, 2)
+
+        self.assertIs(model.get_sqla_engine(), model.get_sqla_engine())
+
     @mock.patch("superset.models.core.create_engine")
     def test_impersonate_user_presto(self, mocked_create_engine):
         uri = "presto://localhost"
@@ -0,0 +1,126 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import json
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+from superset import appbuilder
+from superset.profiler.api import ProfilerRestApi
+from superset.utils.profiler import PROFILE_ID_HEADER, ProfilerMiddleware, StackSampler
+from tests.base_tests import SupersetTestCase
+from tests.test_app import app
+
+
+def busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestProfiler(SupersetTestCase):
+    @classmethod
+    def setUpClass(cls):
+        # only the requests of these tests are run through the profiler, and the
+        # profiles API is only registered when they run
+        if "ProfilerRestApi" not in app.blueprints:
+            appbuilder.add_api(ProfilerRestApi)
+        cls.wsgi_app = app.wsgi_app
+        cls.middleware = ProfilerMiddleware(app.wsgi_app, app)
+        app.wsgi_app = cls.middleware
+
+    @classmethod
+    def tearDownClass(cls):
+        app.wsgi_app = cls.wsgi_app
+        app.before_request_funcs[None].remove(
+            cls.middleware._before_request  # pylint: disable=protected-access
+        )
+        app.after_request_funcs[None].remove(
+            cls.middleware._after_request  # pylint: disable=protected-access
+        )
+
+    def setUp(self):
+        self.storage_dir = tempfile.mkdtemp()
+        self.config_patch = patch.dict(
+            app.config,
+            {"PROFILER_ENABLED": True, "PROFILER_STORAGE_DIR": self.storage_dir},
+        )
+        self.config_patch.start()
+
+    def tearDown(self):
+        self.config_patch.stop()
+
+    def test_stack_sampler(self):
+        sampler = StackSampler(threading.get_ident(), 0.001)
+        sampler.start()
+        busy_loop(0.1)
+        sampler.stop()
+
+        self.assertTrue(sampler.stacks)
+        self.assertTrue(any("busy_loop" in stack for stack in sampler.stacks))
+
+    def test_profile_request(self):
+        self.login(username="admin")
+        rv = self.client.get("/api/v1/dashboard/?_profile=1")
+        self.assertEqual(rv.status_code, 200)
+        profile_id = rv.headers[PROFILE_ID_HEADER]
+
+        rv = self.client.get("/api/v1/profiler/")
+        profiles = json.loads(rv.data.decode("utf-8"))["result"]
+        self.assertEqual(profiles[0]["id"], profile_id)
+        self.assertEqual(profiles[0]["path"], "/api/v1/dashboard/")
+        self.assertEqual(profiles[0]["trigger"], "request")
+
+        rv = self.client.get(f"/api/v1/profiler/{profile_id}")
+        profile = json.loads(rv.data.decode("utf-8"))["result"]
+        self.assertEqual(profile["status"], "200 OK")
+        self.assertGreater(profile["db_queries"], 0)
+        self.assertIn("stacks", profile)
+
+        rv = self.client.get(f"/api/v1/profiler/{profile_id}/stacks")
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.headers["Content-Type"], "text/plain; charset=utf-8")
+
+        rv = self.client.get("/api/v1/profiler/unknown")
+        self.assertEqual(rv.status_code, 404)
+
+    @patch.object(ProfilerMiddleware, "_instrument")
+    @patch.object(StackSampler, "start")
+    def test_profile_request_not_allowed(self, start, instrument):
+        rv = self.client.get("/api/v1/dashboard/?_profile=1")
+        self.assertNotIn(PROFILE_ID_HEADER, rv.headers)
+
+        self.login(username="gamma")
+        rv = self.client.get("/api/v1/dashboard/", headers={"X-Superset-Profile": "1"})
+        self.assertEqual(rv.status_code, 200)
+        self.assertNotIn(PROFILE_ID_HEADER, rv.headers)
+        # the sampler isn't started, nor the caches instrumented, for other users
+        start.assert_not_called()
+        instrument.assert_not_called()
+
+        rv = self.client.get("/api/v1/profiler/")
+        self.assertEqual(rv.status_code, 401)
+        self.logout()
+        self.login(username="admin")
+        rv = self.client.get("/api/v1/profiler/")
+        self.assertEqual(json.loads(rv.data.decode("utf-8"))["result"], [])
+
+    def test_no_profile_without_trigger(self):
+        self.login(username="admin")
+        rv = self.client.get("/api/v1/dashboard/")
+        self.assertNotIn(PROFILE_ID_HEADER, rv.headers)
@@ -0,0 +1,123 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import json
+from unittest.mock import ANY, Mock, patch
+
+import pytest
+
+from superset import db
+from superset.extensions import query_accounting
+from superset.models.slice import Slice
+from superset.utils.query_accounting import (
+    account_queries,
+    normalize_statement,
+    QUERIES_HEADER,
+    REPEATED_QUERIES_HEADER,
+)
+from tests.base_tests import SupersetTestCase
+from tests.fixtures.birth_names_dashboard import load_birth_names_dashboard_with_slices
+from tests.fixtures.query_context import get_query_context
+from tests.test_app import app
+
+
+class TestQueryAccounting(SupersetTestCase):
+    # pylint: disable=protected-access
+    @classmethod
+    def setUpClass(cls):
+        # only the requests of these tests are accounted for
+        query_accounting.init_request_accounting(app)
+
+    @classmethod
+    def tearDownClass(cls):
+        app.before_request_funcs[None].remove(query_accounting._before_request)
+        app.after_request_funcs[None].remove(query_accounting._after_request)
+        app.teardown_request_funcs[None].remove(query_accounting._teardown_request)
+
+    def test_normalize_statement(self):
+        self.assertEqual(
+            normalize_statement(
+                "SELECT slices.id FROM slices\n"
+                "WHERE slices.id IN (?, ?, ?) AND slice_name = 'a''b' LIMIT 10"
+            ),
+            "SELECT slices.id FROM slices WHERE slices.id IN (?) "
+            "AND slice_name = ? LIMIT ?",
+        )
+        self.assertEqual(
+            normalize_statement(
+                "SELECT * FROM tables WHERE id = %(id_1)s AND schema = %s "
+                "AND created_on > :created_on_1 AND sql::text = ''"
+            ),
+            "SELECT * FROM tables WHERE id = ? AND schema = ? "
+            "AND created_on > ? AND sql::text = ?",
+        )
+
+    def test_account_queries(self):
+        slice_ids = [slc.id for slc in db.session.query(Slice).limit(3)]
+        db.session.expire_all()
+        with account_queries() as account:
+            with account_queries() as nested_account:
+                for slice_id in slice_ids:
+                    db.session.query(Slice).filter_by(id=slice_id).one()
+            db.session.query(Slice).count()
+
+        self.assertEqual(nested_account.count, len(slice_ids))
+        self.assertEqual(account.count, len(slice_ids) + 1)
+        self.assertGreater(account.duration_ms, 0)
+        repeated = account.get_repeated(len(slice_ids))
+        self.assertEqual(list(repeated.values()), [len(slice_ids)])
+        self.assertIn("FROM slices", list(repeated)[0])
+
+    def test_request_accounting(self):
+        self.login(username="admin")
+        stats_logger = Mock()
+        with patch.dict(app.config, {"STATS_LOGGER": stats_logger, "DEBUG": True}):
+            rv = self.client.get("/api/v1/dashboard/")
+        self.assertGreater(int(rv.headers[QUERIES_HEADER]), 0)
+        self.assertIn(REPEATED_QUERIES_HEADER, rv.headers)
+        stats_logger.timing.assert_any_call(
+            "metadata_queries.DashboardRestApi.get_list.duration", ANY
+        )
+
+        rv = self.client.get("/api/v1/dashboard/")
+        self.assertNotIn(QUERIES_HEADER, rv.headers)
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_concurrent_chart_data_request(self):
+        self.login(username="admin")
+        payload = get_query_context("birth_names")
+        payload["queries"].append(dict(payload["queries"][0], row_limit=5))
+        config = {"QUERY_CONCURRENCY_MAX_WORKERS": 4, "DEBUG": True}
+        with patch.dict(app.config, config):
+            rv = self.client.post("api/v1/chart/data", json=payload)
+        self.assertEqual(rv.status_code, 200)
+        result = json.loads(rv.data.decode("utf-8"))["result"]
+        self.assertEqual(len(result), 2)
+        self.assertGreater(int(rv.headers[QUERIES_HEADER]), 0)
+
+    def test_assert_max_metadata_queries(self):
+        with self.assert_max_metadata_queries(2, max_repeated=1):
+            db.session.query(Slice).first()
+
+        with self.assertRaises(AssertionError):
+            with self.assert_max_metadata_queries(1):
+                db.session.query(Slice).first()
+                db.session.query(Slice).count()
+
+        with self.assertRaises(AssertionError):
+            with self.assert_max_metadata_queries(10, max_repeated=1):
+                for _ in range(2):
+                    db.session.query(Slice).first()
@@ -16,6 +16,7 @@
 # under the License.
 import re
 from typing import Any, Dict
+from unittest import mock
 
 import pytest
 
@@ -30,6 +31,7 @@ from superset.utils.core import (
     backend,
     ChartDataResultFormat,
     ChartDataResultType,
+    QueryStatus,
     TimeRangeEndpoint,
 )
 from tests.base_tests import SupersetTestCase
@@ -181,6 +183,49 @@ class TestQueryContext(SupersetTestCase):
         cache_key = query_context.query_cache_key(query_object)
         self.assertNotEqual(cache_key_original, cache_key)
 
+    def test_raw_query_cache_key_ignores_post_processing(self):
+        self.login(username="admin")
+        payload = get_query_context("birth_names", add_postprocessing_operations=True)
+        query_context = ChartDataQueryContextSchema().load(payload)
+        query_object = query_context.queries[0]
+        cache_key_original = query_context.query_cache_key(query_object)
+        raw_cache_key_original = query_context.raw_query_cache_key(query_object)
+        assert raw_cache_key_original != cache_key_original
+
+        payload["queries"][0]["post_processing"].pop()
+        query_context = ChartDataQueryContextSchema().load(payload)
+        query_object = query_context.queries[0]
+        assert query_context.query_cache_key(query_object) != cache_key_original
+        assert query_context.raw_query_cache_key(query_object) == raw_cache_key_original
+
+        payload["queries"][0]["row_limit"] = 1
+        query_context = ChartDataQueryContextSchema().load(payload)
+        query_object = query_context.queries[0]
+        assert query_context.raw_query_cache_key(query_object) != raw_cache_key_original
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    @mock.patch.dict(
+        "superset.common.query_context.config", {"DATA_CACHE_RAW_RESULTS": True}
+    )
+    def test_post_processing_change_reuses_raw_result(self):
+        self.login(username="admin")
+        payload = get_query_context("birth_names", add_postprocessing_operations=True)
+        payload["force"] = True
+        ChartDataQueryContextSchema().load(payload).get_payload()
+
+        payload["force"] = False
+        payload["queries"][0]["post_processing"].pop()
+        query_context = ChartDataQueryContextSchema().load(payload)
+        query_object = query_context.queries[0]
+        cache_manager.data_cache.delete(query_context.query_cache_key(query_object))
+        with mock.patch.object(
+            query_context.datasource, "query", side_effect=Exception("no query")
+        ) as mock_query:
+            responses = query_context.get_payload()
+        mock_query.assert_not_called()
+        assert responses["queries"][0]["is_cached"] is False
+        assert responses["queries"][0]["status"] == QueryStatus.SUCCESS
+
     def test_query_context_time_range_endpoints(self):
         """
         Ensure that time_range_endpoints are populated automatically when missing
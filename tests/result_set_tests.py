@@ -17,6 +17,8 @@
 # isort:skip_file
 from datetime import datetime
 
+import pyarrow as pa
+
 import tests.test_app
 from superset.dataframe import df_to_records
 from superset.db_engine_specs import BaseEngineSpec
@@ -248,3 +250,51 @@ class TestSupersetResultSet(SupersetTestCase):
         ]
         results = SupersetResultSet(data, cursor_descr, BaseEngineSpec)
         self.assertEqual(results.columns, [])
+
+    def test_mixed_types_stringify_offending_values(self):
+        data = [("a", 1), (1, None), (None, 2), ({"b": 1}, 3)]
+        cursor_descr = [("mixed",), ("num",)]
+        results = SupersetResultSet(data, cursor_descr, BaseEngineSpec)
+        self.assertEqual(results.columns[0]["type"], "STRING")
+        self.assertEqual(
+            results.pa_table.column("mixed").to_pylist(), ["a", "1", None, '{"b": 1}']
+        )
+        self.assertEqual(results.pa_table.column("num").to_pylist(), [1, None, 2, 3])
+
+    def test_type_from_cursor_description(self):
+        data = [("1", True), (None, None)]
+        cursor_descr = [
+            ("code", "varchar", None, None, None, None, True),
+            ("is_test", "boolean", None, None, None, None, True),
+        ]
+        results = SupersetResultSet(data, cursor_descr, BaseEngineSpec)
+        self.assertEqual(results.pa_table.column("code").to_pylist(), ["1", None])
+        self.assertEqual(results.pa_table.column("is_test").to_pylist(), [True, None])
+
+        # values not matching the cursor description type are inferred
+        data = [(1,), (2,)]
+        cursor_descr = [("code", "varchar", None, None, None, None, True)]
+        results = SupersetResultSet(data, cursor_descr, BaseEngineSpec)
+        self.assertEqual(results.pa_table.column("code").to_pylist(), [1, 2])
+
+    def test_from_arrow_table(self):
+        table = pa.table({"a": [1, 2], "b": [[1, 2], None]})
+        table = table.rename_columns(["a", "a"])
+        cursor_descr = [
+            ("a", "int", None, None, None, None, True),
+            ("a", "array", None, None, None, None, True),
+        ]
+        results = SupersetResultSet.from_arrow_table(
+            table, cursor_descr, BaseEngineSpec
+        )
+        self.assertEqual(
+            results.columns,
+            [
+                {"is_date": False, "type": "INT", "name": "a"},
+                {"is_date": False, "type": "ARRAY", "name": "a__1"},
+            ],
+        )
+        self.assertEqual(
+            df_to_records(results.to_pandas_df()),
+            [{"a": 1, "a__1": "[1, 2]"}, {"a": 2, "a__1": None}],
+        )
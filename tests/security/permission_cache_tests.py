@@ -0,0 +1,69 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from unittest import mock
+
+from superset.security.permission_cache import build_snapshot, PermissionCache
+
+
+def test_build_snapshot():
+    snapshot = build_snapshot(
+        [
+            ("can_read", "Chart"),
+            ("can_read", "Dashboard"),
+            ("datasource_access", "[examples].[birth_names](id:1)"),
+        ]
+    )
+    assert snapshot == {
+        "can_read": frozenset({"Chart", "Dashboard"}),
+        "datasource_access": frozenset({"[examples].[birth_names](id:1)"}),
+    }
+
+
+def test_permission_cache():
+    cache = PermissionCache()
+    snapshot = build_snapshot([("can_read", "Chart")])
+    cache.set((1, 2), "v1", snapshot, timeout=60, max_size=10)
+    assert cache.get((1, 2), "v1") == snapshot
+    assert cache.get((1,), "v1") is None
+    # snapshots of older versions are dropped
+    assert cache.get((1, 2), "v2") is None
+    assert len(cache) == 0
+
+
+def test_permission_cache_timeout():
+    cache = PermissionCache()
+    with mock.patch("superset.utils.versioned_cache.time.monotonic") as monotonic:
+        monotonic.return_value = 100
+        cache.set((1,), "v1", {}, timeout=60, max_size=10)
+        monotonic.return_value = 159
+        assert cache.get((1,), "v1") == {}
+        monotonic.return_value = 160
+        assert cache.get((1,), "v1") is None
+
+
+def test_permission_cache_max_size():
+    cache = PermissionCache()
+    for role_id in range(3):
+        cache.set((role_id,), "v1", {}, timeout=60, max_size=2)
+    assert cache.get((0,), "v1") is None
+
+    # the least recently used snapshot is evicted
+    assert cache.get((1,), "v1") == {}
+    cache.set((3,), "v1", {}, timeout=60, max_size=2)
+    assert cache.get((1,), "v1") == {}
+    assert cache.get((2,), "v1") is None
+    assert len(cache) == 2
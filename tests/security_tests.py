@@ -1026,6 +1026,42 @@ class TestSecurityManager(SupersetTestCase):
         with self.assertRaises(SupersetSecurityException):
             security_manager.raise_for_access(viz=test_viz)
 
+    def test_permission_cache(self):
+        g.user = security_manager.find_user("gamma")
+        view_menu_name = "[examples].[permission_cache]"
+        datasource_perms = security_manager.user_view_menu_names("datasource_access")
+        security_manager.permission_cache.clear()
+        g.pop("permissions_version", None)
+
+        with patch.dict(app.config, PERMISSION_CACHE_TIMEOUT=60), patch.object(
+            security_manager,
+            "_query_permission_snapshot",
+            wraps=security_manager._query_permission_snapshot,
+        ) as query_permission_snapshot:
+            assert (
+                security_manager.user_view_menu_names("datasource_access")
+                == datasource_perms
+            )
+            assert security_manager.can_access("can_read", "Chart")
+            assert not security_manager.can_access("can_write", "Database")
+            assert not security_manager.can_access("schema_access", view_menu_name)
+            assert query_permission_snapshot.call_count == 1
+
+            # changing the permissions of a role invalidates the snapshots
+            gamma_role = security_manager.find_role("Gamma")
+            pv = security_manager.add_permission_view_menu(
+                "schema_access", view_menu_name
+            )
+            security_manager.add_permission_role(gamma_role, pv)
+            assert security_manager.can_access("schema_access", view_menu_name)
+            assert query_permission_snapshot.call_count == 2
+
+            security_manager.del_permission_role(gamma_role, pv)
+            assert not security_manager.can_access("schema_access", view_menu_name)
+            assert query_permission_snapshot.call_count == 3
+
+        security_manager.del_permission_view_menu("schema_access", view_menu_name)
+
 
 class TestRowLevelSecurity(SupersetTestCase):
     """
@@ -1194,3 +1230,50 @@ class TestRowLevelSecurity(SupersetTestCase):
         assert not self.NAMES_B_REGEX.search(sql)
         assert not self.NAMES_Q_REGEX.search(sql)
         assert not self.BASE_FILTER_REGEX.search(sql)
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_rls_filters_cached_per_request(self):
+        g.user = self.get_user(username="gamma")
+        tbl = self.get_table_by_name("birth_names")
+        with patch.object(
+            security_manager,
+            "_query_rls_filters",
+            wraps=security_manager._query_rls_filters,
+        ) as query_rls_filters:
+            filters = security_manager.get_rls_filters(tbl)
+            assert security_manager.get_rls_filters(tbl) == filters
+            tbl.get_query_str(self.query_obj)
+        assert query_rls_filters.call_count == 1
+        assert {f.id for f in filters} == {
+            self.rls_entry2.id,
+            self.rls_entry3.id,
+            self.rls_entry4.id,
+        }
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_rls_filters_cache_invalidation(self):
+        g.user = self.get_user(username="gamma")
+        tbl = self.get_table_by_name("birth_names")
+        with patch.dict(app.config, RLS_FILTERS_CACHE_TIMEOUT=60), patch.object(
+            security_manager,
+            "_query_rls_filters",
+            wraps=security_manager._query_rls_filters,
+        ) as query_rls_filters:
+            security_manager.get_rls_filters(tbl)
+            g.pop("rls_filters")
+            # loaded from the cache backend by the next request
+            security_manager.get_rls_filters(tbl)
+            assert query_rls_filters.call_count == 1
+
+            self.rls_entry3.clause = "name like 'R%'"
+            db.session.commit()
+            filters = security_manager.get_rls_filters(tbl)
+            assert query_rls_filters.call_count == 2
+            assert "name like 'R%'" in {f.clause for f in filters}
+
+            gamma_user = g.user
+            gamma_user.roles.remove(security_manager.find_role(self.NAME_Q_ROLE))
+            db.session.commit()
+            filters = security_manager.get_rls_filters(tbl)
+            assert query_rls_filters.call_count == 3
+            assert "name like 'R%'" not in {f.clause for f in filters}
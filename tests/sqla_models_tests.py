@@ -16,14 +16,26 @@
 # under the License.
 # isort:skip_file
 import re
+from collections import OrderedDict
 from typing import Any, Dict, NamedTuple, List, Pattern, Tuple, Union
 from unittest.mock import patch
+
+import pandas as pd
 import pytest
+import sqlparse
+from sqlalchemy import and_, or_
+from sqlalchemy.sql import column
 
 from superset import db
-from superset.connectors.sqla.models import SqlaTable, TableColumn
+from superset.extensions import cache_manager
+from superset.connectors.sqla.models import (
+    compiled_sql_cache,
+    SqlaTable,
+    TableColumn,
+)
 from superset.db_engine_specs.bigquery import BigQueryEngineSpec
 from superset.db_engine_specs.druid import DruidEngineSpec
+from superset.db_engine_specs.postgres import PostgresEngineSpec
 from superset.exceptions import QueryObjectValidationError
 from superset.models.core import Database
 from superset.utils.core import GenericDataType, get_example_database, FilterOperator
@@ -361,3 +373,163 @@ class TestDatabaseModel(SupersetTestCase):
         db.session.delete(table)
         db.session.delete(database)
         db.session.commit()
+
+    def test_get_top_groups(self):
+        database = Database(database_name="testdb", sqlalchemy_uri="sqlite://")
+        table = SqlaTable(table_name="test_table", database=database)
+        groupby_exprs = OrderedDict(
+            (name, column(name)) for name in ["country", "gender"]
+        )
+        df = pd.DataFrame(
+            {
+                "country": ["fr", "fr", "us", None],
+                "gender": ["boy", "girl", "girl", "boy"],
+                "count": [4, 3, 2, 1],
+            }
+        )
+
+        def compile_predicate(predicate):
+            return str(predicate.compile(compile_kwargs={"literal_binds": True}))
+
+        sql = compile_predicate(table._get_top_groups(df, ["country"], groupby_exprs))
+        assert sql == "country IN ('fr', 'us') OR country IS NULL"
+
+        sql = compile_predicate(
+            table._get_top_groups(df, ["country", "gender"], groupby_exprs)
+        )
+        assert sql == (
+            "country = 'fr' AND gender IN ('boy', 'girl') "
+            "OR country = 'us' AND gender = 'girl' "
+            "OR country IS NULL AND gender = 'boy'"
+        )
+
+        with patch.object(Database, "db_engine_spec", PostgresEngineSpec):
+            sql = compile_predicate(
+                table._get_top_groups(df[:3], ["country", "gender"], groupby_exprs)
+            )
+        assert sql == (
+            "(country, gender) IN (('fr', 'boy'), ('fr', 'girl'), ('us', 'girl'))"
+        )
+
+    def test_get_top_groups_many_series(self):
+        """Column-wise predicates are shorter than an OR of one AND per group"""
+        database = Database(database_name="testdb", sqlalchemy_uri="sqlite://")
+        table = SqlaTable(table_name="test_table", database=database)
+        dimensions = ["country", "state", "gender"]
+        groupby_exprs = OrderedDict((name, column(name)) for name in dimensions)
+        series = 500
+        df = pd.DataFrame(
+            {
+                "country": [f"country_{i % 5}" for i in range(series)],
+                "state": [f"state_{i % 50}" for i in range(series)],
+                "gender": [f"gender_{i}" for i in range(series)],
+                "count": range(series),
+            }
+        )
+
+        def get_top_groups_by_row():
+            groups = []
+            for _unused, row in df.iterrows():
+                group = []
+                for dimension in dimensions:
+                    group.append(groupby_exprs[dimension] == row[dimension])
+                groups.append(and_(*group))
+            return str(or_(*groups).compile())
+
+        def get_top_groups():
+            return str(table._get_top_groups(df, dimensions, groupby_exprs).compile())
+
+        assert len(get_top_groups()) < len(get_top_groups_by_row())
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_prequery_cache(self):
+        table = self.get_table_by_name("birth_names")
+        query_obj = {
+            "granularity": "ds",
+            "from_dttm": None,
+            "to_dttm": None,
+            "groupby": ["name"],
+            "metrics": ["count"],
+            "is_timeseries": True,
+            "timeseries_limit": 5,
+            "filter": [],
+            "extras": {"time_grain_sqla": "P1Y"},
+        }
+        spec = table.database.db_engine_spec
+        cache_manager.data_cache.clear()
+        with patch.object(spec, "allows_joins", False), patch.object(
+            SqlaTable, "_run_query", autospec=True, side_effect=SqlaTable._run_query
+        ) as run_query, patch.dict(
+            "superset.connectors.sqla.models.config",
+            {"SERIES_LIMIT_PREQUERY_CACHE_TIMEOUT": 60},
+        ):
+            first = table.get_query_str_extended(query_obj)
+            assert run_query.call_count == 1
+            second = table.get_query_str_extended(query_obj)
+            assert run_query.call_count == 1
+            # forced queries run the prequery again
+            forced = table.get_query_str_extended(query_obj, force=True)
+            assert run_query.call_count == 2
+        assert first.sql == second.sql == forced.sql
+        assert first.prequeries == second.prequeries == forced.prequeries
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_compiled_sql_cache(self):
+        table = self.get_table_by_name("birth_names")
+        query_obj = {
+            "granularity": "ds",
+            "from_dttm": None,
+            "to_dttm": None,
+            "groupby": ["name"],
+            "metrics": ["count"],
+            "is_timeseries": False,
+            "filter": [{"col": "gender", "op": "==", "val": "boy"}],
+            "extras": {},
+        }
+        compiled_sql_cache.clear()
+        with patch.dict(
+            "superset.connectors.sqla.models.config",
+            {"COMPILED_SQL_CACHE_TIMEOUT": 60},
+        ), patch.object(
+            SqlaTable,
+            "get_sqla_query",
+            autospec=True,
+            side_effect=SqlaTable.get_sqla_query,
+        ) as get_sqla_query:
+            first = table.get_query_str_extended(query_obj)
+            second = table.get_query_str_extended(query_obj)
+            assert get_sqla_query.call_count == 1
+            assert first == second
+
+            # a different query object isn't served the cached SQL
+            other = table.get_query_str_extended({**query_obj, "groupby": ["state"]})
+            assert get_sqla_query.call_count == 2
+            assert other.sql != first.sql
+
+            # changes to the dataset invalidate the cache
+            description = table.description
+            table.description = "compiled SQL cache"
+            db.session.commit()
+            table.get_query_str_extended(query_obj)
+            assert get_sqla_query.call_count == 3
+            table.description = description
+            db.session.commit()
+
+            # so does adding a column, e.g. a calculated column named like a groupby
+            # that was compiled as an expression
+            table.get_query_str_extended(query_obj)
+            call_count = get_sqla_query.call_count
+            column = TableColumn(
+                column_name="compiled_sql_cache", expression="1", table=table
+            )
+            db.session.add(column)
+            db.session.commit()
+            table.get_query_str_extended(query_obj)
+            assert get_sqla_query.call_count == call_count + 1
+            db.session.delete(column)
+            db.session.commit()
+
+        # only the SQL shown to users is pretty printed
+        assert table.get_query_str(query_obj) == (
+            sqlparse.format(first.sql, reindent=True) + ";"
+        )
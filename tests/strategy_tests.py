@@ -18,7 +18,7 @@
 """Unit tests for Superset cache warmup"""
 import datetime
 import json
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from tests.fixtures.birth_names_dashboard import load_birth_names_dashboard_with_slices
 
 from sqlalchemy import String, Date, Float
@@ -30,16 +30,21 @@ from superset.models.slice import Slice
 from superset.utils.core import get_example_database
 
 from superset import db
+from superset.exceptions import SupersetException
 
 from superset.models.core import Log
 from superset.models.tags import get_tag, ObjectTypes, TaggedObject, TagTypes
 from superset.tasks.cache import (
+    cache_warmup,
     DashboardTagsStrategy,
     get_form_data,
+    PredictiveStrategy,
     TopNDashboardsStrategy,
+    warm_up_charts,
 )
 
 from .base_tests import SupersetTestCase
+from .test_app import app
 from .dashboard_utils import create_dashboard, create_slice, create_table_for_dashboard
 from .fixtures.unicode_dashboard import load_unicode_dashboard_with_slice
 
@@ -199,6 +204,102 @@ class TestCacheWarmUp(SupersetTestCase):
         expected = sorted([f"{URL_PREFIX}{slc.url}" for slc in dash.slices])
         self.assertEqual(result, expected)
 
+    def test_predictive_strategy(self):
+        db.session.query(Log).delete()
+        # requested yesterday, shortly after the current time of the day
+        yesterday = datetime.datetime.utcnow() - datetime.timedelta(days=1, minutes=-5)
+        filters = [{"col": "gender", "op": "in", "val": ["boy"]}]
+
+        def log(chart_id, dttm, duration_ms, extra_filters=None):
+            form_data = {"slice_id": chart_id, "extra_filters": extra_filters or []}
+            db.session.add(
+                Log(
+                    action="explore_json",
+                    slice_id=chart_id,
+                    dttm=dttm,
+                    duration_ms=duration_ms,
+                    json=json.dumps({"form_data": form_data}),
+                )
+            )
+
+        for _ in range(3):
+            log(1, yesterday, 100, filters)
+        for _ in range(2):
+            log(2, yesterday, 2000)
+            log(3, yesterday, 300)
+        log(4, yesterday, 100)
+        # requested at another time of the day
+        for _ in range(5):
+            log(5, yesterday - datetime.timedelta(hours=12), 100)
+        db.session.commit()
+
+        strategy = PredictiveStrategy(lookahead=30)
+        self.assertEqual(
+            strategy.get_payloads(),
+            [
+                {"slice_id": 1, "extra_filters": filters},
+                {"slice_id": 2},
+                {"slice_id": 3},
+            ],
+        )
+        strategy = PredictiveStrategy(lookahead=30, budget=1)
+        self.assertEqual(
+            strategy.get_payloads(),
+            [{"slice_id": 1, "extra_filters": filters}, {"slice_id": 3}],
+        )
+        strategy = PredictiveStrategy(top_n=1, lookahead=30)
+        self.assertEqual(
+            strategy.get_payloads(), [{"slice_id": 1, "extra_filters": filters}]
+        )
+
+        db.session.query(Log).delete()
+        db.session.commit()
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_warm_up_charts(self):
+        dash = self.get_dash_by_slug("births")
+        chart_ids = [slc.id for slc in dash.slices]
+        bad_id = self.get_nonexistent_numeric_id(Slice)
+        payloads = [{"slice_id": chart_id} for chart_id in chart_ids]
+        payloads.append({"slice_id": bad_id})
+
+        results = warm_up_charts(payloads)
+        self.assertEqual(
+            sorted(result["chart_id"] for result in results["success"]),
+            sorted(chart_ids),
+        )
+        self.assertEqual([result["chart_id"] for result in results["errors"]], [bad_id])
+        for result in results["success"] + results["errors"]:
+            self.assertIsInstance(result["duration"], int)
+
+    def test_warm_up_charts_user_not_found(self):
+        with patch.dict(app.config, {"CACHE_WARMUP_USER": "not_a_user"}):
+            with self.assertRaises(SupersetException):
+                warm_up_charts([{"slice_id": 1}])
+            self.assertEqual(
+                cache_warmup("dummy"),
+                "Error warming up cache: CACHE_WARMUP_USER not_a_user not found",
+            )
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_cache_warmup_task(self):
+        db.session.query(Log).delete()
+        self.login(username="admin")
+        dash = self.get_dash_by_slug("births")
+        self.client.get(f"/superset/dashboard/{dash.id}/")
+
+        strategy = TopNDashboardsStrategy(1)
+        self.assertEqual(
+            sorted(payload["slice_id"] for payload in strategy.get_payloads()),
+            sorted(slc.id for slc in dash.slices),
+        )
+        results = cache_warmup("top_n_dashboards", top_n=1)
+        self.assertEqual(
+            sorted(result["chart_id"] for result in results["success"]),
+            sorted(slc.id for slc in dash.slices),
+        )
+        self.assertEqual(results["errors"], [])
+
     def reset_tag(self, tag):
         """Remove associated object from tag, used to reset tests"""
         if tag.objects:
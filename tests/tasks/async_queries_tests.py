@@ -30,6 +30,7 @@ from superset.exceptions import SupersetException
 from superset.extensions import async_query_manager, security_manager
 from superset.tasks import async_queries
 from superset.tasks.async_queries import (
+    get_explore_json_dedup_key,
     load_chart_data_into_cache,
     load_explore_json_into_cache,
 )
@@ -69,6 +70,68 @@ class TestAsyncQueries(SupersetTestCase):
             job_metadata, "done", result_url=mock.ANY
         )
 
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    @mock.patch.object(async_query_manager, "detach_jobs")
+    @mock.patch.object(async_query_manager, "update_job")
+    def test_load_chart_data_into_cache_updates_attached_jobs(
+        self, mock_update_job, mock_detach_jobs
+    ):
+        async_query_manager.init_app(app)
+        query_context = get_query_context("birth_names")
+        user = security_manager.find_user("gamma")
+        job_metadata = {
+            "channel_id": str(uuid4()),
+            "job_id": str(uuid4()),
+            "user_id": user.id,
+            "status": "pending",
+            "errors": [],
+        }
+        attached_job_metadata = {**job_metadata, "job_id": str(uuid4())}
+        mock_detach_jobs.return_value = [job_metadata, attached_job_metadata]
+
+        with mock.patch.object(async_queries, "ensure_user_is_set"):
+            load_chart_data_into_cache(job_metadata, query_context, "dedup-key")
+
+        mock_detach_jobs.assert_called_once_with("dedup-key", job_metadata)
+        mock_update_job.assert_has_calls(
+            [
+                mock.call(job_metadata, "done", result_url=mock.ANY),
+                mock.call(attached_job_metadata, "done", result_url=mock.ANY),
+            ]
+        )
+
+    @mock.patch.object(ChartDataCommand, "run", side_effect=SoftTimeLimitExceeded())
+    @mock.patch.object(async_query_manager, "detach_jobs")
+    @mock.patch.object(async_query_manager, "update_job")
+    def test_soft_timeout_load_chart_data_into_cache_updates_attached_jobs(
+        self, mock_update_job, mock_detach_jobs, mock_run_command
+    ):
+        async_query_manager.init_app(app)
+        query_context = get_query_context("birth_names")
+        job_metadata = {
+            "channel_id": str(uuid4()),
+            "job_id": str(uuid4()),
+            "user_id": None,
+            "status": "pending",
+            "errors": [],
+        }
+        attached_job_metadata = {**job_metadata, "job_id": str(uuid4())}
+        mock_detach_jobs.return_value = [job_metadata, attached_job_metadata]
+
+        with pytest.raises(SoftTimeLimitExceeded):
+            with mock.patch.object(async_queries, "ensure_user_is_set"):
+                load_chart_data_into_cache(job_metadata, query_context, "dedup-key")
+
+        # the attached jobs aren't left waiting for the timed out job
+        mock_detach_jobs.assert_called_once_with("dedup-key", job_metadata)
+        errors = [{"message": "A timeout occurred while loading chart data"}]
+        mock_update_job.assert_has_calls(
+            [
+                mock.call(job_metadata, "error", errors=errors),
+                mock.call(attached_job_metadata, "error", errors=errors),
+            ]
+        )
+
     @mock.patch.object(
         ChartDataCommand, "run", side_effect=ChartDataQueryFailedError("Error: foo")
     )
@@ -202,3 +265,14 @@ class TestAsyncQueries(SupersetTestCase):
                 ensure_user_is_set.side_effect = SoftTimeLimitExceeded()
                 load_explore_json_into_cache(job_metadata, form_data)
             ensure_user_is_set.assert_called_once_with(user.id, "error", errors=errors)
+
+    @pytest.mark.usefixtures("load_birth_names_dashboard_with_slices")
+    def test_get_explore_json_dedup_key(self):
+        table = get_table_by_name("birth_names")
+        form_data = {"datasource": f"{table.id}__table", "viz_type": "table"}
+        with app.test_request_context():
+            key = get_explore_json_dedup_key(form_data, "json", table)
+            forced_key = get_explore_json_dedup_key(form_data, "json", table, True)
+            self.assertEqual(key, get_explore_json_dedup_key(form_data, "json", table))
+        # forced jobs aren't attached to jobs that may serve cached results
+        self.assertNotEqual(key, forced_key)
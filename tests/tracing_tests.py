@@ -0,0 +1,126 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import json
+import unittest
+from typing import List
+from unittest.mock import Mock, patch
+
+from superset.utils.concurrency import run_concurrently
+from superset.utils.tracing import (
+    AbstractSpanExporter,
+    LogSpanExporter,
+    NOOP_SPAN,
+    Span,
+    StatsdSpanExporter,
+    Tracer,
+)
+from tests.test_app import app
+
+
+class ListSpanExporter(AbstractSpanExporter):
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.exporter = ListSpanExporter()
+        self.tracer = Tracer()
+        self.tracer.exporters = [self.exporter]
+
+    def test_disabled(self):
+        tracer = Tracer()
+        with tracer.span("query", rows=1) as span:
+            span.set_attribute("is_cached", True)
+        self.assertIs(span, NOOP_SPAN)
+        self.assertIs(tracer.current_span(), NOOP_SPAN)
+
+    def test_nested_spans(self):
+        with self.tracer.span("request", datasource="1__table") as request:
+            with self.tracer.span("query"):
+                self.tracer.current_span().set_attribute("rows", 10)
+            with self.assertRaises(ValueError):
+                with self.tracer.span("serialize"):
+                    raise ValueError()
+            self.assertIs(self.tracer.current_span(), request)
+            self.assertEqual(self.exporter.spans, [])
+
+        self.assertEqual(self.exporter.spans, [request])
+        self.assertEqual(request.attributes, {"datasource": "1__table"})
+        self.assertEqual(
+            [(span.name, span.attributes) for span in request.children],
+            [("query", {"rows": 10}), ("serialize", {"error": "ValueError"})],
+        )
+        self.assertGreaterEqual(request.duration_ms, request.children[0].duration_ms)
+        self.assertIs(self.tracer.current_span(), NOOP_SPAN)
+
+    def test_traced(self):
+        @self.tracer.traced("get_payload")
+        def get_payload(value):
+            self.tracer.current_span().set_attributes(rows=value)
+            return value
+
+        self.assertEqual(get_payload(3), 3)
+        self.assertEqual(self.exporter.spans[0].name, "get_payload")
+        self.assertEqual(self.exporter.spans[0].attributes, {"rows": 3})
+
+    def test_spans_in_concurrent_functions(self):
+        def query():
+            with self.tracer.span("query"):
+                pass
+
+        with app.app_context(), patch.dict(
+            app.config, {"QUERY_CONCURRENCY_MAX_WORKERS": 4}
+        ):
+            with self.tracer.span("request") as request:
+                run_concurrently([query, query])
+
+        self.assertEqual(self.exporter.spans, [request])
+        self.assertEqual([span.name for span in request.children], ["query", "query"])
+
+    def test_exporters(self):
+        with self.tracer.span("request", rows=2):
+            with self.tracer.span("query"):
+                pass
+        span = self.exporter.spans[0]
+
+        stats_logger = Mock()
+        StatsdSpanExporter(stats_logger).export(span)
+        self.assertEqual(
+            [call[0][0] for call in stats_logger.timing.call_args_list],
+            ["span.request", "span.query"],
+        )
+
+        with self.assertLogs("superset.utils.tracing", level="INFO") as logs:
+            LogSpanExporter().export(span)
+            LogSpanExporter(min_duration_ms=60 * 60 * 1000).export(span)
+        self.assertEqual(len(logs.records), 1)
+        payload = json.loads(logs.records[0].getMessage())
+        self.assertEqual(payload["name"], "request")
+        self.assertEqual(payload["attributes"], {"rows": 2})
+        self.assertEqual(payload["children"][0]["name"], "query")
+
+    def test_failing_exporter(self):
+        exporter = Mock()
+        exporter.export.side_effect = Exception()
+        self.tracer.exporters.insert(0, exporter)
+        with self.tracer.span("request"):
+            pass
+        self.assertEqual(len(self.exporter.spans), 1)
@@ -0,0 +1,55 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import pandas as pd
+import pyarrow as pa
+
+from superset.utils.arrow import (
+    df_to_arrow_table,
+    get_result_metadata,
+    write_ipc_stream,
+)
+
+
+def test_df_to_arrow_table():
+    df = pd.DataFrame({"name": ["foo", "bar"], "value": [1.5, 2.0]})
+    table = df_to_arrow_table(df)
+    assert table.column_names == ["name", "value"]
+    assert table.column("value").type == pa.float64()
+
+    # mixed types are converted to strings, nulls are kept
+    df = pd.DataFrame({"mixed": [1, "foo", None]})
+    table = df_to_arrow_table(df)
+    assert table.column("mixed").type == pa.string()
+    assert table.column("mixed").to_pylist() == ["1", "foo", None]
+
+    # a meaningful index is kept
+    df = pd.DataFrame({"value": [1, 2]}, index=pd.Index(["a", "b"], name="key"))
+    assert df_to_arrow_table(df).column_names == ["value", "key"]
+
+
+def test_write_ipc_stream():
+    first = df_to_arrow_table(pd.DataFrame({"a": [1, 2, 3]}))
+    second = pa.Table.from_batches([], schema=pa.schema([]))
+    data = write_ipc_stream([(first, {"rowcount": 3}), (second, {"error": "foo"})])
+
+    source = pa.BufferReader(data)
+    table = pa.ipc.open_stream(source).read_all()
+    assert table.to_pydict() == {"a": [1, 2, 3]}
+    assert get_result_metadata(table) == {"rowcount": 3}
+    table = pa.ipc.open_stream(source).read_all()
+    assert table.num_rows == 0
+    assert get_result_metadata(table) == {"error": "foo"}
@@ -0,0 +1,103 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from datetime import datetime
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+from flask import Flask
+
+from superset.utils.cache_codec import (
+    DataFrameCache,
+    decode_dataframe,
+    encode_dataframe,
+    EncodedDataFrame,
+)
+
+
+@pytest.mark.parametrize("compression", [None, "lz4", "zstd"])
+def test_encode_decode_dataframe(compression):
+    df = pd.DataFrame(
+        {
+            "name": ["foo", "bar", None],
+            "value": [1.5, None, 3.0],
+            "ds": [datetime(2021, 1, 1), datetime(2021, 1, 2), None],
+        }
+    )
+    encoded_df = encode_dataframe(df, compression)
+    assert encoded_df.compression == compression
+    pd.testing.assert_frame_equal(decode_dataframe(encoded_df), df)
+
+
+def test_encode_decode_object_integers():
+    # nullable integer columns, as built by SupersetResultSet
+    df = pd.DataFrame(
+        {
+            "nullable": pd.Series([1, None], dtype=object),
+            "ints": pd.Series([1, 2], dtype=object),
+        }
+    )
+    decoded_df = decode_dataframe(encode_dataframe(df))
+    pd.testing.assert_frame_equal(decoded_df, df)
+    assert decoded_df["nullable"].tolist() == [1, None]
+    assert isinstance(decoded_df["ints"][0], int)
+
+
+def test_encode_dataframe_unsupported():
+    assert encode_dataframe(pd.DataFrame({"a": [1, "foo"]})) is None
+    assert encode_dataframe(pd.DataFrame({"a": [[1, 2], [3]]})) is None
+    assert encode_dataframe(pd.DataFrame({1: [1, 2]})) is None
+
+
+def get_data_frame_cache(codec: str) -> DataFrameCache:
+    app = Flask(__name__)
+    app.config.update(
+        DATA_CACHE_DATAFRAME_CODEC=codec,
+        DATA_CACHE_ARROW_COMPRESSION="lz4",
+        STATS_LOGGER=Mock(),
+    )
+    cache = DataFrameCache()
+    cache.init_app(app, {"CACHE_TYPE": "simple"})
+    return cache
+
+
+def test_data_frame_cache():
+    cache = get_data_frame_cache("arrow")
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    cache.set("key", {"df": df, "query": "SELECT a"})
+    assert isinstance(cache.cache.get("key")["df"], EncodedDataFrame)
+    cache_value = cache.get("key")
+    assert cache_value["query"] == "SELECT a"
+    pd.testing.assert_frame_equal(cache_value["df"], df)
+
+    # frames Arrow can't represent are stored as is
+    df = pd.DataFrame({"a": [1, "foo"]})
+    cache.set("key", {"df": df})
+    pd.testing.assert_frame_equal(cache.cache.get("key")["df"], df)
+    cache._stats_logger.incr.assert_called_with("data_cache.arrow.fallback")
+
+    # other values are left alone
+    cache.set("other_key", "value")
+    assert cache.get("other_key") == "value"
+
+
+def test_data_frame_cache_pickle_codec():
+    cache = get_data_frame_cache("pickle")
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    cache.set("key", {"df": df})
+    assert isinstance(cache.cache.get("key")["df"], pd.DataFrame)
+    pd.testing.assert_frame_equal(cache.get("key")["df"], df)
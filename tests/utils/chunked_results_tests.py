@@ -0,0 +1,137 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from unittest.mock import Mock
+
+import pytest
+from cachelib import SimpleCache
+
+from superset.db_engine_specs.base import BaseEngineSpec
+from superset.exceptions import SerializationError
+from superset.result_set import SupersetResultSet
+from superset.utils.chunked_results import ChunkedResultsWriter, read_chunks
+
+DESCRIPTION = [("id", "int", None, None, None, None, True), ("name", "string")]
+
+
+def write_results(cache, rows, batch_size):
+    writer = ChunkedResultsWriter(cache, "key", 0)
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start : start + batch_size]
+        writer.write(SupersetResultSet(batch, DESCRIPTION, BaseEngineSpec))
+    return writer
+
+
+def read_ids(cache, chunks, offset=0, limit=None):
+    return [
+        row["id"]
+        for table in read_chunks(cache, chunks, offset, limit)
+        for row in table.to_pylist()
+    ]
+
+
+def test_chunked_results_writer():
+    cache = SimpleCache()
+    rows = [(i, f"name{i}") for i in range(10)]
+    writer = write_results(cache, rows, 4)
+
+    assert writer.rows == 10
+    assert [c["name"] for c in writer.columns] == ["id", "name"]
+    assert writer.chunks == [
+        {"key": "key-chunk-0", "offset": 0, "rows": 4},
+        {"key": "key-chunk-1", "offset": 4, "rows": 4},
+        {"key": "key-chunk-2", "offset": 8, "rows": 2},
+    ]
+    assert read_ids(cache, writer.chunks) == list(range(10))
+
+
+@pytest.mark.parametrize(
+    "offset,limit", [(0, 3), (2, 4), (3, 5), (7, None), (9, 10), (10, 5)],
+)
+def test_read_chunks_range(offset, limit):
+    cache = SimpleCache()
+    rows = [(i, f"name{i}") for i in range(10)]
+    writer = write_results(cache, rows, 4)
+
+    cache.get = Mock(wraps=cache.get)
+    end = 10 if limit is None else min(offset + limit, 10)
+    assert read_ids(cache, writer.chunks, offset, limit) == list(range(offset, end))
+    # only the chunks holding the rows are read
+    read_keys = [call[0][0] for call in cache.get.call_args_list]
+    assert read_keys == [
+        chunk["key"]
+        for chunk in writer.chunks
+        if chunk["offset"] < end and chunk["offset"] + chunk["rows"] > offset
+    ]
+
+
+def test_read_chunks_missing_chunk():
+    cache = SimpleCache()
+    writer = write_results(cache, [(i, f"name{i}") for i in range(10)], 4)
+    cache.delete("key-chunk-1")
+
+    with pytest.raises(SerializationError):
+        read_ids(cache, writer.chunks)
+
+
+def test_fetch_data_batches():
+    cursor = Mock()
+    cursor.description = DESCRIPTION
+    cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,), (4,)], [(5,)], []]
+
+    assert list(BaseEngineSpec.fetch_data_batches(cursor, 2)) == [
+        [(1,), (2,)],
+        [(3,), (4,)],
+        [(5,)],
+    ]
+
+    cursor.fetchmany.reset_mock(side_effect=True)
+    cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)]]
+    assert list(BaseEngineSpec.fetch_data_batches(cursor, 2, limit=3)) == [
+        [(1,), (2,)],
+        [(3,)],
+    ]
+    assert cursor.fetchmany.call_args_list[-1][0] == (1,)
+
+
+@pytest.mark.parametrize("expand_data", [True, False])
+def test_load_results_chunks_expand_data(expand_data):
+    from superset.views.utils import load_results_chunks
+
+    cache = SimpleCache()
+    writer = write_results(cache, [(i, f"name{i}") for i in range(10)], 4)
+    query = Mock()
+    db_engine_spec = query.database.db_engine_spec
+    db_engine_spec.expand_data.side_effect = lambda columns, data: (
+        columns + [{"name": "expanded"}],
+        data,
+        [{"name": "expanded"}],
+    )
+    payload = {
+        "chunks": writer.chunks,
+        "columns": writer.columns,
+        "selected_columns": writer.columns,
+        "expanded_columns": [],
+        "expand_data": expand_data,
+    }
+
+    payload = load_results_chunks(payload, query, cache, offset=2, rows=3)
+    assert [row["id"] for row in payload["data"]] == [2, 3, 4]
+    assert db_engine_spec.expand_data.called == expand_data
+    expanded_columns = [{"name": "expanded"}] if expand_data else []
+    assert payload["expanded_columns"] == expanded_columns
+    assert len(payload["columns"]) == (3 if expand_data else 2)
+    assert "expand_data" not in payload
@@ -0,0 +1,123 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import threading
+import time
+import uuid
+
+import pytest
+from flask import Flask, g, request
+
+from superset.utils.concurrency import iter_concurrently, run_concurrently
+
+
+def get_app(max_workers=4, per_database=8):
+    app = Flask(__name__)
+    app.config.update(
+        QUERY_CONCURRENCY_MAX_WORKERS=max_workers,
+        QUERY_CONCURRENCY_PER_DATABASE=per_database,
+    )
+    return app
+
+
+def test_run_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def func(value):
+        # only returns if the 3 functions run at the same time
+        barrier.wait()
+        return value, g.user, request.path
+
+    with get_app().test_request_context("/chart/data"):
+        g.user = "admin"
+        results = run_concurrently([lambda i=i: func(i) for i in range(3)])
+
+    assert results == [(i, "admin", "/chart/data") for i in range(3)]
+
+
+def test_run_concurrently_serially():
+    thread_ids = set()
+
+    def func():
+        thread_ids.add(threading.get_ident())
+
+    with get_app(max_workers=1).app_context():
+        run_concurrently([func, func])
+    assert thread_ids == {threading.get_ident()}
+
+
+def test_run_concurrently_database_limit():
+    lock = threading.Lock()
+    running = {"current": 0, "max": 0}
+
+    def func():
+        with lock:
+            running["current"] += 1
+            running["max"] = max(running["max"], running["current"])
+        time.sleep(0.05)
+        with lock:
+            running["current"] -= 1
+
+    database_key = str(uuid.uuid4())
+    with get_app(per_database=2).app_context():
+        run_concurrently([func] * 4, [database_key] * 4)
+    assert running["max"] == 2
+
+
+def test_run_concurrently_errors():
+    def fail(message):
+        raise ValueError(message)
+
+    completed = []
+    with get_app().app_context():
+        with pytest.raises(ValueError, match="first"):
+            run_concurrently(
+                [
+                    lambda: completed.append(1),
+                    lambda: fail("first"),
+                    lambda: fail("second"),
+                ]
+            )
+    # the other functions still run to completion
+    assert completed == [1]
+
+
+def test_run_concurrently_nested():
+    def nested():
+        thread_id = threading.get_ident()
+        # nested calls run in the thread of the calling function
+        return run_concurrently([threading.get_ident] * 2) == [thread_id] * 2
+
+    with get_app().app_context():
+        assert run_concurrently([nested, nested]) == [True, True]
+
+
+def test_iter_concurrently():
+    events = {i: threading.Event() for i in range(3)}
+
+    def func(i):
+        # each function waits for the result of the next one to be yielded
+        if i < 2:
+            assert events[i + 1].wait(timeout=5)
+        return i
+
+    results = []
+    with get_app().app_context():
+        for i, result in iter_concurrently([lambda i=i: func(i) for i in range(3)]):
+            results.append((i, result))
+            events[i].set()
+
+    assert results == [(2, 2), (1, 1), (0, 0)]
@@ -16,9 +16,12 @@
 # under the License.
 # pylint: disable=no-self-use
 import io
+from unittest import mock
 
+import numpy as np
 import pandas as pd
 import pytest
+from hypothesis import given, settings, strategies as st
 
 from superset.utils import csv
 
@@ -78,3 +81,86 @@ def test_df_to_escaped_csv():
         ["a", "'=b"],  # pandas seems to be removing the leading ""
         ["' =a", "b"],
     ]
+
+
+def escape_values(value):
+    return csv.escape_value(value) if isinstance(value, str) else value
+
+
+# text likely to need escaping, along with arbitrary text
+csv_text = st.text(alphabet=st.sampled_from('-@+|=%" \t\u3000.0123456789ab'))
+csv_text |= st.text()
+
+
+@settings(deadline=None)
+@given(st.lists(csv_text | st.none()))
+def test_escape_series_strings(values):
+    result = csv.escape_series(pd.Series(values, dtype=object))
+    assert list(map(repr, result)) == [repr(escape_values(v)) for v in values]
+
+
+@settings(deadline=None)
+@given(
+    st.lists(
+        csv_text | st.none() | st.integers() | st.floats() | st.booleans() | st.binary()
+    )
+)
+def test_escape_series_mixed(values):
+    result = csv.escape_series(pd.Series(values, dtype=object))
+    assert list(map(repr, result)) == [repr(escape_values(v)) for v in values]
+
+
+def test_escape_dataframe():
+    df = pd.DataFrame(
+        {"=a": ["-10", "=cmd|' /C calc'!A0", None, 3], "b": [1, 2, 3, 4]},
+        index=[0, 0, 1, 1],
+    )
+    expected = df.rename(columns=csv.escape_value).applymap(escape_values)
+    assert csv.escape_dataframe(df).to_csv() == expected.to_csv()
+
+
+def test_stream_escaped_csv():
+    df = pd.DataFrame({"col_a": ["=a", "b", "-c"], "col_b": [1, 2, 3]})
+    stats_logger = mock.Mock()
+    on_complete = mock.Mock()
+
+    chunks = list(
+        csv.stream_escaped_csv(
+            csv.split_dataframe(df, 2),
+            stats_logger=stats_logger,
+            on_complete=on_complete,
+            index=False,
+        )
+    )
+
+    assert chunks == ["col_a,col_b\n'=a,1\nb,2\n", "'-c,3\n"]
+    assert "".join(chunks) == csv.df_to_escaped_csv(df, index=False)
+    on_complete.assert_called_once_with(3)
+    stats_logger.timing.assert_any_call("csv_export.time_to_first_byte", mock.ANY)
+    stats_logger.gauge.assert_called_once_with("csv_export.rows_per_second", mock.ANY)
+
+
+def test_stream_escaped_csv_empty():
+    df = pd.DataFrame({"col_a": []})
+    assert list(csv.stream_escaped_csv(csv.split_dataframe(df, 2), index=False)) == [
+        "col_a\n"
+    ]
+
+
+def test_escape_dataframe():
+    """Escaping column-wise matches escaping every value of the DataFrame"""
+    rows = 1000
+    rng = np.random.default_rng(0)
+    words = np.array(
+        ["foo", "=cmd|' /C calc'!A0", "-10", "-bar", " =a", "plain text"], dtype=object
+    )
+    df = pd.DataFrame(
+        {
+            "name": words[rng.integers(0, len(words), rows)],
+            "city": words[rng.integers(0, len(words), rows)],
+            "value": rng.random(rows),
+            "count": rng.integers(0, 100, rows),
+        }
+    )
+
+    assert csv.escape_dataframe(df).to_csv() == df.applymap(escape_values).to_csv()
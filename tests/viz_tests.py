@@ -178,6 +178,42 @@ class TestBaseViz(SupersetTestCase):
         # restore DATA_CACHE_CONFIG timeout
         app.config["DATA_CACHE_CONFIG"]["CACHE_DEFAULT_TIMEOUT"] = data_cache_timeout
 
+    def test_get_df_payloads(self):
+        datasource = self.get_datasource_mock()
+        test_viz = viz.BaseViz(datasource, form_data={})
+
+        test_viz.errors = [{"message": "initial"}]
+
+        def get_df_payload(viz_obj, query_obj, **kwargs):
+            viz_obj.query = query_obj["sql"]
+            viz_obj.status = query_obj["status"]
+            if query_obj["status"] == "failed":
+                viz_obj.errors.append({"message": query_obj["sql"]})
+            return {"query": viz_obj.query, **kwargs}
+
+        with patch.object(viz.BaseViz, "get_df_payload", get_df_payload):
+            payloads = test_viz.get_df_payloads(
+                [
+                    (
+                        {"sql": "SELECT 1", "status": "failed"},
+                        {"time_compare": "1 day"},
+                    ),
+                    ({"sql": "SELECT 2", "status": "success"}, {}),
+                ]
+            )
+
+        self.assertEqual(
+            payloads,
+            [{"query": "SELECT 1", "time_compare": "1 day"}, {"query": "SELECT 2"}],
+        )
+        # the state of the last query is kept, as when running them serially
+        self.assertEqual(test_viz.query, "SELECT 2")
+        self.assertEqual(test_viz.status, "success")
+        # the errors of all the queries are kept
+        self.assertEqual(
+            test_viz.errors, [{"message": "initial"}, {"message": "SELECT 1"}]
+        )
+
 
 class TestTableViz(SupersetTestCase):
     def test_get_data_applies_percentage(self):